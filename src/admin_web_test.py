@@ -56,3 +56,44 @@ def test_reject_proposal_not_found(client):
     ):
         rv = client.post("/admin/proposals/Proposal/123/reject")
         assert rv.status_code == 404
+
+
+def test_datastore_metrics_endpoint(client):
+    with (
+        patch("core.config.config.is_gae", False),
+        patch("core.config.config.allow_local_login", True),
+    ):
+        rv = client.get("/admin/metrics")
+        assert rv.status_code == 200
+        body = rv.json()
+        assert "kinds" in body["datastore"]
+        assert "max_workers" in body["executor"]
+        assert "hit_ratio" in body["inline_candidates"]
+
+
+def test_datastore_metrics_endpoint_unauthorized(client):
+    with patch("core.config.config.is_gae", True):
+        rv = client.get("/admin/metrics")
+        assert rv.status_code == 401
+
+
+def test_metrics_are_only_reset_by_post(client):
+    from infrastructure.datastore.metrics import datastore_metrics
+
+    with (
+        patch("core.config.config.is_gae", False),
+        patch("core.config.config.allow_local_login", True),
+    ):
+        datastore_metrics.record("Phrase", "get", 0.01)
+        client.get("/admin/metrics?reset=true")
+        assert "Phrase" in datastore_metrics.snapshot()["kinds"]
+
+        rv = client.post("/admin/metrics/reset")
+        assert rv.status_code == 200
+        assert datastore_metrics.snapshot()["kinds"] == {}
+
+
+def test_metrics_reset_unauthorized(client):
+    with patch("core.config.config.is_gae", True):
+        rv = client.post("/admin/metrics/reset")
+        assert rv.status_code == 401
@@ -10,8 +10,10 @@ from litestar.datastructures import UploadFile
 
 from services.proposal_service import ProposalService
 from core.config import config
+from core.metrics import metrics_registry
 from tg import get_initialized_tg_application
 from infrastructure.protocols import ChatRepository
+from models.chat import Chat
 
 logger = logging.getLogger(__name__)
 
@@ -71,37 +73,44 @@ class AdminController(Controller):
             bot = application.bot
 
             success_count = 0
-            fail_count = 0
+            inactive: list[Chat] = []
 
-            for i, target in enumerate(targets):
-                progress = int((i / total) * 100)
-                yield json.dumps(
-                    {
-                        "progress": progress,
-                        "current_user": target.title
-                        or target.username
-                        or str(target.id),
-                        "status": f"Enviando a {i + 1}/{total}...",
-                    }
-                )
-
-                try:
-                    chat_id = (
-                        int(target.id)
-                        if isinstance(target.id, str)
-                        and target.id.lstrip("-").isdigit()
-                        else target.id
+            try:
+                for i, target in enumerate(targets):
+                    progress = int((i / total) * 100)
+                    yield json.dumps(
+                        {
+                            "progress": progress,
+                            "current_user": target.title
+                            or target.username
+                            or str(target.id),
+                            "status": f"Enviando a {i + 1}/{total}...",
+                        }
                     )
-                    await bot.send_message(chat_id=chat_id, text=msg)  # type: ignore[arg-type]
-                    success_count += 1
-                except Exception as e:
-                    logger.warning(f"Error sending broadcast to chat {target.id}: {e}")
-                    # Mark chat as inactive if we can't send messages
-                    target.is_active = False
-                    await chat_repo.save(target)
-                    fail_count += 1
 
-                await asyncio.sleep(0.05)
+                    try:
+                        chat_id = (
+                            int(target.id)
+                            if isinstance(target.id, str)
+                            and target.id.lstrip("-").isdigit()
+                            else target.id
+                        )
+                        await bot.send_message(chat_id=chat_id, text=msg)  # type: ignore[arg-type]
+                        success_count += 1
+                    except Exception as e:
+                        logger.warning(
+                            f"Error sending broadcast to chat {target.id}: {e}"
+                        )
+                        # Mark chat as inactive if we can't send messages
+                        target.is_active = False
+                        inactive.append(target)
+
+                    await asyncio.sleep(0.05)
+            finally:
+                # Persisted in one batch, even if the admin closes the page
+                await chat_repo.save_many(inactive)
+
+            fail_count = len(inactive)
 
             yield json.dumps(
                 {
@@ -154,7 +163,7 @@ class AdminController(Controller):
         bot = application.bot
 
         success_count = 0
-        fail_count = 0
+        inactive: list[Chat] = []
 
         for target in targets:
             try:
@@ -179,14 +188,35 @@ class AdminController(Controller):
             except Exception as e:
                 logger.warning(f"Error sending broadcast to chat {target.id}: {e}")
                 target.is_active = False
-                await chat_repo.save(target)
-                fail_count += 1
+                inactive.append(target)
+
+        await chat_repo.save_many(inactive)
+        fail_count = len(inactive)
 
         return Response(
             f"Difusión completada. ✅ {success_count} enviados, 🚫 {fail_count} fallidos.",
             status_code=200,
         )
 
+    @get("/metrics")
+    async def datastore_stats(self, request: Request) -> dict:
+        """Datastore call counts, latency histograms and cache hit ratios,
+        plus every other source in the metrics registry."""
+        user = request.session.get("user")
+        if not user or str(user.get("id")) != str(config.owner_id):
+            raise HTTPException(status_code=401, detail="Unauthorized")
+        return metrics_registry.snapshot()
+
+    @post("/metrics/reset")
+    async def reset_metrics(self, request: Request) -> Response[str]:
+        """Zeroes the counters of the sources that support it."""
+        user = request.session.get("user")
+        if not user or str(user.get("id")) != str(config.owner_id):
+            return Response("Unauthorized", status_code=401)
+
+        metrics_registry.reset()
+        return Response("Reset", status_code=200)
+
     @post("/proposals/{kind:str}/{proposal_id:str}/approve")
     async def approve_proposal(
         self,
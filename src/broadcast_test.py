@@ -190,8 +190,8 @@ async def test_broadcast_send_failure_updates_active(client, mock_chats):
             return_value=[mock_chats[0]],
         ),
         patch(
-            "infrastructure.datastore.chat.ChatDatastoreRepository.save"
-        ) as mock_save,
+            "infrastructure.datastore.chat.ChatDatastoreRepository.save_many"
+        ) as mock_save_many,
         patch(
             "api.admin.get_initialized_tg_application",
             new_callable=AsyncMock,
@@ -203,8 +203,8 @@ async def test_broadcast_send_failure_updates_active(client, mock_chats):
         assert response.status_code == 200
         assert b"0 enviados" in response.content
         # Should have updated is_active to False
-        mock_save.assert_called_once()
-        saved_chat = mock_save.call_args[0][0]
+        mock_save_many.assert_called_once()
+        (saved_chat,) = mock_save_many.call_args[0][0]
         assert saved_chat.id == 1
         assert saved_chat.is_active is False
 
@@ -0,0 +1,125 @@
+"""Background lane for writes nobody waits on.
+
+Bookkeeping such as recording who used the bot shouldn't delay the reply
+that triggered it. ``BackgroundTasks.submit`` queues the work and returns at
+once; a few worker tasks run it in order. The queue is bounded: when it's
+full the work is dropped with a warning rather than piling up. Failures are
+logged and never reach the submitter. On shutdown ``drain`` gives the queued
+work a grace period to finish.
+"""
+
+import asyncio
+import contextvars
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from core.config import config
+from core.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+Job = tuple[str, Callable[..., Awaitable[Any]], tuple[Any, ...]]
+
+
+class BackgroundTasks:
+    def __init__(self, max_queued: int, workers: int, drain_timeout: float):
+        self.max_queued = max_queued
+        self.workers = workers
+        self.drain_timeout = drain_timeout
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[Job] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def _ensure_started(self) -> asyncio.Queue[Job]:
+        # Queues and tasks belong to one event loop; start over on a new one
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            # A fresh context each: workers outlive the request that started
+            # them and must not see its unit of work or other context vars
+            self._workers = [
+                loop.create_task(
+                    self._work(self._queue),
+                    name=f"background-{i}",
+                    context=contextvars.Context(),
+                )
+                for i in range(self.workers)
+            ]
+        return self._queue
+
+    def submit(
+        self, fn: Callable[..., Awaitable[Any]], *args: Any, name: str = ""
+    ) -> bool:
+        """Queues ``fn(*args)`` to run in the background. Returns False if
+        the queue is full and the call was dropped."""
+        name = name or getattr(fn, "__qualname__", repr(fn))
+        queue = self._ensure_started()
+        try:
+            queue.put_nowait((name, fn, args))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Background queue full, dropping {name}")
+            return False
+        self.submitted += 1
+        return True
+
+    async def _work(self, queue: asyncio.Queue[Job]) -> None:
+        while True:
+            name, fn, args = await queue.get()
+            try:
+                await fn(*args)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Background task {name} failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def join(self) -> None:
+        """Waits until everything queued so far has run."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def drain(self) -> None:
+        """Lets queued work finish, up to ``drain_timeout`` seconds, then stops
+        the workers. Called on shutdown."""
+        queue, workers = self._queue, self._workers
+        if queue is None:
+            return
+        self._loop, self._queue, self._workers = None, None, []
+        if workers[0].get_loop() is not asyncio.get_running_loop():
+            # Started on a loop that's gone: its work can't run any more
+            return
+        try:
+            await asyncio.wait_for(queue.join(), self.drain_timeout)
+        except TimeoutError:
+            logger.warning(
+                f"Background drain timed out with {queue.qsize()} tasks queued"
+            )
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queued": self.max_queued,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+background_tasks = BackgroundTasks(
+    max_queued=config.background_max_queued,
+    workers=config.background_workers,
+    drain_timeout=config.background_drain_timeout,
+)
+metrics_registry.register("background", background_tasks.stats)
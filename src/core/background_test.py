@@ -0,0 +1,86 @@
+import asyncio
+import contextvars
+
+import pytest
+
+from core.background import BackgroundTasks
+
+request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id")
+
+
+@pytest.mark.asyncio
+async def test_submitted_work_runs_in_order():
+    tasks = BackgroundTasks(max_queued=10, workers=1, drain_timeout=1)
+    done = []
+
+    async def record(value):
+        done.append(value)
+
+    assert tasks.submit(record, 1)
+    assert tasks.submit(record, 2)
+    assert done == []
+    await tasks.join()
+
+    assert done == [1, 2]
+    assert tasks.stats()["completed"] == 2
+    await tasks.drain()
+
+
+@pytest.mark.asyncio
+async def test_failures_are_logged_not_raised(caplog):
+    tasks = BackgroundTasks(max_queued=10, workers=1, drain_timeout=1)
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    tasks.submit(fail, name="fail")
+    await tasks.join()
+
+    assert tasks.stats()["failed"] == 1
+    assert "Background task fail failed: boom" in caplog.text
+    await tasks.drain()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops():
+    tasks = BackgroundTasks(max_queued=1, workers=1, drain_timeout=1)
+    release = asyncio.Event()
+
+    async def wait():
+        await release.wait()
+
+    assert tasks.submit(wait)
+    await asyncio.sleep(0)  # The worker takes the first one
+    assert tasks.submit(wait)
+    assert not tasks.submit(wait)
+    assert tasks.stats()["dropped"] == 1
+
+    release.set()
+    await tasks.drain()
+    assert tasks.stats()["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_drain_gives_up_after_timeout():
+    tasks = BackgroundTasks(max_queued=10, workers=1, drain_timeout=0.01)
+
+    tasks.submit(asyncio.sleep, 10)
+    await tasks.drain()
+
+    assert tasks.stats()["queued"] == 0
+    assert tasks.stats()["completed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_work_does_not_see_submitter_context():
+    tasks = BackgroundTasks(max_queued=10, workers=1, drain_timeout=1)
+    seen = []
+
+    async def record():
+        seen.append(request_id.get("unset"))
+
+    request_id.set("request")
+    tasks.submit(record)
+    await tasks.drain()
+
+    assert seen == ["unset"]
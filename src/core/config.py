@@ -28,6 +28,15 @@ class Config:
     twitter_access_secret: str
     bucket_name: str
     allow_local_login: bool
+    datastore_max_workers: int
+    datastore_timeout: float
+    datastore_scan_timeout: float
+    background_max_queued: int
+    background_workers: int
+    background_drain_timeout: float
+    usage_flush_interval: float
+    repository_backend: str
+    catalogue_snapshot_url: str
 
     @classmethod
     def from_env(cls) -> "Config":
@@ -64,6 +73,17 @@ class Config:
             bucket_name=os.environ.get("BUCKET_NAME", "cunhaobot-assets"),
             allow_local_login=os.environ.get("ALLOW_LOCAL_LOGIN", "false").lower()
             == "true",
+            datastore_max_workers=int(os.environ.get("DATASTORE_MAX_WORKERS", 16)),
+            datastore_timeout=float(os.environ.get("DATASTORE_TIMEOUT", 30)),
+            datastore_scan_timeout=float(os.environ.get("DATASTORE_SCAN_TIMEOUT", 120)),
+            background_max_queued=int(os.environ.get("BACKGROUND_MAX_QUEUED", 1000)),
+            background_workers=int(os.environ.get("BACKGROUND_WORKERS", 4)),
+            background_drain_timeout=float(
+                os.environ.get("BACKGROUND_DRAIN_TIMEOUT", 10)
+            ),
+            usage_flush_interval=float(os.environ.get("USAGE_FLUSH_INTERVAL", 30)),
+            repository_backend=os.environ.get("REPOSITORY_BACKEND", "datastore"),
+            catalogue_snapshot_url=os.environ.get("CATALOGUE_SNAPSHOT_URL", ""),
         )
 
 
@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING, cast
-from core.config import config
+from core.config import ConfigError, config
 from utils.gcp import get_bucket
 
 # Concrete repositories
@@ -11,6 +11,7 @@ from infrastructure.datastore.proposal import (
 from infrastructure.datastore.user import user_repository
 from infrastructure.datastore.chat import chat_repository
 from infrastructure.datastore.usage import usage_repository
+from infrastructure.datastore.user_stats import user_stats_repository
 from infrastructure.datastore.gift import gift_repository
 from infrastructure.datastore.link_request import link_request_repository
 from infrastructure.datastore.poster_request import poster_request_repository
@@ -40,6 +41,7 @@ if TYPE_CHECKING:
         UserRepository,
         ChatRepository,
         UsageRepository,
+        UserStatsRepository,
         GiftRepository,
         LinkRequestRepository,
         PosterRequestRepository,
@@ -52,7 +54,11 @@ class Container:
     Used by parts of the system where Litestar's DI is not available (e.g. Telegram Bot, CLI).
     """
 
-    def __init__(self):
+    def __init__(self, backend: str | None = None):
+        backend = backend or config.repository_backend
+        if backend not in ("datastore", "memory"):
+            raise ConfigError(f"Unknown repository backend: {backend}")
+
         # Repositories (already singletons in their modules, we just group them)
         self.phrase_repo: PhraseRepository = phrase_repository
         # The long variants reuse PhraseDatastoreRepository/ProposalDatastoreRepository
@@ -67,9 +73,12 @@ class Container:
         self.user_repo: UserRepository = user_repository
         self.chat_repo: ChatRepository = chat_repository
         self.usage_repo: UsageRepository = usage_repository
+        self.user_stats_repo: UserStatsRepository = user_stats_repository
         self.gift_repo: GiftRepository = gift_repository
         self.link_request_repo: LinkRequestRepository = link_request_repository
         self.poster_request_repo: PosterRequestRepository = poster_request_repository
+        if backend == "memory":
+            self._use_memory_repositories()
 
         # Services (Lazily initialized singletons)
         self._badge_service: BadgeService | None = None
@@ -85,6 +94,36 @@ class Container:
         self._game_service: GameService | None = None
         self._chat_interaction_service: ChatInteractionService | None = None
 
+    def _use_memory_repositories(self) -> None:
+        """Swaps every repository for a fresh, non-persistent in-memory one."""
+        from infrastructure.memory.phrase import PhraseMemoryRepository
+        from infrastructure.memory.proposal import ProposalMemoryRepository
+        from infrastructure.memory.user import UserMemoryRepository
+        from infrastructure.memory.chat import ChatMemoryRepository
+        from infrastructure.memory.usage import UsageMemoryRepository
+        from infrastructure.memory.user_stats import UserStatsMemoryRepository
+        from infrastructure.memory.gift import GiftMemoryRepository
+        from infrastructure.memory.link_request import LinkRequestMemoryRepository
+        from infrastructure.memory.poster_request import PosterRequestMemoryRepository
+        from models.phrase import LongPhrase
+        from models.proposal import LongProposal
+
+        self.phrase_repo = PhraseMemoryRepository()
+        self.long_phrase_repo = cast(
+            "LongPhraseRepository", PhraseMemoryRepository(LongPhrase)
+        )
+        self.proposal_repo = ProposalMemoryRepository()
+        self.long_proposal_repo = cast(
+            "LongProposalRepository", ProposalMemoryRepository(LongProposal)
+        )
+        self.user_repo = UserMemoryRepository()
+        self.chat_repo = ChatMemoryRepository()
+        self.usage_repo = UsageMemoryRepository()
+        self.user_stats_repo = UserStatsMemoryRepository()
+        self.gift_repo = GiftMemoryRepository()
+        self.link_request_repo = LinkRequestMemoryRepository()
+        self.poster_request_repo = PosterRequestMemoryRepository()
+
     @property
     def badge_service(self) -> BadgeService:
         if not self._badge_service:
@@ -94,6 +133,9 @@ class Container:
                 phrase_repo=self.phrase_repo,
                 long_phrase_repo=self.long_phrase_repo,
                 gift_repo=self.gift_repo,
+                poster_request_repo=self.poster_request_repo,
+                user_service=self.user_service,
+                user_stats_repo=self.user_stats_repo,
             )
         return self._badge_service
 
@@ -108,6 +150,7 @@ class Container:
                 proposal_repo=self.proposal_repo,
                 long_proposal_repo=self.long_proposal_repo,
                 link_request_repo=self.link_request_repo,
+                user_stats_repo=self.user_stats_repo,
             )
         return self._user_service
 
@@ -0,0 +1,57 @@
+import pytest
+from core.config import ConfigError
+from core.container import Container
+from infrastructure.protocols import (
+    ChatRepository,
+    GiftRepository,
+    LinkRequestRepository,
+    LongPhraseRepository,
+    LongProposalRepository,
+    PhraseRepository,
+    PosterRequestRepository,
+    ProposalRepository,
+    UsageRepository,
+    UserRepository,
+    UserStatsRepository,
+)
+from models.poster_request import PosterRequest
+from models.user import User
+
+
+def test_memory_backend_implements_protocols():
+    container = Container(backend="memory")
+
+    assert isinstance(container.phrase_repo, PhraseRepository)
+    assert isinstance(container.long_phrase_repo, LongPhraseRepository)
+    assert isinstance(container.proposal_repo, ProposalRepository)
+    assert isinstance(container.long_proposal_repo, LongProposalRepository)
+    assert isinstance(container.user_repo, UserRepository)
+    assert isinstance(container.chat_repo, ChatRepository)
+    assert isinstance(container.usage_repo, UsageRepository)
+    assert isinstance(container.user_stats_repo, UserStatsRepository)
+    assert isinstance(container.gift_repo, GiftRepository)
+    assert isinstance(container.link_request_repo, LinkRequestRepository)
+    assert isinstance(container.poster_request_repo, PosterRequestRepository)
+    assert container.long_phrase_repo.kind == "LongPhrase"
+
+
+def test_unknown_backend():
+    with pytest.raises(ConfigError):
+        Container(backend="sqlite")
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_badges():
+    container = Container(backend="memory")
+    await container.user_repo.save(User(id=1, name="Paco"))
+    await container.poster_request_repo.save(
+        PosterRequest(
+            id="p1", phrase="Fiera", user_id="1", chat_id=1, status="completed"
+        )
+    )
+    await container.badge_service.record("1", posters=1)
+
+    badges = await container.badge_service.check_badges(1, "telegram")
+
+    assert "mecenas" in {b.id for b in badges}
+    assert "mecenas" in (await container.user_repo.load(1)).badges
@@ -0,0 +1,34 @@
+"""Registry of the runtime stats reported by ``/admin/metrics``.
+
+Components that keep counters (the Datastore metrics, the inline candidate
+cache, the background lane...) register them here when they're created, so
+the admin API can report and reset them without importing each one.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+Stats = Callable[[], dict[str, Any]]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._sources: dict[str, tuple[Stats, Callable[[], None] | None]] = {}
+
+    def register(
+        self, name: str, stats: Stats, reset: Callable[[], None] | None = None
+    ) -> None:
+        """Reports ``stats()`` under ``name``. ``reset`` zeroes its counters;
+        sources without one (gauges, lifetime totals) are left alone."""
+        self._sources[name] = (stats, reset)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {name: stats() for name, (stats, _) in self._sources.items()}
+
+    def reset(self) -> None:
+        for _, reset in self._sources.values():
+            if reset is not None:
+                reset()
+
+
+metrics_registry = MetricsRegistry()
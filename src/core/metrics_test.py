@@ -0,0 +1,12 @@
+from core.metrics import MetricsRegistry
+
+
+def test_reports_every_source_and_resets_those_that_can():
+    counts = {"hits": 3}
+    registry = MetricsRegistry()
+    registry.register("cache", lambda: dict(counts), lambda: counts.update(hits=0))
+    registry.register("queue", lambda: {"queued": 2})
+
+    assert registry.snapshot() == {"cache": {"hits": 3}, "queue": {"queued": 2}}
+    registry.reset()
+    assert registry.snapshot() == {"cache": {"hits": 0}, "queue": {"queued": 2}}
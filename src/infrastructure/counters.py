@@ -0,0 +1,119 @@
+"""Write-behind buffer for counter increments.
+
+Every chosen inline result adds one to a few counters of each phrase in it.
+Loading and saving the phrase for each of those costs a read and a write per
+usage, and two instances saving the same popular phrase lose one of the
+increments. ``CounterBuffer`` instead merges increments in memory per entity
+and writes them every ``flush_interval`` seconds with the repository's
+``increment_many``, which applies them in batched transactions. Writes are
+then proportional to the distinct entities used per interval, not to usages.
+
+Increments not yet flushed are lost if the process dies without shutting
+down; ``stop`` flushes them on a clean shutdown.
+"""
+
+import asyncio
+import contextvars
+import logging
+from collections import Counter
+from typing import Any
+
+from core.config import config
+from core.metrics import metrics_registry
+from infrastructure.protocols import IncrementError, Repository
+
+logger = logging.getLogger(__name__)
+
+Deltas = dict[str | int, Counter[str]]
+
+
+class CounterBuffer:
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._pending: dict[Repository[Any], Deltas] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._flusher: asyncio.Task[None] | None = None
+        # The flush the periodic task is running, which stop() lets finish
+        self._flushing: asyncio.Future[None] | None = None
+        self.added = 0
+        self.written = 0
+        self.failed = 0
+
+    def add(self, repo: Repository[Any], entity_id: str | int, **fields: int) -> None:
+        """Adds ``fields`` to the entity's counters on the next flush."""
+        self._pending.setdefault(repo, {}).setdefault(entity_id, Counter()).update(
+            fields
+        )
+        self.added += 1
+        self._ensure_started()
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._flusher is None or self._loop is not loop:
+            self._loop = loop
+            # Outlives the request that started it: don't inherit its context
+            self._flusher = loop.create_task(
+                self._flush_periodically(),
+                name="counter-flush",
+                context=contextvars.Context(),
+            )
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self._flushing = asyncio.ensure_future(self.flush())
+            # Cancelling this task must not cancel a write halfway
+            await asyncio.shield(self._flushing)
+
+    def _merge(self, repo: Repository[Any], deltas: Deltas) -> None:
+        pending = self._pending.setdefault(repo, {})
+        for entity_id, fields in deltas.items():
+            pending.setdefault(entity_id, Counter()).update(fields)
+
+    async def flush(self) -> None:
+        """Writes every pending increment. Increments that fail to be written
+        are kept for the next flush; those the repository reports as applied
+        despite the failure are not."""
+        pending, self._pending = self._pending, {}
+        for repo, deltas in pending.items():
+            try:
+                await repo.increment_many(deltas)
+            except IncrementError as e:
+                # Part of them was committed: keep only the rest
+                self.failed += 1
+                logger.error(
+                    f"Could not flush {len(e.pending)} counters: {e.__cause__}"
+                )
+                self._merge(repo, e.pending)
+                self.written += len(deltas) - len(e.pending)
+                continue
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Could not flush {len(deltas)} counters: {e}")
+                self._merge(repo, deltas)
+                continue
+            self.written += len(deltas)
+
+    async def stop(self) -> None:
+        """Stops the periodic flush and writes what is pending. Called on
+        shutdown."""
+        flusher, flushing = self._flusher, self._flushing
+        self._loop = self._flusher = self._flushing = None
+        if flusher is not None and flusher.get_loop() is asyncio.get_running_loop():
+            flusher.cancel()
+            await asyncio.gather(flusher, return_exceptions=True)
+            if flushing is not None:
+                await asyncio.gather(flushing, return_exceptions=True)
+        await self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending": sum(len(deltas) for deltas in self._pending.values()),
+            "added": self.added,
+            "written": self.written,
+            "failed": self.failed,
+        }
+
+
+usage_counters = CounterBuffer(flush_interval=config.usage_flush_interval)
+metrics_registry.register("usage_counters", usage_counters.stats)
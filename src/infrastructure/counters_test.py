@@ -0,0 +1,76 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from infrastructure.counters import CounterBuffer
+from infrastructure.memory.phrase import PhraseMemoryRepository
+from infrastructure.protocols import IncrementError
+from models.phrase import Phrase
+
+
+@pytest.mark.asyncio
+async def test_increments_are_merged_per_entity():
+    repo = AsyncMock()
+    counters = CounterBuffer(flush_interval=60)
+
+    counters.add(repo, 1, usages=1, score=1)
+    counters.add(repo, 1, usages=1, audio_usages=1)
+    counters.add(repo, 2, usages=1)
+    assert counters.stats()["pending"] == 2
+
+    await counters.flush()
+    repo.increment_many.assert_called_once_with(
+        {1: {"usages": 2, "score": 1, "audio_usages": 1}, 2: {"usages": 1}}
+    )
+    assert counters.stats() == {"pending": 0, "added": 3, "written": 2, "failed": 0}
+    await counters.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_increments():
+    repo = AsyncMock()
+    repo.increment_many.side_effect = [RuntimeError("contention"), None]
+    counters = CounterBuffer(flush_interval=60)
+
+    counters.add(repo, 1, usages=1)
+    await counters.flush()
+    counters.add(repo, 1, usages=1)
+    await counters.flush()
+
+    assert repo.increment_many.call_args.args[0] == {1: {"usages": 2}}
+    assert counters.stats()["failed"] == 1
+    await counters.stop()
+
+
+@pytest.mark.asyncio
+async def test_flushes_periodically_and_on_stop():
+    repo = PhraseMemoryRepository()
+    await repo.save(Phrase(id=1, text="fiera"))
+    counters = CounterBuffer(flush_interval=0.01)
+
+    counters.add(repo, 1, usages=1)
+    await asyncio.sleep(0.05)
+    assert (await repo.load(1)).usages == 1
+
+    counters.add(repo, 1, usages=2)
+    await counters.stop()
+    assert (await repo.load(1)).usages == 3
+    assert counters.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_partly_applied_flush_keeps_only_the_rest():
+    repo = AsyncMock()
+    repo.increment_many.side_effect = [IncrementError({2: {"usages": 1}}), None]
+    counters = CounterBuffer(flush_interval=60)
+
+    counters.add(repo, 1, usages=1)
+    counters.add(repo, 2, usages=1)
+    await counters.flush()
+    await counters.flush()
+
+    # The first batch (entity 1) was committed and isn't applied again
+    assert repo.increment_many.call_args.args[0] == {2: {"usages": 1}}
+    assert counters.stats() == {"pending": 0, "added": 2, "written": 2, "failed": 1}
+    await counters.stop()
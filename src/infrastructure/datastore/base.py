@@ -1,19 +1,159 @@
 import asyncio
 import logging
-from typing import Generic, TypeVar
+import time
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Sequence,
+)
+from functools import partial
+from typing import Any, Generic, TypeVar, cast
 from google.cloud import datastore
 from pydantic import BaseModel
+from infrastructure.datastore.executor import datastore_executor
+from infrastructure.datastore.metrics import datastore_metrics, entity_count
+from infrastructure.datastore.snapshot import CacheSnapshot
+from infrastructure.datastore.unit_of_work import current_unit_of_work
+from infrastructure.keys import KeyResolver
+from infrastructure.protocols import IncrementError
 from utils.gcp import get_datastore_client
 
 T = TypeVar("T", bound=BaseModel)
+K = TypeVar("K")
+R = TypeVar("R")
 
 logger = logging.getLogger(__name__)
 
+# Kind holding one entity per cached kind with a monotonically increasing
+# ``generation`` that writers bump, so other instances can detect changes.
+GENERATION_KIND = "CacheGeneration"
+# How often (seconds) a warm cache checks the generation entity by default.
+DEFAULT_GENERATION_CHECK_INTERVAL = 30.0
+# Ids changed by the most recent bumps, kept on the generation entity so
+# readers that missed only a few writes can patch their cache with a get_multi.
+_GENERATION_RECENT_IDS = 50
+# Maximum number of entities in a single Datastore commit
+MAX_BATCH_SIZE = 500
+# Seconds to wait after a change before rewriting the cache snapshot, so a
+# burst of writes produces a single upload.
+SNAPSHOT_WRITE_DELAY = 60.0
+
+
+def key_id(key: datastore.Key) -> str | int | None:
+    """The key's id or name (None for an incomplete key).
+
+    ``Key.id``, ``name`` and ``id_or_name`` deep-copy the key's path on every
+    access, which dominates decoding a whole kind; ``flat_path`` doesn't.
+    """
+    flat_path = key.flat_path
+    return flat_path[-1] if len(flat_path) % 2 == 0 else None
+
+
+def build_trusted(model_class: type[R], data: dict) -> R:
+    """Builds a model from a row of our own kinds without validating it.
+
+    Rows were validated when they were written, so re-validating them on every
+    read is wasted work (most of the CPU of a cold ``load_all``). Values are
+    used as they are, so callers convert anything whose stored type differs
+    from the model's (enums, ids). Missing fields get their defaults; a row
+    missing a required field is validated instead, so it fails loudly.
+    """
+    decoder = _decoders.get(model_class)
+    if decoder is None:
+        decoder = _decoders[model_class] = _compile_decoder(model_class)
+    return decoder(data)
+
+
+_decoders: dict[type, Callable[[dict], Any]] = {}
+
+
+def _compile_decoder(model_class: type[R]) -> Callable[[dict], R]:
+    # ``model_construct`` is slower than validating in pydantic-core, so the
+    # instance is assembled directly from the precomputed field layout, using
+    # set and dict operations instead of a per-field loop.
+    fields = model_class.model_fields  # type: ignore[attr-defined]
+    names = frozenset(fields)
+    required = frozenset(n for n, info in fields.items() if info.is_required())
+    # Immutable defaults are shared; factories and mutable defaults are made
+    # per instance, like pydantic does.
+    static: dict[str, Any] = {}
+    dynamic: dict[str, Any] = {}
+    for name, info in fields.items():
+        if name in required:
+            continue
+        if info.default_factory is None and isinstance(
+            info.default, (str, int, float, bool, type(None), tuple, frozenset)
+        ):
+            static[name] = info.default
+        else:
+            dynamic[name] = info
+    new_model = object.__new__
+    set_attr = object.__setattr__
+
+    def decode(data: dict) -> R:
+        keys = data.keys()
+        if not required <= keys:
+            return model_class(**data)
+        fields_set = keys & names
+        values = static | (
+            data if len(fields_set) == len(keys) else {k: data[k] for k in fields_set}
+        )
+        for name in dynamic.keys() - keys:
+            values[name] = dynamic[name].get_default(call_default_factory=True)
+        model = new_model(model_class)
+        set_attr(model, "__dict__", values)
+        set_attr(model, "__pydantic_fields_set__", fields_set)
+        set_attr(model, "__pydantic_extra__", None)
+        set_attr(model, "__pydantic_private__", None)
+        return model
+
+    return decode
+
 
 class DatastoreRepository(Generic[T]):
-    def __init__(self, kind: str):
+    # Decode rows with ``build_trusted``; False validates every row instead,
+    # e.g. while legacy data of unknown shape is still around.
+    trusted_decode = True
+
+    def __init__(
+        self,
+        kind: str,
+        generation_check_interval: float | None = None,
+        refresh_after: float | None = None,
+        snapshot: CacheSnapshot[T] | None = None,
+    ):
         self.kind = kind
-        self._cache: list[T] = []
+        # Write-through cache keyed by the Datastore key's id/name. It is only
+        # populated by ``load_all``; saves and deletes patch it in place so the
+        # kind is scanned once per process instead of once per write.
+        self._cache: MutableMapping[str | int, T] = self._as_cache({})
+        self._cache_loaded = False
+        # Cross-instance coherence. ``None`` disables it (per-process cache only).
+        self.generation_check_interval = generation_check_interval
+        self._generation = 0
+        self._generation_checked_at = 0.0
+        # In-flight full scan shared by concurrent cold-cache load_all callers
+        self._loading: asyncio.Future[None] | None = None
+        # Local writes made while a scan is in flight, replayed on top of it
+        self._writes_during_load: dict[str | int, T | None] = {}
+        # Stale-while-revalidate: once the cache is older than this many
+        # seconds it keeps being served while a background scan refreshes it.
+        self.refresh_after = refresh_after
+        self._loaded_at = 0.0
+        # Warm start: the first load reads this snapshot instead of scanning,
+        # then reconciles in the background. Rewritten after changes to
+        # what it captures (``_snapshot_version``).
+        self.snapshot = snapshot
+        self._snapshot_tried = False
+        self._snapshot_version_written: object = None
+        self._snapshot_pending: asyncio.Task[None] | None = None
+        self._reconciling: asyncio.Task[None] | None = None
+        # Kinds whose numeric ids may also be stored as strings set a resolver,
+        # so ``load`` finds either form without retrying every time.
+        self._keys: KeyResolver | None = None
 
     @property
     def client(self) -> datastore.Client:
@@ -22,20 +162,263 @@ class DatastoreRepository(Generic[T]):
     def get_key(self, entity_id: str | int) -> datastore.Key:
         return self.client.key(self.kind, entity_id)
 
+    async def _run(
+        self,
+        op: str,
+        fn: Callable[[], R],
+        timeout: float | None = None,
+        count: Callable[[R], int] = entity_count,
+    ) -> R:
+        """Runs a blocking client call in the dedicated Datastore pool.
+
+        The call is recorded in ``datastore_metrics`` under this kind and
+        ``op``; ``count`` extracts the number of entities from the result.
+        """
+        started = time.perf_counter()
+        try:
+            result = await datastore_executor.run(fn, timeout=timeout)
+        except BaseException:
+            datastore_metrics.record(
+                self.kind, op, time.perf_counter() - started, error=True
+            )
+            raise
+        datastore_metrics.record(
+            self.kind, op, time.perf_counter() - started, count(result)
+        )
+        return result
+
+    async def _query(
+        self,
+        op: str,
+        fn: Callable[[], R],
+        count: Callable[[R], int] = entity_count,
+    ) -> R:
+        """``_run`` for queries, which must see the saves of this kind that
+        the unit of work deferred."""
+        await self._write_pending()
+        return await self._run(op, fn, count=count)
+
+    async def _write_pending(self) -> None:
+        if (uow := current_unit_of_work()) is not None:
+            await uow.write_pending(self.kind)
+
     async def delete(self, entity_id: str | int) -> None:
         def _delete():
             self.client.delete(self.get_key(entity_id))
 
-        await asyncio.to_thread(_delete)
-        self.clear_cache()
+        await self._run("delete", _delete, count=_one)
+        if (uow := current_unit_of_work()) is not None:
+            uow.forget(self.kind, entity_id)
+        self._cache_pop(entity_id)
+        await self._bump_generation(entity_id)
 
     def clear_cache(self) -> None:
-        self._cache = []
+        self._cache = self._as_cache({})
+        self._cache_loaded = False
+
+    def _as_cache(self, models: dict[str | int, T]) -> MutableMapping[str | int, T]:
+        """Wraps freshly loaded models in the structure the cache keeps them in.
+
+        A plain dict by default; kinds with a more compact representation
+        override it.
+        """
+        return models
+
+    def _cache_put(self, entity_id: str | int | None, model: T) -> None:
+        """Updates or inserts a model in the cache, if the cache is warm."""
+        if entity_id is not None and self._keys is not None:
+            self._keys.found(entity_id, entity_id)
+        if entity_id is not None and self._loading is not None:
+            self._writes_during_load[entity_id] = model
+        if not self._cache_loaded:
+            return
+        if entity_id is None:
+            # We can't address the entity, so the cached list can't be trusted
+            self.clear_cache()
+            return
+        self._cache[entity_id] = model
+        self._schedule_snapshot()
+
+    def _cache_pop(self, entity_id: str | int) -> None:
+        if self._keys is not None:
+            self._keys.forget(entity_id)
+        if self._loading is not None:
+            self._writes_during_load[entity_id] = None
+        if self._cache.pop(entity_id, None) is not None:
+            self._schedule_snapshot()
+
+    def _generation_key(self) -> datastore.Key:
+        return self.client.key(GENERATION_KIND, self.kind)
+
+    def _read_generation(self) -> tuple[int, list[str | int]]:
+        """Returns the stored generation and the ids changed by recent bumps."""
+        entity = self.client.get(self._generation_key())
+        if not entity:
+            return 0, []
+        return int(entity.get("generation", 0)), list(entity.get("recent_ids", []))
+
+    async def _bump_generation(self, *entity_ids: str | int | None) -> None:
+        """Tells other instances that entities of this kind changed.
+
+        The generation advances by one per changed id, so a reader that is
+        ``n`` generations behind knows the last ``n`` recent ids cover it.
+        """
+        if self.generation_check_interval is None or not entity_ids:
+            return
+
+        def _bump(changed: Sequence[str | int | None]) -> int:
+            with self.client.transaction():
+                key = self._generation_key()
+                entity = self.client.get(key) or datastore.Entity(
+                    key=key, exclude_from_indexes=("recent_ids",)
+                )
+                previous = int(entity.get("generation", 0))
+                recent = list(entity.get("recent_ids", []))
+                if any(entity_id is None for entity_id in changed):
+                    # Unaddressable change: force readers behind to rescan
+                    recent = []
+                else:
+                    recent = (recent + list(changed))[-_GENERATION_RECENT_IDS:]
+                entity.update(
+                    {"generation": previous + len(changed), "recent_ids": recent}
+                )
+                self.client.put(entity)
+            return previous
+
+        try:
+            previous = await self._run(
+                "generation_bump", partial(_bump, entity_ids), count=_one
+            )
+        except Exception as e:
+            logger.warning(f"Could not bump cache generation for {self.kind}: {e}")
+            # The entity write succeeded, so readers must still learn of it.
+            # A later bump wouldn't list these ids: retry as an unaddressable
+            # change, which makes readers behind rescan.
+            try:
+                previous = await self._run(
+                    "generation_bump",
+                    partial(_bump, [None] * len(entity_ids)),
+                    count=_one,
+                )
+            except Exception as e:
+                logger.error(
+                    f"Could not mark cache generation for {self.kind}: {e}; "
+                    "other instances won't see the change until they rescan"
+                )
+                return
+
+        # Only advance if we were in sync, otherwise we'd skip other writers'
+        # changes. If we weren't, the next check catches up (including ours).
+        if previous == self._generation:
+            self._generation = previous + len(entity_ids)
+
+    async def _refresh_if_stale(self, rescan_if_behind: bool = False) -> None:
+        """Syncs a warm cache with writes made by other instances.
+
+        The generation entity is read at most once per check interval. A
+        reader that missed only a few writes reloads just those entities.
+        One further behind keeps serving while a background scan replaces
+        the cache when it revalidates anyway (``refresh_after``) or
+        ``rescan_if_behind``; otherwise the cache is dropped and the next
+        ``load_all`` rescans.
+        """
+        if self.generation_check_interval is None or not self._cache_loaded:
+            return
+        now = time.monotonic()
+        if now - self._generation_checked_at < self.generation_check_interval:
+            return
+        self._generation_checked_at = now
+        known = self._generation
+
+        def _sync() -> tuple[int, dict[str | int, T | None] | None]:
+            generation, recent = self._read_generation()
+            missed = generation - known
+            if missed == 0:
+                return generation, {}
+            if missed < 0 or missed > len(recent):
+                return generation, None
+            changed = set(recent[-missed:])
+            found = self.client.get_multi([self.get_key(i) for i in changed])
+            updates: dict[str | int, T | None] = dict.fromkeys(changed)
+            for entity in found:
+                updates[key_id(entity.key)] = self._entity_to_domain(entity)
+            return generation, updates
+
+        try:
+            generation, updates = await self._run(
+                "generation_check", _sync, count=lambda r: len(r[1] or {})
+            )
+        except Exception as e:
+            logger.warning(f"Could not check cache generation for {self.kind}: {e}")
+            return
+
+        if updates is None:
+            if rescan_if_behind or self.refresh_after is not None:
+                logger.info(f"{self.kind} cache is too stale, rescanning")
+                self._revalidate()
+                return
+            logger.info(f"{self.kind} cache is too stale, dropping it")
+            self.clear_cache()
+            return
+
+        for entity_id, model in updates.items():
+            if model is None:
+                self._cache.pop(entity_id, None)
+            else:
+                self._cache[entity_id] = model
+        self._generation = generation
+
+    async def _cached_models(self) -> list[T] | None:
+        """Returns the cached models if the cache is warm and fresh enough."""
+        if not await self._cache_ready():
+            return None
+        return list(self._cache.values())
+
+    async def _cache_ready(self) -> bool:
+        """Whether queries can be answered from the cache right now."""
+        # Deferred saves haven't patched the cache yet
+        await self._write_pending()
+        await self._refresh_if_stale()
+        datastore_metrics.record_cache(self.kind, self._cache_loaded)
+        if not self._cache_loaded:
+            return False
+        if (
+            self.refresh_after is not None
+            and time.monotonic() - self._loaded_at > self.refresh_after
+        ):
+            self._revalidate()
+        return True
+
+    def _start_loading(self) -> asyncio.Future[None]:
+        """Returns the in-flight scan, starting one if there is none."""
+        loading = self._loading
+        if loading is None or loading.get_loop() is not asyncio.get_running_loop():
+            loading = asyncio.ensure_future(self._fetch_all())
+            self._loading = loading
+            self._writes_during_load = {}
+            loading.add_done_callback(self._loading_done)
+        return loading
+
+    def _revalidate(self) -> None:
+        """Refreshes the cache in the background, deduplicated with any scan."""
+        if self._loading is not None:
+            return
+        self._start_loading().add_done_callback(self._log_revalidation_error)
+
+    def _log_revalidation_error(self, future: asyncio.Future[None]) -> None:
+        if not future.cancelled() and (e := future.exception()):
+            logger.warning(f"Background refresh of {self.kind} cache failed: {e}")
 
     def _entity_to_domain(self, entity: datastore.Entity) -> T:
         """Must be implemented by subclasses."""
         raise NotImplementedError
 
+    def _build(self, model_class: type[R], data: dict) -> R:
+        """Builds a model from a decoded row, validating it unless trusted."""
+        if self.trusted_decode:
+            return build_trusted(model_class, data)
+        return model_class(**data)
+
     def _domain_to_entity(self, model: T, key: datastore.Key) -> datastore.Entity:
         """Default implementation using model_dump."""
         entity = datastore.Entity(key=key)
@@ -43,40 +426,337 @@ class DatastoreRepository(Generic[T]):
         return entity
 
     async def load(self, entity_id: str | int) -> T | None:
+        if self._keys is None:
+            return await self._load_key(entity_id)
+
+        tried: list[str | int] = []
+        while forms := [f for f in self._keys.candidates(entity_id) if f not in tried]:
+            tried.append(forms[0])
+            if (model := await self._load_key(forms[0])) is not None:
+                self._keys.found(entity_id, forms[0])
+                return model
+            self._keys.missed(entity_id, forms[0])
+        return None
+
+    async def _load_key(self, entity_id: str | int) -> T | None:
+        uow = current_unit_of_work()
+        if uow is not None:
+            found, model = uow.get(self.kind, entity_id)
+            if found:
+                return cast(T | None, model)
+
         def _get():
             key = self.get_key(entity_id)
             entity = self.client.get(key)
             return self._entity_to_domain(entity) if entity else None
 
-        return await asyncio.to_thread(_get)
+        model = await self._run("get", _get)
+        if uow is not None:
+            uow.register(self.kind, entity_id, model)
+        return model
 
     async def load_all(self) -> list[T]:
-        if not self._cache:
+        if (cached := await self._cached_models()) is not None:
+            return cached
 
-            def _fetch():
-                query = self.client.query(kind=self.kind)
-                return [self._entity_to_domain(entity) for entity in query.fetch()]
+        # Single flight: a burst of callers on a cold cache awaits one scan
+        # instead of each launching its own.
+        loading = self._start_loading()
+        # Shielded so a cancelled caller doesn't cancel everybody else's scan
+        await asyncio.shield(loading)
+        return list(self._cache.values())
 
-            self._cache = await asyncio.to_thread(_fetch)
-        return self._cache
+    def _loading_done(self, future: asyncio.Future[None]) -> None:
+        if self._loading is future:
+            self._loading = None
 
-    async def save(self, model: T) -> None:
+    async def _fetch_all(self) -> None:
+        from_snapshot = None
+        if self.snapshot is not None and not self._snapshot_tried:
+            self._snapshot_tried = True
+            from_snapshot = await self._load_snapshot()
+
+        if from_snapshot is not None:
+            self._generation, cache = from_snapshot
+        else:
+            self._generation, cache = await self._scan()
+        # The scan may have read entities from before our own concurrent writes
+        for entity_id, model in self._writes_during_load.items():
+            if model is None:
+                cache.pop(entity_id, None)
+            else:
+                cache[entity_id] = model
+        self._writes_during_load = {}
+        self._cache = self._as_cache(cache)
+        self._generation_checked_at = self._loaded_at = time.monotonic()
+        self._cache_loaded = True
+
+        if from_snapshot is not None:
+            self._snapshot_version_written = self._snapshot_version()
+            self._reconciling = asyncio.ensure_future(self._reconcile_snapshot())
+        else:
+            self._schedule_snapshot()
+
+    async def _scan(self) -> tuple[int, dict[str | int, T]]:
+        def _fetch():
+            # Read the generation first: anything written during the scan
+            # will show up as a newer generation on the next check.
+            generation = 0
+            if self.generation_check_interval is not None:
+                generation, _ = self._read_generation()
+            query = self.client.query(kind=self.kind)
+            return generation, {
+                key_id(entity.key): self._entity_to_domain(entity)
+                for entity in query.fetch()
+            }
+
+        return await self._run(
+            "scan",
+            _fetch,
+            timeout=datastore_executor.scan_timeout,
+            count=lambda r: len(r[1]),
+        )
+
+    async def _load_snapshot(self) -> tuple[int, dict[str | int, T]] | None:
+        snapshot = cast(CacheSnapshot[T], self.snapshot)
+        try:
+            loaded = await asyncio.to_thread(snapshot.load)
+        except Exception as e:
+            logger.warning(f"Could not read {self.kind} snapshot: {e}")
+            return None
+        if loaded is None:
+            return None
+        generation, models = loaded
+        logger.info(f"Loaded {len(models)} {self.kind} from snapshot")
+        return generation, {getattr(m, "id"): m for m in models}
+
+    async def _reconcile_snapshot(self) -> None:
+        """Catches a cache loaded from a snapshot up with Datastore."""
+        if self._loading is not None:
+            await asyncio.wait([self._loading])
+        if self.generation_check_interval is None:
+            self._revalidate()
+            return
+        # Force the check regardless of the interval
+        self._generation_checked_at = float("-inf")
+        await self._refresh_if_stale(rescan_if_behind=True)
+
+    def _snapshot_version(self) -> object:
+        """Changes whenever the cache changes in a way worth a new snapshot.
+
+        The snapshot isn't rewritten while it stays the same. ``None`` (the
+        default) rewrites it after every change.
+        """
+        return None
+
+    def _schedule_snapshot(self) -> None:
+        """Rewrites the snapshot soon, coalescing changes that come meanwhile."""
+        if self.snapshot is None or self._snapshot_pending is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._snapshot_pending = loop.create_task(self._write_snapshot())
+
+    async def _write_snapshot(self) -> None:
+        snapshot = cast(CacheSnapshot[T], self.snapshot)
+        try:
+            await asyncio.sleep(SNAPSHOT_WRITE_DELAY)
+        finally:
+            # Changes from here on schedule the next write
+            self._snapshot_pending = None
+        if not self._cache_loaded:
+            return
+        version = self._snapshot_version()
+        if version is not None and version == self._snapshot_version_written:
+            return
+        generation, models = self._generation, list(self._cache.values())
+        try:
+            if not await asyncio.to_thread(snapshot.save, generation, models):
+                logger.info(f"Kept the newer {self.kind} snapshot of another instance")
+        except Exception as e:
+            logger.warning(f"Could not write {self.kind} snapshot: {e}")
+            return
+        self._snapshot_version_written = version
+
+    def _build_entity(self, model: T) -> datastore.Entity:
         # Pydantic models might have an 'id' attribute
         entity_id = getattr(model, "id", None)
+        if entity_id:
+            key = self.get_key(entity_id)
+        else:
+            key = self.client.key(self.kind)
+        return self._domain_to_entity(model, key)
 
-        def _put():
-            if entity_id:
-                key = self.get_key(entity_id)
-            else:
-                key = self.client.key(self.kind)
+    def _saved_id(self, model: T, entity: datastore.Entity) -> str | int | None:
+        """Returns the id a model was stored under, assigning new ones."""
+        entity_id = getattr(model, "id", None)
+        # If it was a new entity, update the model ID if possible
+        if not entity_id and entity.key and entity.key.id:
+            if hasattr(model, "id"):
+                setattr(model, "id", entity.key.id)
+            return entity.key.id
+        return entity_id
 
-            entity = self._domain_to_entity(model, key)
+    async def save(self, model: T) -> None:
+        entity_id = getattr(model, "id", None)
+        if entity_id and (uow := current_unit_of_work()) is not None:
+            # Deferred to the unit's flush. New entities are written right
+            # away since callers may need the id Datastore assigns.
+            uow.register_dirty(self, entity_id, model)
+            return
+
+        def _put() -> str | int | None:
+            entity = self._build_entity(model)
             self.client.put(entity)
+            return self._saved_id(model, entity)
+
+        saved_id = await self._run("put", _put, count=_one)
+        self._cache_put(saved_id, model)
+        await self._bump_generation(saved_id)
+
+    async def iter_pages(
+        self, page_size: int = MAX_BATCH_SIZE
+    ) -> AsyncIterator[list[T]]:
+        """Streams every entity of the kind in pages of up to ``page_size``,
+        one query page per call, without loading the kind into the cache."""
+        cursor: bytes | None = None
+        while True:
+
+            def _page(
+                start_cursor: bytes | None = cursor,
+            ) -> tuple[list[T], bytes | None]:
+                query = self.client.query(kind=self.kind)
+                iterator = query.fetch(start_cursor=start_cursor, limit=page_size)
+                page = next(iterator.pages, None)
+                models = [self._entity_to_domain(e) for e in page or []]
+                return models, iterator.next_page_token
+
+            models, cursor = await self._query(
+                "page", _page, count=lambda result: len(result[0])
+            )
+            if models:
+                yield models
+            if cursor is None or len(models) < page_size:
+                return
+
+    async def load_many(self, entity_ids: Sequence[str | int]) -> list[T]:
+        """Loads several entities in batched lookups, in the order requested.
+
+        Missing entities are skipped.
+        """
+        if not entity_ids:
+            return []
+
+        def _get_multi() -> dict[str | int, T]:
+            found: dict[str | int, T] = {}
+            for chunk in _chunks(list(entity_ids)):
+                entities = self.client.get_multi([self.get_key(i) for i in chunk])
+                for entity in entities:
+                    found[key_id(entity.key)] = self._entity_to_domain(entity)
+            return found
+
+        found = await self._run("get_multi", _get_multi)
+        return [found[i] for i in entity_ids if i in found]
+
+    async def save_many(self, models: Sequence[T]) -> None:
+        """Saves several models with batched puts."""
+        if not models:
+            return
+
+        def _put_multi() -> list[str | int | None]:
+            entities = [self._build_entity(model) for model in models]
+            for chunk in _chunks(entities):
+                self.client.put_multi(chunk)
+            return [
+                self._saved_id(model, entity) for model, entity in zip(models, entities)
+            ]
+
+        saved_ids = await self._run("put_multi", _put_multi)
+        uow = current_unit_of_work()
+        for saved_id, model in zip(saved_ids, models):
+            self._cache_put(saved_id, model)
+            if uow is not None and saved_id is not None:
+                uow.register(self.kind, saved_id, model)
+        await self._bump_generation(*saved_ids)
+
+    async def increment_many(
+        self, deltas: Mapping[str | int, Mapping[str, int]]
+    ) -> None:
+        """Adds ``deltas[id][field]`` to each entity's integer fields.
+
+        Each batch is read and written in one transaction, so increments from
+        other instances in between are never lost. Missing entities are
+        skipped. If a batch fails, the batches before it stay committed and
+        ``IncrementError`` carries the increments of the rest.
+
+        Counters don't change which entities queries return, so increments
+        don't bump the generation: other instances pick them up on their
+        next ``refresh_after`` scan instead of rescanning for every flush.
+        """
+        if not deltas:
+            return
+        # Earlier edits in this unit are written first; the increments read
+        # the entities afterwards, so neither overwrites the other
+        await self._write_pending()
+
+        def _increment(chunk: list[str | int]) -> list[tuple[str | int | None, T]]:
+            with self.client.transaction():
+                entities = self.client.get_multi([self.get_key(i) for i in chunk])
+                for entity in entities:
+                    for field, delta in deltas[key_id(entity.key)].items():
+                        entity[field] = entity.get(field, 0) + delta
+                self.client.put_multi(entities)
+            return [(key_id(e.key), self._entity_to_domain(e)) for e in entities]
+
+        ids = list(deltas)
+        applied = 0
+        updated: list[tuple[str | int | None, T]] = []
+        error: IncrementError | None = None
+        for chunk in _chunks(ids):
+            try:
+                updated += await self._run(
+                    "increment_multi", partial(_increment, chunk)
+                )
+            except Exception as e:
+                # A batch that timed out may still commit; it's reported as
+                # not applied all the same
+                error = IncrementError({i: deltas[i] for i in ids[applied:]})
+                error.__cause__ = e
+                break
+            applied += len(chunk)
+
+        uow = current_unit_of_work()
+        for entity_id, model in updated:
+            self._cache_put(entity_id, model)
+            if uow is not None and entity_id is not None:
+                uow.register(self.kind, entity_id, model)
+        if error is not None:
+            raise error
+
+    async def delete_many(self, entity_ids: Sequence[str | int]) -> None:
+        """Deletes several entities with batched deletes."""
+        if not entity_ids:
+            return
+
+        def _delete_multi():
+            for chunk in _chunks(list(entity_ids)):
+                self.client.delete_multi([self.get_key(i) for i in chunk])
+
+        await self._run("delete_multi", _delete_multi, count=lambda _: len(entity_ids))
+        uow = current_unit_of_work()
+        for entity_id in entity_ids:
+            self._cache_pop(entity_id)
+            if uow is not None:
+                uow.forget(self.kind, entity_id)
+        await self._bump_generation(*entity_ids)
+
+
+def _one(_: object) -> int:
+    return 1
 
-            # If it was a new entity, update the model ID if possible
-            if not entity_id and entity.key and entity.key.id:
-                if hasattr(model, "id"):
-                    setattr(model, "id", entity.key.id)
 
-        await asyncio.to_thread(_put)
-        self.clear_cache()
+def _chunks(items: list[K]) -> Iterator[list[K]]:
+    for start in range(0, len(items), MAX_BATCH_SIZE):
+        yield items[start : start + MAX_BATCH_SIZE]
@@ -1,6 +1,10 @@
+import asyncio
+import time
 import pytest
 from unittest.mock import MagicMock, patch
-from infrastructure.datastore.base import DatastoreRepository
+from pydantic import BaseModel, ValidationError
+from infrastructure.datastore.base import DatastoreRepository, build_trusted, key_id
+from infrastructure.protocols import IncrementError
 
 
 @pytest.mark.asyncio
@@ -23,3 +27,478 @@ async def test_datastore_repository_delete():
         mock_client_instance.delete.assert_called_once_with(
             mock_client_instance.key.return_value
         )
+
+
+class _Item(BaseModel):
+    id: int | None = None
+    text: str = ""
+
+
+class _ItemRepository(DatastoreRepository[_Item]):
+    def _entity_to_domain(self, entity):
+        return _Item(id=entity.key.id_or_name, text=entity["text"])
+
+
+def _mock_entity(entity_id: int, text: str) -> MagicMock:
+    entity = MagicMock()
+    entity.key.id_or_name = entity_id
+    entity.key.flat_path = ("Item", entity_id)
+    entity.__getitem__.side_effect = {"text": text}.__getitem__
+    return entity
+
+
+@pytest.mark.asyncio
+async def test_save_and_delete_write_through_cache():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.query.return_value.fetch.return_value = [
+            _mock_entity(1, "uno"),
+            _mock_entity(2, "dos"),
+        ]
+
+        repo = _ItemRepository(kind="Item")
+        assert [i.text for i in await repo.load_all()] == ["uno", "dos"]
+
+        await repo.save(_Item(id=1, text="uno editado"))
+        await repo.save(_Item(id=3, text="tres"))
+        await repo.delete(2)
+
+        items = await repo.load_all()
+        assert [i.text for i in items] == ["uno editado", "tres"]
+        mock_client.query.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_save_does_not_warm_cold_cache():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.query.return_value.fetch.return_value = [_mock_entity(1, "uno")]
+
+        repo = _ItemRepository(kind="Item")
+        await repo.save(_Item(id=5, text="cinco"))
+
+        items = await repo.load_all()
+        assert [i.text for i in items] == ["uno"]
+
+
+@pytest.mark.asyncio
+async def test_generation_change_patches_only_missed_entities():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.get.return_value = {"generation": 3, "recent_ids": []}
+        mock_client.query.return_value.fetch.return_value = [
+            _mock_entity(1, "uno"),
+            _mock_entity(2, "dos"),
+        ]
+
+        repo = _ItemRepository(kind="Item", generation_check_interval=0)
+        await repo.load_all()
+
+        # Another instance edited 2 and deleted 1
+        mock_client.get.return_value = {"generation": 5, "recent_ids": [7, 2, 1]}
+        mock_client.get_multi.return_value = [_mock_entity(2, "dos editado")]
+
+        items = await repo.load_all()
+        assert [i.text for i in items] == ["dos editado"]
+        mock_client.query.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_generation_too_far_behind_rescans():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.get.return_value = {"generation": 3, "recent_ids": []}
+        mock_client.query.return_value.fetch.return_value = [_mock_entity(1, "uno")]
+
+        repo = _ItemRepository(kind="Item", generation_check_interval=0)
+        await repo.load_all()
+
+        mock_client.get.return_value = {"generation": 90, "recent_ids": [1]}
+        await repo.load_all()
+
+        assert mock_client.query.call_count == 2
+        assert repo._generation == 90
+
+
+@pytest.mark.asyncio
+async def test_generation_too_far_behind_keeps_serving_while_revalidating():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.get.return_value = {"generation": 3, "recent_ids": []}
+        mock_client.query.return_value.fetch.side_effect = [
+            [_mock_entity(1, "uno")],
+            [_mock_entity(1, "uno"), _mock_entity(2, "dos")],
+        ]
+
+        repo = _ItemRepository(
+            kind="Item", generation_check_interval=0, refresh_after=600
+        )
+        await repo.load_all()
+
+        mock_client.get.return_value = {"generation": 90, "recent_ids": [1]}
+        # Still answered from the cache, without waiting for the scan
+        assert [i.text for i in await repo.load_all()] == ["uno"]
+        assert repo._cache_loaded
+
+        await repo._loading
+        assert [i.text for i in await repo.load_all()] == ["uno", "dos"]
+        assert repo._generation == 90
+
+
+@pytest.mark.asyncio
+async def test_save_bumps_generation():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.get.return_value = {"generation": 3, "recent_ids": [1]}
+        mock_client.query.return_value.fetch.return_value = []
+
+        repo = _ItemRepository(kind="Item", generation_check_interval=60)
+        await repo.load_all()
+        await repo.save(_Item(id=4, text="cuatro"))
+
+        generation_entity = mock_client.put.call_args_list[-1].args[0]
+        assert generation_entity == {"generation": 4, "recent_ids": [1, 4]}
+        # We were in sync, so our own write doesn't force a refresh
+        assert repo._generation == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_bump_is_retried_as_unaddressable():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        # A fresh entity per read, as the aborted transaction left it
+        mock_client.get.side_effect = lambda key: {"generation": 3, "recent_ids": [1]}
+        mock_client.query.return_value.fetch.return_value = []
+        # The entity's put, then the bump's (contention), then the retry's
+        mock_client.put.side_effect = [None, RuntimeError("contention"), None]
+
+        repo = _ItemRepository(kind="Item", generation_check_interval=60)
+        await repo.load_all()
+        await repo.save(_Item(id=4, text="cuatro"))
+
+        generation_entity = mock_client.put.call_args_list[-1].args[0]
+        # Readers behind can't patch from recent_ids, so they rescan
+        assert generation_entity == {"generation": 4, "recent_ids": []}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cold_load_all_share_one_scan():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+
+        def _slow_fetch():
+            time.sleep(0.05)
+            return [_mock_entity(1, "uno")]
+
+        mock_client.query.return_value.fetch.side_effect = _slow_fetch
+
+        repo = _ItemRepository(kind="Item")
+        results = await asyncio.gather(*(repo.load_all() for _ in range(20)))
+
+        assert all([i.text for i in r] == ["uno"] for r in results)
+        mock_client.query.return_value.fetch.assert_called_once()
+        assert repo._loading is None
+
+
+@pytest.mark.asyncio
+async def test_failed_scan_is_not_shared_with_later_callers():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.query.return_value.fetch.side_effect = [
+            RuntimeError("boom"),
+            [_mock_entity(1, "uno")],
+        ]
+
+        repo = _ItemRepository(kind="Item")
+        with pytest.raises(RuntimeError):
+            await repo.load_all()
+
+        assert [i.text for i in await repo.load_all()] == ["uno"]
+
+
+@pytest.mark.asyncio
+async def test_stale_cache_is_served_while_revalidating():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.query.return_value.fetch.side_effect = [
+            [_mock_entity(1, "uno")],
+            [_mock_entity(1, "uno"), _mock_entity(2, "dos")],
+        ]
+
+        repo = _ItemRepository(kind="Item", refresh_after=0)
+        await repo.load_all()
+
+        # Stale: both callers get the old list straight away, one refresh runs
+        first = await repo.load_all()
+        second = await repo.load_all()
+        assert [i.text for i in first] == ["uno"]
+        assert [i.text for i in second] == ["uno"]
+
+        assert repo._loading is not None
+        await repo._loading
+        assert mock_client.query.return_value.fetch.call_count == 2
+        assert [i.text for i in repo._cache.values()] == ["uno", "dos"]
+
+
+@pytest.mark.asyncio
+async def test_writes_during_scan_survive_it():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+
+        def _slow_fetch():
+            time.sleep(0.05)
+            return [_mock_entity(1, "uno viejo")]
+
+        mock_client.query.return_value.fetch.side_effect = _slow_fetch
+
+        repo = _ItemRepository(kind="Item")
+        loading = asyncio.ensure_future(repo.load_all())
+        await asyncio.sleep(0)
+        await repo.save(_Item(id=1, text="uno nuevo"))
+
+        assert [i.text for i in await loading] == ["uno nuevo"]
+
+
+@pytest.mark.asyncio
+async def test_batch_methods_chunk_and_keep_cache_in_sync():
+    with (
+        patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client,
+        patch("infrastructure.datastore.base.MAX_BATCH_SIZE", 2),
+    ):
+        mock_client = mock_get_client.return_value
+        mock_client.query.return_value.fetch.return_value = [_mock_entity(1, "uno")]
+        mock_client.get_multi.side_effect = lambda keys: [
+            _mock_entity(i, f"item {i}") for i in (3, 1) if len(keys) == 2
+        ]
+
+        repo = _ItemRepository(kind="Item")
+        await repo.load_all()
+
+        loaded = await repo.load_many([1, 2, 3])
+        assert [i.id for i in loaded] == [1, 3]
+        assert mock_client.get_multi.call_count == 2
+
+        await repo.save_many([_Item(id=i, text=f"nuevo {i}") for i in (1, 2, 3)])
+        assert mock_client.put_multi.call_count == 2
+        assert [i.text for i in await repo.load_all()] == [
+            "nuevo 1",
+            "nuevo 2",
+            "nuevo 3",
+        ]
+
+        await repo.delete_many([1, 3])
+        mock_client.delete_multi.assert_called_once()
+        assert [i.id for i in await repo.load_all()] == [2]
+        mock_client.query.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_calls_and_cache_lookups_are_recorded():
+    from infrastructure.datastore.metrics import datastore_metrics
+
+    datastore_metrics.reset()
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.query.return_value.fetch.return_value = [
+            _mock_entity(1, "uno"),
+            _mock_entity(2, "dos"),
+        ]
+
+        repo = _ItemRepository(kind="MeteredItem")
+        await repo.load_all()
+        await repo.load_all()
+        await repo.save(_Item(id=1, text="uno editado"))
+
+    stats = datastore_metrics.snapshot()["kinds"]["MeteredItem"]
+    assert stats["operations"]["scan"]["calls"] == 1
+    assert stats["operations"]["scan"]["entities"] == 2
+    assert stats["operations"]["put"]["entities"] == 1
+    assert stats["cache"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+
+@pytest.mark.asyncio
+async def test_warm_start_from_snapshot_reconciles_in_background(tmp_path):
+    from infrastructure.datastore.snapshot import CacheSnapshot, LocalSnapshotStore
+
+    snapshot = CacheSnapshot(LocalSnapshotStore(str(tmp_path)), _Item, "Item")
+    snapshot.save(3, [_Item(id=1, text="uno"), _Item(id=2, text="dos")])
+
+    with (
+        patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client,
+        patch("infrastructure.datastore.base.SNAPSHOT_WRITE_DELAY", 0),
+    ):
+        mock_client = mock_get_client.return_value
+        # One write happened after the snapshot was taken
+        mock_client.get.return_value = {"generation": 4, "recent_ids": [2]}
+        mock_client.get_multi.return_value = [_mock_entity(2, "dos editado")]
+
+        repo = _ItemRepository(
+            kind="Item", generation_check_interval=60, snapshot=snapshot
+        )
+        assert [i.text for i in await repo.load_all()] == ["uno", "dos"]
+        await repo._reconciling
+
+        assert [i.text for i in await repo.load_all()] == ["uno", "dos editado"]
+        mock_client.query.assert_not_called()
+
+        # Local changes rewrite the snapshot
+        await repo.save(_Item(id=3, text="tres"))
+        await asyncio.gather(
+            *(t for t in asyncio.all_tasks() if t is not asyncio.current_task())
+        )
+
+    generation, models = snapshot.load()
+    # Never newer than the content, or readers would skip reconciling it
+    assert generation <= repo._generation == 5
+    assert [m.text for m in models] == ["uno", "dos editado", "tres"]
+
+
+def test_trusted_build_matches_validated_model():
+    repo = _ItemRepository(kind="Item")
+    data = {"id": 1, "text": "uno", "legacy_property": "x"}
+
+    trusted = repo._build(_Item, data)
+    assert trusted == _Item(**data) == build_trusted(_Item, data)
+    assert trusted.model_dump() == {"id": 1, "text": "uno"}
+    # Missing fields get their defaults
+    assert build_trusted(_Item, {"id": 2}).text == ""
+
+
+def test_untrusted_build_validates():
+    repo = _ItemRepository(kind="Item")
+    repo.trusted_decode = False
+
+    with pytest.raises(ValidationError):
+        repo._build(_Item, {"id": "not a number"})
+
+
+def test_key_id_reads_flat_path():
+    assert key_id(MagicMock(flat_path=("Parent", 1, "Item", "abc"))) == "abc"
+    # Incomplete key
+    assert key_id(MagicMock(flat_path=("Item",))) is None
+
+
+class _Entity(dict):
+    def __init__(self, entity_id: int, **values):
+        super().__init__(values)
+        self.key = MagicMock(flat_path=("Item", entity_id))
+
+
+@pytest.mark.asyncio
+async def test_increment_many_reads_and_writes_in_transactions():
+    with (
+        patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client,
+        patch("infrastructure.datastore.base.MAX_BATCH_SIZE", 2),
+    ):
+        mock_client = mock_get_client.return_value
+        stored = {i: _Entity(i, count=10) for i in (1, 2, 3)}
+        # Keys are the ids themselves here
+        mock_client.key.side_effect = lambda kind, i: i
+        mock_client.get_multi.side_effect = lambda keys: [
+            stored[i] for i in keys if i in stored
+        ]
+        mock_client.query.return_value.fetch.return_value = list(stored.values())
+
+        class _Counted(_ItemRepository):
+            def _entity_to_domain(self, entity):
+                return _Item(id=key_id(entity.key), text=str(entity["count"]))
+
+        repo = _Counted(kind="Item")
+        await repo.load_all()
+        await repo.increment_many({1: {"count": 2}, 3: {"count": 1}, 4: {"count": 1}})
+
+        # One transaction per batch; the missing entity is skipped
+        assert mock_client.transaction.call_count == 2
+        assert [stored[i]["count"] for i in (1, 2, 3)] == [12, 10, 11]
+        assert [i.text for i in await repo.load_all()] == ["12", "10", "11"]
+
+
+@pytest.mark.asyncio
+async def test_increment_many_reports_batches_not_applied():
+    with (
+        patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client,
+        patch("infrastructure.datastore.base.MAX_BATCH_SIZE", 2),
+    ):
+        mock_client = mock_get_client.return_value
+        stored = {i: _Entity(i, count=10) for i in (1, 2, 3)}
+        mock_client.key.side_effect = lambda kind, i: i
+        mock_client.get_multi.side_effect = lambda keys: [
+            stored[i] for i in keys if i in stored
+        ]
+        # The second batch's commit fails
+        mock_client.put_multi.side_effect = [None, RuntimeError("contention")]
+
+        class _Counted(_ItemRepository):
+            def _entity_to_domain(self, entity):
+                return _Item(id=key_id(entity.key), text=str(entity["count"]))
+
+        repo = _Counted(kind="Item")
+        with pytest.raises(IncrementError) as exc_info:
+            await repo.increment_many(
+                {1: {"count": 1}, 2: {"count": 1}, 3: {"count": 1}}
+            )
+
+        assert exc_info.value.pending == {3: {"count": 1}}
+        assert isinstance(exc_info.value.__cause__, RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_counter_flushes_dont_make_other_instances_rescan():
+    from infrastructure.counters import CounterBuffer
+
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        stored = {i: _Entity(i, count=0) for i in range(1, 81)}
+        mock_client.key.side_effect = lambda kind, i: i
+        mock_client.get_multi.side_effect = lambda keys: [
+            stored[i] for i in keys if i in stored
+        ]
+        mock_client.query.return_value.fetch.return_value = list(stored.values())
+        # Bumps update this entity in place, as other instances would see it
+        mock_client.get.return_value = {"generation": 3, "recent_ids": []}
+
+        class _Counted(_ItemRepository):
+            def _entity_to_domain(self, entity):
+                return _Item(id=key_id(entity.key), text=str(entity["count"]))
+
+        reader = _Counted(kind="Item", generation_check_interval=0)
+        writer = _Counted(kind="Item", generation_check_interval=60)
+        await reader.load_all()
+
+        counters = CounterBuffer(flush_interval=60)
+        for i in stored:
+            counters.add(writer, i, count=1)
+        await counters.flush()
+        await counters.stop()
+
+        assert all(entity["count"] == 1 for entity in stored.values())
+        await reader.load_all()
+        assert reader._generation == 3
+        mock_client.query.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_follows_cursors():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        pages = {
+            None: ([_Entity(1, text="uno"), _Entity(2, text="dos")], b"c1"),
+            b"c1": ([_Entity(3, text="tres")], None),
+        }
+
+        def fetch(start_cursor=None, limit=None):
+            entities, token = pages[start_cursor]
+            return MagicMock(pages=iter([entities]), next_page_token=token)
+
+        mock_client.query.return_value.fetch.side_effect = fetch
+
+        class _Texts(_ItemRepository):
+            def _entity_to_domain(self, entity):
+                return _Item(id=key_id(entity.key), text=entity["text"])
+
+        repo = _Texts(kind="Item")
+        result = [[i.text for i in page] async for page in repo.iter_pages(2)]
+
+        assert result == [["uno", "dos"], ["tres"]]
+        # Streaming doesn't fill the cache
+        assert not repo._cache_loaded
@@ -0,0 +1,375 @@
+"""Columnar, read-optimised storage for the phrase catalogue.
+
+Every instance keeps the whole catalogue in memory. As full ``Phrase`` models
+that costs a dict, a set, several boxed ints and a datetime per phrase; here
+each field is a column instead: texts are interned, counters and timestamps
+live in arrays, and author/chat ids share one object per value. The
+normalized text searches match against is computed once per write, and a
+trigram index over it narrows a search, or a fuzzy duplicate lookup, down to a
+few candidate rows. Models are
+materialised only for the rows a caller gets back, and each call gets its own
+copies, so mutating one never touches the catalogue until it's saved. A
+``CataloguePool`` defers even that to each item read, so drawing k random
+phrases costs k materialisations however many match.
+
+``PhraseCatalogue`` is a mapping of id -> model, so it stands in for the
+phrase repositories' cache dict.
+"""
+
+import itertools
+import math
+import sys
+from array import array
+from collections.abc import Iterator, MutableMapping, Sequence
+from datetime import datetime, timezone
+from typing import Any, Generic, TypeVar
+
+from models.phrase import Phrase
+from infrastructure.filters import EMPTY, paginate
+from infrastructure.similarity import best_match, probe, trigrams
+from utils import normalize_str
+
+P = TypeVar("P", bound=Phrase)
+
+_FIELDS = tuple(Phrase.model_fields)
+
+_new_model = object.__new__
+_set_attr = object.__setattr__
+_from_timestamp = datetime.fromtimestamp
+
+# Shared by every catalogue, so a version also tells catalogues apart
+_versions = itertools.count(1)
+
+
+class TrigramIndex:
+    """Rows containing each trigram of their (normalized) text.
+
+    Postings are append-only arrays of rows. A row whose text changes or is
+    deleted leaves stale entries behind, which the containment check every
+    search does anyway filters out; once stale entries outnumber live ones
+    the owner rebuilds the index.
+    """
+
+    # Don't bother rebuilding for fewer stale entries than this
+    MIN_STALE_TO_REBUILD = 4096
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        self._postings: dict[str, array] = {}
+        self._entries = 0
+        self._stale = 0
+
+    def add(self, row: int, text: str) -> None:
+        postings = self._postings
+        grams = trigrams(text)
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("I")
+            posting.append(row)
+        self._entries += len(grams)
+
+    def discard(self, text: str) -> None:
+        self._stale += len(trigrams(text))
+
+    def needs_rebuild(self) -> bool:
+        return (
+            self._stale >= self.MIN_STALE_TO_REBUILD and self._stale * 2 > self._entries
+        )
+
+    def posting(self, gram: str) -> Sequence[int]:
+        return self._postings.get(gram, ())
+
+    def candidates(self, text: str) -> Sequence[int] | None:
+        """Rows that may contain ``text``: the shortest posting list among its
+        trigrams. None if ``text`` is too short to use the index."""
+        if len(text) < 3:
+            return None
+        shortest: Sequence[int] | None = None
+        for gram in trigrams(text):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return ()
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+        return shortest
+
+
+class PhraseCatalogue(MutableMapping[Any, P], Generic[P]):
+    def __init__(self, model_class: type[P]):
+        self.model_class = model_class
+        # id -> row, in insertion order like the dict it replaces
+        self._rows: dict[Any, int] = {}
+        self._free: list[int] = []
+        self._ids: list[Any] = []
+        self._texts: list[str] = []
+        self._normalized_texts: list[str] = []
+        self._sticker_file_ids: list[str] = []
+        self._proposal_ids: list[str] = []
+        self._user_ids: list[str | int] = []
+        self._chat_ids: list[str | int] = []
+        self._usages = array("q")
+        self._audio_usages = array("q")
+        self._sticker_usages = array("q")
+        self._scores = array("q")
+        # Epoch seconds, NaN for None. Naive datetimes (only ever built
+        # in-process; Datastore returns UTC) are kept as they are.
+        self._created_at = array("d")
+        self._naive_created_at: dict[int, datetime] = {}
+        # One shared object per distinct author/chat id
+        self._pool: dict[tuple[type, Any], Any] = {}
+        # Insertion order of each row's id, to return index hits in order
+        self._seq = array("q")
+        self._next_seq = 0
+        self._index = TrigramIndex()
+        # Live rows in id order, kept between inserts and deletes
+        self._live_rows: list[int] | None = None
+        # Changes whenever which phrases a search matches may change
+        self.version = next(_versions)
+
+    @classmethod
+    def from_models(
+        cls, model_class: type[P], models: dict[Any, P]
+    ) -> "PhraseCatalogue[P]":
+        catalogue = cls(model_class)
+        for entity_id, model in models.items():
+            catalogue[entity_id] = model
+        return catalogue
+
+    def _share(self, value: Any) -> Any:
+        # Keyed by type too, so 1 and "1" (or 1 and True) stay apart
+        return self._pool.setdefault((type(value), value), value)
+
+    def _append_row(self) -> int:
+        for column in (
+            self._ids,
+            self._texts,
+            self._normalized_texts,
+            self._sticker_file_ids,
+            self._proposal_ids,
+            self._user_ids,
+            self._chat_ids,
+        ):
+            column.append(None)
+        for counter in (
+            self._usages,
+            self._audio_usages,
+            self._sticker_usages,
+            self._scores,
+        ):
+            counter.append(0)
+        self._created_at.append(math.nan)
+        self._seq.append(0)
+        return len(self._ids) - 1
+
+    def _write(self, row: int, entity_id: Any, model: P) -> None:
+        self._ids[row] = entity_id
+        self._texts[row] = sys.intern(model.text)
+        old_normalized = self._normalized_texts[row]
+        normalized = self._normalized_texts[row] = sys.intern(model.normalized_text)
+        if normalized != old_normalized:
+            if old_normalized:
+                self._index.discard(old_normalized)
+            self._index.add(row, normalized)
+            self.version = next(_versions)
+        self._sticker_file_ids[row] = model.sticker_file_id
+        self._proposal_ids[row] = model.proposal_id
+        self._user_ids[row] = self._share(model.user_id)
+        self._chat_ids[row] = self._share(model.chat_id)
+        self._usages[row] = model.usages or 0
+        self._audio_usages[row] = model.audio_usages or 0
+        self._sticker_usages[row] = model.sticker_usages or 0
+        self._scores[row] = model.score or 0
+        self._naive_created_at.pop(row, None)
+        created_at = model.created_at
+        if created_at is None:
+            self._created_at[row] = math.nan
+        elif created_at.tzinfo is None:
+            self._naive_created_at[row] = created_at
+            self._created_at[row] = math.nan
+        else:
+            self._created_at[row] = created_at.timestamp()
+
+    def _materialize(self, row: int) -> P:
+        timestamp = self._created_at[row]
+        if timestamp != timestamp:  # NaN
+            created_at = self._naive_created_at.get(row)
+        else:
+            created_at = _from_timestamp(timestamp, timezone.utc)
+        # Built like a trusted decode: every field is set, nothing validated
+        model = _new_model(self.model_class)
+        _set_attr(
+            model,
+            "__dict__",
+            {
+                "id": self._ids[row],
+                "text": self._texts[row],
+                "sticker_file_id": self._sticker_file_ids[row],
+                "usages": self._usages[row],
+                "audio_usages": self._audio_usages[row],
+                "sticker_usages": self._sticker_usages[row],
+                "score": self._scores[row],
+                "user_id": self._user_ids[row],
+                "chat_id": self._chat_ids[row],
+                "created_at": created_at,
+                "proposal_id": self._proposal_ids[row],
+                # Primes the model's cached property
+                "normalized_text": self._normalized_texts[row],
+            },
+        )
+        _set_attr(model, "__pydantic_fields_set__", set(_FIELDS))
+        _set_attr(model, "__pydantic_extra__", None)
+        _set_attr(model, "__pydantic_private__", None)
+        return model
+
+    def __getitem__(self, entity_id: Any) -> P:
+        return self._materialize(self._rows[entity_id])
+
+    def __setitem__(self, entity_id: Any, model: P) -> None:
+        row = self._rows.get(entity_id)
+        if row is None:
+            row = self._free.pop() if self._free else self._append_row()
+            self._rows[entity_id] = row
+            self._live_rows = None
+            self.version = next(_versions)
+            self._seq[row] = self._next_seq
+            self._next_seq += 1
+        self._write(row, entity_id, model)
+        self._maybe_rebuild_index()
+
+    def __delitem__(self, entity_id: Any) -> None:
+        row = self._rows.pop(entity_id)
+        self._live_rows = None
+        self.version = next(_versions)
+        # Release the row's objects and reuse it for the next insert
+        self._ids[row] = None
+        if self._normalized_texts[row]:
+            self._index.discard(self._normalized_texts[row])
+        self._texts[row] = self._normalized_texts[row] = ""
+        self._sticker_file_ids[row] = self._proposal_ids[row] = ""
+        self._naive_created_at.pop(row, None)
+        self._free.append(row)
+        self._maybe_rebuild_index()
+
+    def _maybe_rebuild_index(self) -> None:
+        if not self._index.needs_rebuild():
+            return
+        self._index.clear()
+        normalized = self._normalized_texts
+        for row in self._rows.values():
+            self._index.add(row, normalized[row])
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self._rows
+
+    def values(self) -> list[P]:  # type: ignore[override]
+        materialize = self._materialize
+        return [materialize(row) for row in self._rows.values()]
+
+    def _all_rows(self) -> list[int]:
+        """Live rows in id order. Shared between calls: don't mutate it."""
+        if self._live_rows is None:
+            self._live_rows = list(self._rows.values())
+        return self._live_rows
+
+    def _column(self, field: str) -> Any:
+        return {
+            "id": self._ids,
+            "text": self._texts,
+            "sticker_file_id": self._sticker_file_ids,
+            "usages": self._usages,
+            "audio_usages": self._audio_usages,
+            "sticker_usages": self._sticker_usages,
+            "score": self._scores,
+            "user_id": self._user_ids,
+            "chat_id": self._chat_ids,
+            "proposal_id": self._proposal_ids,
+        }.get(field)
+
+    def _find_rows(self, search: str = "", **filters: Any) -> list[int]:
+        if search:
+            norm_search = normalize_str(search)
+            normalized = self._normalized_texts
+            candidates = self._index.candidates(norm_search)
+            if candidates is None:
+                rows = [r for r in self._all_rows() if norm_search in normalized[r]]
+            else:
+                # Free and stale rows fail the containment check
+                rows = sorted(
+                    {r for r in candidates if norm_search in normalized[r]},
+                    key=self._seq.__getitem__,
+                )
+        else:
+            rows = self._all_rows()
+        for field, value in filters.items():
+            if value != EMPTY and not value:
+                continue
+            column = self._column(field)
+            if column is None:
+                # Unknown fields are unset on every phrase
+                rows = rows if value == EMPTY else []
+            elif value == EMPTY:
+                rows = [r for r in rows if not column[r]]
+            else:
+                str_value = str(value)
+                rows = [r for r in rows if str(column[r]) == str_value]
+        return rows
+
+    def find(
+        self, search: str = "", limit: int = 0, offset: int = 0, **filters: Any
+    ) -> list[P]:
+        """``search_text`` + ``filter_phrases`` + ``paginate`` over the columns,
+        materialising only the rows returned."""
+        materialize = self._materialize
+        rows = self._find_rows(search, **filters)
+        return [materialize(r) for r in paginate(rows, limit, offset)]
+
+    def pool(self, search: str = "", **filters: Any) -> "CataloguePool[P]":
+        """The phrases ``find`` would return, materialised only as they're read."""
+        return CataloguePool(self, self._find_rows(search, **filters))
+
+    def find_similar(self, text: str, threshold: int = 0) -> tuple[P | None, int]:
+        """The phrase most similar to ``text`` by ``fuzz.ratio`` and its score;
+        see ``infrastructure.similarity`` for what ``threshold`` guarantees."""
+        query = normalize_str(text)
+        normalized = self._normalized_texts
+        candidates = probe(query, threshold, self._index.posting)
+        if candidates is None:
+            rows = self._all_rows()
+        else:
+            # Postings may hold stale and free rows; score live ones in order
+            ids, live = self._ids, self._rows
+            rows = sorted(
+                (r for r in candidates if live.get(ids[r]) == r),
+                key=self._seq.__getitem__,
+            )
+        row, score = best_match(query, ((r, normalized[r]) for r in rows), threshold)
+        if row is None:
+            return None, 0
+        return self._materialize(row), score
+
+
+class CataloguePool(Sequence[P]):
+    """A read-only sequence over some catalogue rows, materialising each phrase
+    as it's read. Meant to be used right away: rows deleted afterwards may
+    be reused by other phrases."""
+
+    def __init__(self, catalogue: PhraseCatalogue[P], rows: list[int]):
+        self._materialize = catalogue._materialize
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self._materialize(r) for r in self._rows[index]]
+        return self._materialize(self._rows[index])
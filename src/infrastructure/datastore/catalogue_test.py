@@ -0,0 +1,196 @@
+import random
+from datetime import datetime, timezone
+
+from models.phrase import LongPhrase, Phrase
+from infrastructure.datastore.catalogue import PhraseCatalogue, TrigramIndex
+from infrastructure.filters import EMPTY, filter_phrases, search_text
+from utils import normalize_str
+
+
+def _phrases() -> dict[int, Phrase]:
+    created = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    return {
+        1: Phrase(
+            id=1, text="Cuñado", usages=3, score=2, user_id=10, created_at=created
+        ),
+        2: Phrase(id=2, text="Máquina", audio_usages=1, user_id="10", chat_id=5),
+        3: Phrase(id=3, text="Fiera", sticker_file_id="abc", proposal_id="p3"),
+    }
+
+
+def test_round_trips_models():
+    phrases = _phrases()
+    catalogue = PhraseCatalogue.from_models(Phrase, phrases)
+
+    assert len(catalogue) == 3
+    assert list(catalogue) == [1, 2, 3]
+    for entity_id, phrase in phrases.items():
+        assert catalogue[entity_id].model_dump() == phrase.model_dump()
+
+
+def test_keeps_naive_datetimes_and_model_class():
+    naive = datetime(2024, 5, 1, 12, 30)
+    catalogue = PhraseCatalogue(LongPhrase)
+    catalogue[7] = LongPhrase(id=7, text="Frase", created_at=naive)
+
+    phrase = catalogue[7]
+    assert isinstance(phrase, LongPhrase)
+    assert phrase.created_at == naive
+    assert phrase.created_at.tzinfo is None
+
+
+def test_returned_models_are_copies():
+    catalogue = PhraseCatalogue.from_models(Phrase, _phrases())
+
+    phrase = catalogue[1]
+    phrase.usages += 10
+    assert catalogue[1].usages == 3
+
+    catalogue[1] = phrase
+    assert catalogue[1].usages == 13
+
+
+def test_delete_reuses_rows_and_keeps_order():
+    catalogue = PhraseCatalogue.from_models(Phrase, _phrases())
+
+    del catalogue[1]
+    assert catalogue.pop(2).text == "Máquina"
+    assert catalogue.pop(2, None) is None
+    catalogue[4] = Phrase(id=4, text="Nuevo")
+
+    assert list(catalogue) == [3, 4]
+    assert [p.text for p in catalogue.values()] == ["Fiera", "Nuevo"]
+    assert catalogue[4].usages == 0
+    assert len(catalogue._ids) == 3
+
+
+def test_find_matches_model_filters():
+    phrases = _phrases()
+    catalogue = PhraseCatalogue.from_models(Phrase, phrases)
+    models = list(phrases.values())
+
+    cases = [
+        ("", {}),
+        ("cunado", {}),
+        ("A", {"user_id": 10}),
+        ("", {"user_id": "10", "chat_id": ""}),
+        ("", {"sticker_file_id": EMPTY}),
+        ("", {"proposal_id": "p3"}),
+        ("", {"unknown": EMPTY}),
+        ("", {"unknown": "x"}),
+    ]
+    for search, filters in cases:
+        expected = filter_phrases(search_text(models, search), filters)
+        found = catalogue.find(search, **filters)
+        assert [p.id for p in found] == [p.id for p in expected], (search, filters)
+
+    assert [p.id for p in catalogue.find(limit=1, offset=1)] == [2]
+
+
+def test_materialized_models_carry_normalized_text():
+    catalogue = PhraseCatalogue.from_models(Phrase, _phrases())
+
+    phrase = catalogue[2]
+    assert phrase.__dict__["normalized_text"] == "maquina"
+    assert [p.id for p in catalogue.find("MÁQ")] == [2]
+
+
+def _scan(catalogue: PhraseCatalogue, search: str) -> list:
+    return [p.id for p in search_text(list(catalogue.values()), search)]
+
+
+def test_trigram_search_matches_scan_through_changes(monkeypatch):
+    # Rebuild often, so rebuilds are exercised too
+    monkeypatch.setattr(TrigramIndex, "MIN_STALE_TO_REBUILD", 8)
+    rng = random.Random(1)
+    words = ["cuñado", "máquina", "fiera", "crack", "jefe", "figura", "torero"]
+    catalogue = PhraseCatalogue(Phrase)
+    searches = ["cuña", "maq", "fiera cr", "ura", "jefe", "xyz", "a", ""]
+
+    for step in range(300):
+        entity_id = rng.randint(1, 40)
+        if rng.random() < 0.25:
+            catalogue.pop(entity_id, None)
+        else:
+            text = " ".join(rng.choices(words, k=rng.randint(1, 3)))
+            catalogue[entity_id] = Phrase(id=entity_id, text=text)
+        if step % 25 == 0:
+            for search in searches:
+                found = [p.id for p in catalogue.find(search)]
+                assert found == _scan(catalogue, search), (step, search)
+
+
+def test_trigram_index_candidates():
+    index = TrigramIndex()
+    index.add(0, "cunado")
+    index.add(1, "cunadomaquina")
+
+    assert index.candidates("un") is None
+    assert sorted(index.candidates("nad")) == [0, 1]
+    assert list(index.candidates("maquina")) == [1]
+    assert list(index.candidates("zzz")) == []
+
+
+def test_find_similar_matches_scan_above_threshold():
+    from fuzzywuzzy import fuzz
+
+    rng = random.Random(5)
+    words = ["cuñado", "máquina", "fiera", "crack", "jefe", "figura", "torero"]
+    catalogue = PhraseCatalogue(Phrase)
+    for entity_id in range(1, 200):
+        catalogue[entity_id] = Phrase(
+            id=entity_id, text=" ".join(rng.choices(words, k=rng.randint(1, 3)))
+        )
+        if rng.random() < 0.2:
+            catalogue.pop(rng.randint(1, entity_id), None)
+
+    phrases = list(catalogue.values())
+    for text in ["Cuñado fiera", "maquina jefes", "toreroo crack", "xyz", "jefe"]:
+        expected = max(
+            (
+                (p.id, fuzz.ratio(p.normalized_text, normalize_str(text)))
+                for p in phrases
+            ),
+            key=lambda x: x[1],
+        )
+        found, score = catalogue.find_similar(text, 90)
+        if expected[1] > 90:
+            assert (found.id, score) == expected, text
+        else:
+            assert score <= 90
+        found, score = catalogue.find_similar(text)
+        assert (found.id, score) == expected, text
+
+
+def test_pool_materializes_on_read():
+    catalogue = PhraseCatalogue.from_models(Phrase, _phrases())
+
+    pool = catalogue.pool()
+    assert len(pool) == 3
+    assert [p.text for p in pool] == ["Cuñado", "Máquina", "Fiera"]
+    assert pool[-1].model_dump() == catalogue[3].model_dump()
+    assert [p.id for p in pool[1:]] == [2, 3]
+    assert [p.id for p in catalogue.pool("cuñ", user_id=10)] == [1]
+
+    # The whole-catalogue pool is kept until an insert or delete
+    assert catalogue.pool()._rows is pool._rows
+    del catalogue[2]
+    assert [p.id for p in catalogue.pool()] == [1, 3]
+    assert len(pool) == 3
+
+
+def test_version_changes_when_matches_may_change():
+    catalogue = PhraseCatalogue.from_models(Phrase, _phrases())
+    version = catalogue.version
+
+    # Counters don't change what a search matches
+    catalogue[1] = Phrase(id=1, text="Cuñado", usages=50)
+    assert catalogue.version == version
+
+    catalogue[1] = Phrase(id=1, text="Cuñadete")
+    assert catalogue.version > version
+    for change in (lambda: catalogue.pop(1), lambda: catalogue.update({9: Phrase()})):
+        version = catalogue.version
+        change()
+        assert catalogue.version > version
+    assert PhraseCatalogue(Phrase).version != catalogue.version
@@ -1,11 +1,18 @@
 from google.cloud import datastore
 from models.chat import Chat
 from infrastructure.datastore.base import DatastoreRepository
+from infrastructure.keys import KeyResolver
 
 
 class ChatDatastoreRepository(DatastoreRepository[Chat]):
-    def __init__(self):
-        super().__init__("Chat")
+    def __init__(
+        self,
+        generation_check_interval: float | None = None,
+        refresh_after: float | None = None,
+    ):
+        super().__init__("Chat", generation_check_interval, refresh_after)
+        # Legacy entities are keyed by the string form of numeric ids
+        self._keys = KeyResolver()
 
     def _entity_to_domain(self, entity: datastore.Entity) -> Chat:
         data = dict(entity)
@@ -14,4 +21,7 @@ class ChatDatastoreRepository(DatastoreRepository[Chat]):
         return Chat(**data)
 
 
-chat_repository = ChatDatastoreRepository()
+# Written on nearly every update: bumping a shared generation entity on each
+# write would make it a contention hotspot, so other instances' writes show
+# up through the periodic refresh instead
+chat_repository = ChatDatastoreRepository(refresh_after=1800)
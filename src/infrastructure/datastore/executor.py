@@ -0,0 +1,129 @@
+"""Dedicated, bounded thread pool for blocking Datastore calls.
+
+The ``google-cloud-datastore`` client is synchronous and has no asyncio
+transport, so every call still runs in a worker thread. Running them in their
+own pool instead of ``asyncio.to_thread`` means a slow Datastore can only back
+up Datastore work, not PIL rendering, TTS or anything else that uses the
+default executor.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from core.config import config
+from core.metrics import metrics_registry
+
+R = TypeVar("R")
+
+logger = logging.getLogger(__name__)
+
+
+class DatastoreExecutor:
+    def __init__(
+        self, max_workers: int, timeout: float | None, scan_timeout: float | None
+    ):
+        self.max_workers = max_workers
+        # Default per-call timeout, and a longer one for full kind scans
+        self.timeout = timeout
+        self.scan_timeout = scan_timeout
+        self._pool: ThreadPoolExecutor | None = None
+        # Counters are touched from worker threads as well as the event loop
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.max_queue_depth = 0
+        self.max_queue_wait = 0.0
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="datastore"
+            )
+        return self._pool
+
+    async def run(self, fn: Callable[[], R], timeout: float | None = None) -> R:
+        """Runs a blocking call in the pool, like ``asyncio.to_thread``.
+
+        ``timeout`` defaults to the executor's per-call timeout. On timeout the
+        caller gets ``TimeoutError``; a call that already started keeps its
+        worker until the RPC returns.
+        """
+        call_timeout = timeout or self.timeout
+        submitted_at = time.monotonic()
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+
+        def _call() -> R:
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.max_queue_wait = max(
+                    self.max_queue_wait, time.monotonic() - submitted_at
+                )
+            try:
+                return fn()
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        ctx = contextvars.copy_context()
+        future = self.pool.submit(ctx.run, _call)
+        try:
+            result = await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=call_timeout
+            )
+        except (TimeoutError, asyncio.CancelledError) as e:
+            # cancel() only succeeds if the call never left the queue
+            if future.cancel():
+                with self._lock:
+                    self.queued -= 1
+            if isinstance(e, TimeoutError):
+                with self._lock:
+                    self.timed_out += 1
+                logger.warning(f"Datastore call timed out after {call_timeout}s")
+            raise
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+                "max_queue_depth": self.max_queue_depth,
+                "max_queue_wait_seconds": round(self.max_queue_wait, 3),
+            }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+datastore_executor = DatastoreExecutor(
+    max_workers=config.datastore_max_workers,
+    timeout=config.datastore_timeout,
+    scan_timeout=config.datastore_scan_timeout,
+)
+metrics_registry.register("executor", datastore_executor.stats)
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import pytest
+
+from infrastructure.datastore.executor import DatastoreExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = DatastoreExecutor(max_workers=1, timeout=1, scan_timeout=5)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_uses_dedicated_pool(executor):
+    thread_name = await executor.run(lambda: threading.current_thread().name)
+
+    assert thread_name.startswith("datastore")
+    assert executor.stats()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_counts_failures(executor):
+    def _boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await executor.run(_boom)
+
+    assert executor.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_releases_queued_calls(executor):
+    release = threading.Event()
+    blocker = asyncio.ensure_future(executor.run(release.wait, timeout=5))
+    await asyncio.sleep(0.05)
+
+    # The only worker is busy, so this call times out while still queued
+    with pytest.raises(TimeoutError):
+        await executor.run(lambda: None, timeout=0.05)
+
+    stats = executor.stats()
+    assert stats["timed_out"] == 1
+    assert stats["queued"] == 0
+    assert stats["running"] == 1
+    assert stats["max_queue_depth"] == 1
+
+    release.set()
+    await blocker
+    assert executor.stats()["running"] == 0
@@ -1,8 +1,7 @@
 import logging
-import asyncio
 from google.cloud import datastore
 from models.gift import Gift, GiftType
-from infrastructure.datastore.base import DatastoreRepository
+from infrastructure.datastore.base import DatastoreRepository, key_id
 
 logger = logging.getLogger(__name__)
 
@@ -13,17 +12,20 @@ class GiftDatastoreRepository(DatastoreRepository[Gift]):
 
     def _entity_to_domain(self, entity: datastore.Entity) -> Gift:
         entity_id = None
-        if entity.key and entity.key.id:
-            entity_id = entity.key.id
-
-        return Gift(
-            id=entity_id,
-            sender_id=entity["sender_id"],
-            sender_name=entity["sender_name"],
-            receiver_id=entity["receiver_id"],
-            gift_type=GiftType(entity["gift_type"]),
-            created_at=entity["created_at"],
-            cost=entity.get("cost", 0),
+        if entity.key:
+            entity_id = key_id(entity.key) or None
+
+        return self._build(
+            Gift,
+            dict(
+                id=entity_id,
+                sender_id=entity["sender_id"],
+                sender_name=entity["sender_name"],
+                receiver_id=entity["receiver_id"],
+                gift_type=GiftType(entity["gift_type"]),
+                created_at=entity["created_at"],
+                cost=entity.get("cost", 0),
+            ),
         )
 
     async def get_gifts_for_user(self, user_id: int) -> list[Gift]:
@@ -35,7 +37,7 @@ class GiftDatastoreRepository(DatastoreRepository[Gift]):
             results.sort(key=lambda x: x.created_at, reverse=True)
             return results
 
-        return await asyncio.to_thread(_fetch)
+        return await self._query("get_gifts_for_user", _fetch)
 
 
 gift_repository = GiftDatastoreRepository()
@@ -16,6 +16,7 @@ def create_mock_entity(data, kind="Gift", entity_id=12345):
     m.__setitem__.side_effect = setitem
     m.update.side_effect = data.update
     m.key.kind = kind
+    m.key.flat_path = (kind, entity_id)
 
     if isinstance(entity_id, int):
         m.key.id = entity_id
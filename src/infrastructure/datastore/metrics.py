@@ -0,0 +1,115 @@
+"""Per-kind, per-operation counters and latency histograms for Datastore calls.
+
+Every call a ``DatastoreRepository`` makes goes through ``_run``, which
+records it here along with the number of entities it returned or wrote.
+Cache lookups record hits and misses. ``snapshot()`` returns everything as
+plain dicts for the admin metrics endpoint.
+"""
+
+import bisect
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from core.metrics import metrics_registry
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket
+# catches everything slower.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class OperationStats:
+    calls: int = 0
+    errors: int = 0
+    entities: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def observe(self, seconds: float, entities: int, error: bool) -> None:
+        self.calls += 1
+        self.errors += error
+        self.entities += entities
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        # Cumulative, Prometheus-style buckets
+        histogram: dict[str, int] = {}
+        total = 0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), self.buckets):
+            total += count
+            histogram[str(bound)] = total
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "entities": self.entities,
+            "total_seconds": round(self.total_seconds, 6),
+            "avg_seconds": round(self.total_seconds / self.calls, 6)
+            if self.calls
+            else 0.0,
+            "max_seconds": round(self.max_seconds, 6),
+            "histogram": histogram,
+        }
+
+
+class DatastoreMetrics:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._operations: dict[tuple[str, str], OperationStats] = {}
+        self._cache: dict[str, dict[str, int]] = {}
+        self.started_at = time.time()
+
+    def record(
+        self,
+        kind: str,
+        op: str,
+        seconds: float,
+        entities: int = 0,
+        error: bool = False,
+    ) -> None:
+        stats = self._operations.get((kind, op))
+        if stats is None:
+            stats = self._operations[(kind, op)] = OperationStats()
+        stats.observe(seconds, entities, error)
+
+    def record_cache(self, kind: str, hit: bool) -> None:
+        counts = self._cache.setdefault(kind, {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        kinds: dict[str, dict[str, Any]] = {}
+        for (kind, op), stats in sorted(self._operations.items()):
+            kinds.setdefault(kind, {"operations": {}})["operations"][op] = (
+                stats.as_dict()
+            )
+        for kind, counts in sorted(self._cache.items()):
+            lookups = counts["hits"] + counts["misses"]
+            kinds.setdefault(kind, {"operations": {}})["cache"] = {
+                **counts,
+                "hit_ratio": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+            }
+        return {
+            "since": self.started_at,
+            "latency_buckets": list(LATENCY_BUCKETS),
+            "kinds": kinds,
+        }
+
+
+def entity_count(result: object) -> int:
+    """Best-effort number of entities a Datastore call returned."""
+    if result is None or isinstance(result, (bool, int, float, str)):
+        return 0
+    if isinstance(result, (list, tuple, dict, set)):
+        return len(result)
+    return 1
+
+
+datastore_metrics = DatastoreMetrics()
+metrics_registry.register(
+    "datastore", datastore_metrics.snapshot, datastore_metrics.reset
+)
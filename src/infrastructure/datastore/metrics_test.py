@@ -0,0 +1,37 @@
+from infrastructure.datastore.metrics import DatastoreMetrics, entity_count
+
+
+def test_histogram_is_cumulative():
+    metrics = DatastoreMetrics()
+    metrics.record("Phrase", "get", 0.003, entities=1)
+    metrics.record("Phrase", "get", 0.2, entities=1)
+    metrics.record("Phrase", "get", 30.0, error=True)
+
+    stats = metrics.snapshot()["kinds"]["Phrase"]["operations"]["get"]
+    assert stats["calls"] == 3
+    assert stats["errors"] == 1
+    assert stats["entities"] == 2
+    assert stats["max_seconds"] == 30.0
+    assert stats["histogram"]["0.005"] == 1
+    assert stats["histogram"]["0.25"] == 2
+    assert stats["histogram"]["10.0"] == 2
+    assert stats["histogram"]["+Inf"] == 3
+
+
+def test_cache_hit_ratio_and_reset():
+    metrics = DatastoreMetrics()
+    metrics.record_cache("User", hit=True)
+    metrics.record_cache("User", hit=True)
+    metrics.record_cache("User", hit=False)
+    assert metrics.snapshot()["kinds"]["User"]["cache"]["hit_ratio"] == 0.6667
+
+    metrics.reset()
+    assert metrics.snapshot()["kinds"] == {}
+
+
+def test_entity_count():
+    assert entity_count(None) == 0
+    assert entity_count(7) == 0
+    assert entity_count([1, 2, 3]) == 3
+    assert entity_count({"a": 1}) == 1
+    assert entity_count(object()) == 1
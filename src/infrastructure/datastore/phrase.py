@@ -1,70 +1,77 @@
 import logging
-import asyncio
+from collections.abc import Sequence
+from typing import cast
 from google.cloud import datastore
+from core.config import config
 from models.phrase import Phrase, LongPhrase
-from infrastructure.datastore.base import DatastoreRepository
-from utils import normalize_str
+from infrastructure.datastore.base import (
+    DEFAULT_GENERATION_CHECK_INTERVAL,
+    DatastoreRepository,
+    key_id,
+)
+from infrastructure.datastore.catalogue import PhraseCatalogue
+from infrastructure.datastore.snapshot import CacheSnapshot, snapshot_store_from_url
+from infrastructure.keys import KeyResolver
+from infrastructure.filters import filter_phrases, paginate, search_text
 
 logger = logging.getLogger(__name__)
 
 
 class PhraseDatastoreRepository(DatastoreRepository[Phrase]):
-    def __init__(self, model_class: type[Phrase] | type[LongPhrase] = Phrase):
-        super().__init__(model_class.kind)
+    def __init__(
+        self,
+        model_class: type[Phrase] | type[LongPhrase] = Phrase,
+        generation_check_interval: float | None = None,
+        refresh_after: float | None = None,
+        snapshot_url: str = "",
+    ):
         self.model_class = model_class
+        snapshot = None
+        if store := snapshot_store_from_url(snapshot_url):
+            snapshot = CacheSnapshot(store, model_class, model_class.kind)
+        super().__init__(
+            model_class.kind, generation_check_interval, refresh_after, snapshot
+        )
+        # Which form (int or legacy string) authors' user_id is stored under
+        self._user_ids = KeyResolver()
+
+    def _as_cache(self, models: dict[str | int, Phrase]) -> PhraseCatalogue[Phrase]:
+        return PhraseCatalogue.from_models(self.model_class, models)
 
     def _entity_to_domain(self, entity: datastore.Entity) -> Phrase:
         entity_id = None
-        if entity.key and entity.key.id:
-            entity_id = entity.key.id
-
-        return self.model_class(
-            id=entity_id,
-            text=entity["text"],
-            sticker_file_id=entity.get("sticker_file_id", ""),
-            usages=entity.get("usages", 0),
-            audio_usages=entity.get("audio_usages", 0),
-            sticker_usages=entity.get("sticker_usages", 0),
-            score=entity.get("score", 0),
-            user_id=entity.get("user_id", 0),
-            chat_id=entity.get("chat_id", 0),
-            created_at=entity.get("created_at"),
-            proposal_id=entity.get("proposal_id", ""),
+        if entity.key:
+            entity_id = key_id(entity.key) or None
+
+        return self._build(
+            self.model_class,
+            dict(
+                id=entity_id,
+                text=entity["text"],
+                sticker_file_id=entity.get("sticker_file_id", ""),
+                usages=entity.get("usages", 0),
+                audio_usages=entity.get("audio_usages", 0),
+                sticker_usages=entity.get("sticker_usages", 0),
+                score=entity.get("score", 0),
+                user_id=entity.get("user_id", 0),
+                chat_id=entity.get("chat_id", 0),
+                created_at=entity.get("created_at"),
+                proposal_id=entity.get("proposal_id", ""),
+            ),
         )
 
     async def get_phrases(
         self, search: str = "", limit: int = 0, offset: int = 0, **filters: object
     ) -> list[Phrase]:
         # If cache is populated, use it instead of going to Datastore
-        if self._cache:
-            results = self._cache
-            if search:
-                norm_search = normalize_str(search)
-                results = [p for p in results if norm_search in normalize_str(p.text)]
-
-            for field, value in filters.items():
-                if value == "__EMPTY__":
-                    results = [p for p in results if not getattr(p, field, None)]
-                elif value:
-                    results = [
-                        p for p in results if str(getattr(p, field, None)) == str(value)
-                    ]
-            return results[offset : offset + limit] if limit > 0 else results
+        if await self._cache_ready():
+            catalogue = cast(PhraseCatalogue[Phrase], self._cache)
+            return catalogue.find(search, limit, offset, **filters)
 
         # If there's a search and no cache, we still might need the full load for memory filtering
         if search:
-            results = await self.load_all()
-            norm_search = normalize_str(search)
-            results = [p for p in results if norm_search in normalize_str(p.text)]
-
-            for field, value in filters.items():
-                if value == "__EMPTY__":
-                    results = [p for p in results if not getattr(p, field, None)]
-                elif value:
-                    results = [
-                        p for p in results if str(getattr(p, field, None)) == str(value)
-                    ]
-            return results[offset : offset + limit] if limit > 0 else results
+            results = search_text(await self.load_all(), search)
+            return paginate(filter_phrases(results, filters), limit, offset)
 
         # If no search, use Datastore filtering for better performance
         def _fetch():
@@ -89,11 +96,17 @@ class PhraseDatastoreRepository(DatastoreRepository[Phrase]):
                 )
             ]
 
-        results_or_none = await asyncio.to_thread(_fetch)
+        results_or_none = await self._query("get_phrases", _fetch)
         if results_or_none is not None:
             # Fallback: if we filtered by user_id and got 0 results, try string ID
+            # (unless we recently saw that this user has no string-keyed phrases)
             user_id_filter = filters.get("user_id")
-            if not results_or_none and user_id_filter and str(user_id_filter).isdigit():
+            if (
+                not results_or_none
+                and user_id_filter
+                and str(user_id_filter).isdigit()
+                and str(user_id_filter) in self._user_ids.candidates(user_id_filter)
+            ):
 
                 def _fetch_string_fallback():
                     q = self.client.query(kind=self.kind)
@@ -107,21 +120,40 @@ class PhraseDatastoreRepository(DatastoreRepository[Phrase]):
                         for e in q.fetch(limit=limit if limit > 0 else None)
                     ]
 
-                results_or_none = await asyncio.to_thread(_fetch_string_fallback)
+                results_or_none = await self._query(
+                    "get_phrases_str_fallback", _fetch_string_fallback
+                )
+                if not results_or_none:
+                    self._user_ids.missed(user_id_filter, str(user_id_filter))
 
             return results_or_none
 
         # Fallback to load_all for complex filters or search
-        results = await self.load_all()
-        for field, value in filters.items():
-            if value == "__EMPTY__":
-                results = [p for p in results if not getattr(p, field, None)]
-            elif value:
-                results = [
-                    p for p in results if str(getattr(p, field, None)) == str(value)
-                ]
-
-        return results[offset : offset + limit] if limit > 0 else results
+        results = filter_phrases(await self.load_all(), filters)
+        return paginate(results, limit, offset)
+
+    def _snapshot_version(self) -> object:
+        # Counter updates don't change the catalogue's version, so they don't
+        # rewrite the snapshot either
+        return self.catalogue_version()
+
+    def catalogue_version(self) -> int:
+        """Changes whenever a search over the cache may match different phrases."""
+        return cast(PhraseCatalogue[Phrase], self._cache).version
+
+    async def get_phrase_pool(self, search: str = "") -> Sequence[Phrase]:
+        if not await self._cache_ready():
+            await self.load_all()
+        catalogue = cast(PhraseCatalogue[Phrase], self._cache)
+        return catalogue.pool(search)
+
+    async def find_similar(
+        self, text: str, threshold: int = 0
+    ) -> tuple[Phrase | None, int]:
+        if not await self._cache_ready():
+            await self.load_all()
+        catalogue = cast(PhraseCatalogue[Phrase], self._cache)
+        return catalogue.find_similar(text, threshold)
 
     async def add_usage(self, phrase_text: str, usage_type: str) -> None:
         # Find phrase by text since ID is now numeric
@@ -139,53 +171,49 @@ class PhraseDatastoreRepository(DatastoreRepository[Phrase]):
             await self.save(phrase)
 
     async def add_usage_by_id(self, phrase_id: str | int) -> None:
-        phrase = await self.load(phrase_id)
-        if phrase:
-            phrase.usages += 1
-            await self.save(phrase)
+        await self.increment_many({phrase_id: {"usages": 1}})
 
     async def get_user_phrase_count(self, user_id: str | int) -> int:
         """Counts phrases authored by a specific user."""
 
-        def _count():
-            try:
-                # Try numeric ID first
-                uid = user_id
-                if isinstance(user_id, str) and user_id.isdigit():
-                    uid = int(user_id)
-
-                query = self.client.query(kind=self.kind)
-                query.add_filter(
-                    filter=datastore.query.PropertyFilter("user_id", "=", uid)
-                )
-
-                count_query = self.client.aggregation_query(query=query)
-                count_query.count(alias="all")
-                results = list(count_query.fetch())
-                if results and len(results) > 0 and len(results[0]) > 0:
-                    count = int(results[0][0].value)
-                    if count > 0:
-                        return count
-
-                # Try string fallback
-                query2 = self.client.query(kind=self.kind)
-                query2.add_filter(
-                    filter=datastore.query.PropertyFilter("user_id", "=", str(uid))
-                )
-                count_query2 = self.client.aggregation_query(query=query2)
-                count_query2.count(alias="all")
-                results2 = list(count_query2.fetch())
-                if results2 and len(results2) > 0 and len(results2[0]) > 0:
-                    return int(results2[0][0].value)
-
-                return 0
-            except Exception as e:
-                logger.error(f"Error counting phrases for user {user_id}: {e}")
-                return 0
-
-        return await asyncio.to_thread(_count)
+        def _count(uid: str | int) -> int:
+            query = self.client.query(kind=self.kind)
+            query.add_filter(filter=datastore.query.PropertyFilter("user_id", "=", uid))
+
+            count_query = self.client.aggregation_query(query=query)
+            count_query.count(alias="all")
+            results = list(count_query.fetch())
+            if results and len(results) > 0 and len(results[0]) > 0:
+                return int(results[0][0].value)
+            return 0
+
+        try:
+            # Try the numeric ID first, then the legacy string form unless
+            # it's known to be empty for this user
+            for uid in self._user_ids.candidates(user_id):
+                count = await self._query("get_user_phrase_count", lambda: _count(uid))
+                if count > 0:
+                    return count
+                self._user_ids.missed(user_id, uid)
+            return 0
+        except Exception as e:
+            logger.error(f"Error counting phrases for user {user_id}: {e}")
+            return 0
 
 
 # Instances
-phrase_repository = PhraseDatastoreRepository(Phrase)
-long_phrase_repository = PhraseDatastoreRepository(LongPhrase)
+# The catalogue is on every inline query's path: revalidate it in the background
+# every 10 minutes rather than ever making a request wait for a full scan, and
+# warm start from the catalogue snapshot when one is configured.
+phrase_repository = PhraseDatastoreRepository(
+    Phrase,
+    generation_check_interval=DEFAULT_GENERATION_CHECK_INTERVAL,
+    refresh_after=600,
+    snapshot_url=config.catalogue_snapshot_url,
+)
+long_phrase_repository = PhraseDatastoreRepository(
+    LongPhrase,
+    generation_check_interval=DEFAULT_GENERATION_CHECK_INTERVAL,
+    refresh_after=600,
+    snapshot_url=config.catalogue_snapshot_url,
+)
@@ -1,17 +1,27 @@
+import asyncio
+
 import pytest
 from unittest.mock import MagicMock, patch
 from models.phrase import Phrase
+from infrastructure.datastore.catalogue import PhraseCatalogue
 from infrastructure.datastore.phrase import PhraseDatastoreRepository
 from google.cloud import datastore
 
 
 def create_mock_entity(data, kind="Phrase", entity_id=123):
     key = datastore.Key(kind, entity_id, project="test")
+    key.flat_path = (kind, entity_id)
     entity = datastore.Entity(key=key)
     entity.update(data)
     return entity
 
 
+class _Entity(dict):
+    def __init__(self, data, entity_id):
+        super().__init__(data)
+        self.key = MagicMock(flat_path=("Phrase", entity_id))
+
+
 @pytest.fixture
 def repo():
     return PhraseDatastoreRepository()
@@ -115,3 +125,64 @@ class TestPhraseRepository:
                 mock_datastore_client.query.reset_mock()
                 phrases = await repo.load_all()
                 mock_datastore_client.query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cached_catalogue_serves_copies(self, repo):
+        entities = [
+            _Entity({"text": "Cuñado", "usages": 2, "user_id": 7}, 1),
+            _Entity({"text": "Máquina", "user_id": 8}, 2),
+        ]
+        with patch(
+            "infrastructure.datastore.base.get_datastore_client"
+        ) as mock_client_factory:
+            mock_datastore_client = mock_client_factory.return_value
+            mock_datastore_client.query.return_value.fetch.return_value = entities
+
+            repo.clear_cache()
+            await repo.load_all()
+            assert isinstance(repo._cache, PhraseCatalogue)
+
+            [phrase] = await repo.get_phrases(search="cunado", user_id="7")
+            assert (phrase.id, phrase.usages) == (1, 2)
+
+            # Mutations only reach the catalogue through save
+            phrase.usages += 1
+            assert (await repo.get_phrases(user_id=7))[0].usages == 2
+            await repo.save(phrase)
+            assert (await repo.get_phrases(user_id=7))[0].usages == 3
+
+    @pytest.mark.asyncio
+    async def test_counter_updates_dont_rewrite_snapshot(self, tmp_path):
+        repo = PhraseDatastoreRepository(snapshot_url=str(tmp_path))
+        stored = {1: _Entity({"text": "Cuñado", "usages": 2}, 1)}
+        with (
+            patch(
+                "infrastructure.datastore.base.get_datastore_client"
+            ) as mock_client_factory,
+            patch("infrastructure.datastore.base.SNAPSHOT_WRITE_DELAY", 0),
+            patch.object(repo.snapshot, "save", wraps=repo.snapshot.save) as save,
+        ):
+            mock_datastore_client = mock_client_factory.return_value
+            mock_datastore_client.key.side_effect = lambda kind, i: i
+            mock_datastore_client.get_multi.side_effect = lambda keys: [
+                stored[i] for i in keys
+            ]
+            mock_datastore_client.query.return_value.fetch.return_value = list(
+                stored.values()
+            )
+
+            async def written() -> int:
+                await asyncio.gather(
+                    *(t for t in asyncio.all_tasks() if t is not asyncio.current_task())
+                )
+                return save.call_count
+
+            await repo.load_all()
+            assert await written() == 1
+
+            await repo.increment_many({1: {"usages": 1}})
+            assert (await repo.load_all())[0].usages == 3
+            assert await written() == 1
+
+            await repo.save(Phrase(id=1, text="Cuñado máquina", usages=3))
+            assert await written() == 2
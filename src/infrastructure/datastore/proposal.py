@@ -1,8 +1,9 @@
-import asyncio
+from typing import cast
 from google.cloud import datastore
 from models.proposal import Proposal, LongProposal
-from infrastructure.datastore.base import DatastoreRepository
-from utils import normalize_str
+from infrastructure.datastore.base import DatastoreRepository, key_id
+from infrastructure.filters import filter_proposals, paginate, search_text
+from infrastructure.similarity import IndexedModels
 
 
 class ProposalDatastoreRepository(DatastoreRepository[Proposal]):
@@ -10,67 +11,42 @@ class ProposalDatastoreRepository(DatastoreRepository[Proposal]):
         super().__init__(model_class.kind)
         self.model_class = model_class
 
+    def _as_cache(self, models: dict[str | int, Proposal]) -> IndexedModels[Proposal]:
+        return IndexedModels(models)
+
     def _entity_to_domain(self, entity: datastore.Entity) -> Proposal:
         entity_id = ""
         if entity.key:
-            entity_id = str(entity.key.name)
+            entity_id = str(key_id(entity.key))
 
-        return self.model_class(
-            id=entity_id,
-            from_chat_id=entity["from_chat_id"],
-            from_message_id=entity["from_message_id"],
-            text=entity["text"],
-            liked_by=[str(uid) for uid in entity.get("liked_by", [])],
-            disliked_by=[str(uid) for uid in entity.get("disliked_by", [])],
-            user_id=entity.get("user_id", 0),
-            voting_ended=entity.get("voting_ended", False),
-            voting_ended_at=entity.get("voting_ended_at"),
-            created_at=entity.get("created_at"),
+        return self._build(
+            self.model_class,
+            dict(
+                id=entity_id,
+                from_chat_id=entity["from_chat_id"],
+                from_message_id=entity["from_message_id"],
+                text=entity["text"],
+                liked_by=[str(uid) for uid in entity.get("liked_by", [])],
+                disliked_by=[str(uid) for uid in entity.get("disliked_by", [])],
+                user_id=entity.get("user_id", 0),
+                voting_ended=entity.get("voting_ended", False),
+                voting_ended_at=entity.get("voting_ended_at"),
+                created_at=entity.get("created_at"),
+            ),
         )
 
     async def get_proposals(
         self, search: str = "", limit: int = 0, offset: int = 0, **filters: object
     ) -> list[Proposal]:
         # If cache is populated, use it instead of going to Datastore
-        if self._cache:
-            results = self._cache
-            if search:
-                norm_search = normalize_str(search)
-                results = [p for p in results if norm_search in normalize_str(p.text)]
-
-            for field, value in filters.items():
-                if value is None or value == "":
-                    continue
-                if value == "__EMPTY__":
-                    results = [p for p in results if not getattr(p, field, None)]
-                else:
-                    str_val = str(value).lower()
-                    results = [
-                        p
-                        for p in results
-                        if str(getattr(p, field, None)).lower() == str_val
-                    ]
-            return results[offset : offset + limit] if limit > 0 else results
+        if (cached := await self._cached_models()) is not None:
+            results = filter_proposals(search_text(cached, search), filters)
+            return paginate(results, limit, offset)
 
         # If there's a search, we still might need the full load for memory filtering
         if search:
-            results = await self.load_all()
-            norm_search = normalize_str(search)
-            results = [p for p in results if norm_search in normalize_str(p.text)]
-
-            for field, value in filters.items():
-                if value is None or value == "":
-                    continue
-                if value == "__EMPTY__":
-                    results = [p for p in results if not getattr(p, field, None)]
-                else:
-                    str_val = str(value).lower()
-                    results = [
-                        p
-                        for p in results
-                        if str(getattr(p, field, None)).lower() == str_val
-                    ]
-            return results[offset : offset + limit] if limit > 0 else results
+            results = search_text(await self.load_all(), search)
+            return paginate(filter_proposals(results, filters), limit, offset)
 
         # If no search, use Datastore filtering for better performance
         def _fetch():
@@ -88,26 +64,21 @@ class ProposalDatastoreRepository(DatastoreRepository[Proposal]):
                 )
             ]
 
-        results_or_none = await asyncio.to_thread(_fetch)
+        results_or_none = await self._query("get_proposals", _fetch)
         if results_or_none is not None:
             return results_or_none
 
         # Fallback to load_all for complex filters or search
-        results = await self.load_all()
-        for field, value in filters.items():
-            if value is None or value == "":
-                continue
-            if value == "__EMPTY__":
-                results = [p for p in results if not getattr(p, field, None)]
-            else:
-                str_val = str(value).lower()
-                results = [
-                    p
-                    for p in results
-                    if str(getattr(p, field, None)).lower() == str_val
-                ]
+        results = filter_proposals(await self.load_all(), filters)
+        return paginate(results, limit, offset)
 
-        return results[offset : offset + limit] if limit > 0 else results
+    async def find_similar(
+        self, text: str, threshold: int = 0
+    ) -> tuple[Proposal | None, int]:
+        if not await self._cache_ready():
+            await self.load_all()
+        cache = cast(IndexedModels[Proposal], self._cache)
+        return cache.find_similar(text, threshold)
 
 
 # Instances
@@ -17,6 +17,7 @@ def create_mock_entity(data, kind="Proposal", entity_id="test_id"):
     m.key.name = entity_id
     m.key.kind = kind
     m.key.id = entity_id
+    m.key.flat_path = (kind, entity_id)
     return m
 
 
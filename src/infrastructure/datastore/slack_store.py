@@ -10,6 +10,7 @@ from slack_sdk.oauth.installation_store.async_installation_store import (
 from slack_sdk.oauth.state_store.async_state_store import AsyncOAuthStateStore
 
 from infrastructure.datastore.base import DatastoreRepository
+from infrastructure.datastore.executor import datastore_executor
 from models.slack import SlackBot, SlackInstallation
 
 logger = logging.getLogger(__name__)
@@ -29,12 +30,12 @@ class DatastoreOAuthStateStore(AsyncOAuthStateStore):
         key = self.repo.get_key(state)
         entity = datastore.Entity(key=key)
         entity.update({"created_at": time.time()})
-        self.repo.client.put(entity)
+        await datastore_executor.run(lambda: self.repo.client.put(entity))
         return state
 
     async def async_consume(self, state: str) -> bool:
         key = self.repo.get_key(state)
-        entity = self.repo.client.get(key)
+        entity = await datastore_executor.run(lambda: self.repo.client.get(key))
         if entity:
             await self.repo.delete(state)
             created_at = entity.get("created_at", 0)
@@ -67,14 +68,14 @@ class DatastoreInstallationStore(AsyncInstallationStore):
         data = {k: v for k, v in installation.__dict__.items() if v is not None}
 
         entity.update(data)
-        self.installation_repo.client.put(entity)
+        await datastore_executor.run(lambda: self.installation_repo.client.put(entity))
 
     async def async_save_bot(self, bot: Bot):
         key = self.bot_repo.get_key(bot.team_id or "enterprise")
         entity = datastore.Entity(key=key)
         data = {k: v for k, v in bot.__dict__.items() if v is not None}
         entity.update(data)
-        self.bot_repo.client.put(entity)
+        await datastore_executor.run(lambda: self.bot_repo.client.put(entity))
 
     async def async_find_bot(
         self,
@@ -84,7 +85,7 @@ class DatastoreInstallationStore(AsyncInstallationStore):
         is_enterprise_install: bool | None = False,
     ) -> Bot | None:
         key = self.bot_repo.get_key(team_id or "enterprise")
-        entity = self.bot_repo.client.get(key)
+        entity = await datastore_executor.run(lambda: self.bot_repo.client.get(key))
         if entity:
             data = dict(entity)
             # Ensure mandatory fields for Bot
@@ -103,7 +104,9 @@ class DatastoreInstallationStore(AsyncInstallationStore):
     ) -> Installation | None:
         if user_id:
             key = self.installation_repo.get_key(f"{team_id or ''}-{user_id}")
-            entity = self.installation_repo.client.get(key)
+            entity = await datastore_executor.run(
+                lambda: self.installation_repo.client.get(key)
+            )
             if entity:
                 data = dict(entity)
                 # Ensure mandatory fields for Installation
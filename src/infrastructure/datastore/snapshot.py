@@ -0,0 +1,146 @@
+"""Serialized snapshots of a repository cache, for fast warm starts.
+
+A cold instance can fill its cache from the latest snapshot instead of
+scanning the whole kind, then reconcile whatever changed since (the snapshot
+records the cache generation it was taken at). Snapshots are gzipped: a JSON
+header line followed by a JSON array of models, decoded in one pydantic call.
+
+Every instance may write the snapshot, so stores keep the generation next to
+it and refuse a write from an older generation than the one stored.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Generic, Protocol, TypeVar
+
+from google.api_core.exceptions import PreconditionFailed
+from pydantic import BaseModel, TypeAdapter
+
+from utils.gcp import get_storage_client
+
+T = TypeVar("T", bound=BaseModel)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotStore(Protocol):
+    def read(self, name: str) -> bytes | None: ...
+    def write(self, name: str, data: bytes, generation: int) -> bool:
+        """Stores ``data`` unless the stored copy is from a newer generation.
+
+        Returns whether it was written.
+        """
+        ...
+
+
+class LocalSnapshotStore:
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def read(self, name: str) -> bytes | None:
+        path = self.directory / name
+        return path.read_bytes() if path.exists() else None
+
+    def write(self, name: str, data: bytes, generation: int) -> bool:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        generation_path = self.directory / f"{name}.generation"
+        if generation_path.exists() and int(generation_path.read_text()) > generation:
+            return False
+        # Write then rename, so readers never see a partial file
+        tmp = self.directory / f".{name}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, self.directory / name)
+        generation_path.write_text(str(generation))
+        return True
+
+
+class BucketSnapshotStore:
+    def __init__(self, bucket_name: str, prefix: str = "snapshots"):
+        self.bucket_name = bucket_name
+        self.prefix = prefix.strip("/")
+
+    def _path(self, name: str) -> str:
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    def _blob(self, name: str):
+        return get_storage_client().bucket(self.bucket_name).blob(self._path(name))
+
+    def read(self, name: str) -> bytes | None:
+        blob = self._blob(name)
+        if not blob.exists():
+            return None
+        return blob.download_as_bytes()
+
+    def write(self, name: str, data: bytes, generation: int) -> bool:
+        bucket = get_storage_client().bucket(self.bucket_name)
+        stored = bucket.get_blob(self._path(name))
+        if stored is not None:
+            stored_generation = int((stored.metadata or {}).get("generation", -1))
+            if stored_generation > generation:
+                return False
+        blob = bucket.blob(self._path(name))
+        blob.metadata = {"generation": str(generation)}
+        try:
+            # Only replace the copy checked above: another instance may have
+            # written a newer one since
+            blob.upload_from_string(
+                data,
+                content_type="application/gzip",
+                if_generation_match=stored.generation if stored is not None else 0,
+            )
+        except PreconditionFailed:
+            return False
+        return True
+
+
+def snapshot_store_from_url(url: str) -> SnapshotStore | None:
+    """``gs://bucket/prefix`` for a storage bucket, a path for a local dir."""
+    if not url:
+        return None
+    if url.startswith("gs://"):
+        bucket, _, prefix = url.removeprefix("gs://").partition("/")
+        return BucketSnapshotStore(bucket, prefix or "snapshots")
+    return LocalSnapshotStore(url)
+
+
+class CacheSnapshot(Generic[T]):
+    def __init__(self, store: SnapshotStore, model_class: type[T], kind: str):
+        self.store = store
+        self.name = f"{kind}.json.gz"
+        self._adapter = TypeAdapter(list[model_class])
+
+    def encode(self, generation: int, models: Sequence[T]) -> bytes:
+        header = {
+            "version": SNAPSHOT_VERSION,
+            "generation": generation,
+            "created_at": time.time(),
+            "count": len(models),
+        }
+        body = self._adapter.dump_json(list(models))
+        return gzip.compress(json.dumps(header).encode() + b"\n" + body, mtime=0)
+
+    def decode(self, data: bytes) -> tuple[int, list[T]] | None:
+        header_line, _, body = gzip.decompress(data).partition(b"\n")
+        header = json.loads(header_line)
+        if header.get("version") != SNAPSHOT_VERSION:
+            return None
+        return int(header["generation"]), self._adapter.validate_json(body)
+
+    def load(self) -> tuple[int, list[T]] | None:
+        """Returns the snapshot's generation and models, if there is one."""
+        data = self.store.read(self.name)
+        return self.decode(data) if data else None
+
+    def save(self, generation: int, models: Sequence[T]) -> bool:
+        """Writes the snapshot unless a newer generation's is stored.
+
+        Returns whether it was written.
+        """
+        return self.store.write(self.name, self.encode(generation, models), generation)
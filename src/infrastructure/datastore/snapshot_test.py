@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from google.api_core.exceptions import PreconditionFailed
+
+from models.phrase import LongPhrase, Phrase
+from infrastructure.datastore.snapshot import (
+    BucketSnapshotStore,
+    CacheSnapshot,
+    LocalSnapshotStore,
+    snapshot_store_from_url,
+)
+
+
+def test_roundtrip_keeps_models(tmp_path):
+    snapshot = CacheSnapshot(LocalSnapshotStore(str(tmp_path)), Phrase, "Phrase")
+    created = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    phrases = [
+        Phrase(id=1, text="Fiera", usages=3, created_at=created),
+        Phrase(id=2, text="Máquina", user_id="slack_1"),
+    ]
+
+    snapshot.save(7, phrases)
+    generation, loaded = snapshot.load()
+
+    assert generation == 7
+    assert loaded == phrases
+    assert loaded[0].created_at == created
+    assert (tmp_path / "Phrase.json.gz").exists()
+
+
+def test_missing_snapshot(tmp_path):
+    snapshot = CacheSnapshot(LocalSnapshotStore(str(tmp_path)), LongPhrase, "X")
+    assert snapshot.load() is None
+
+
+def test_store_from_url():
+    assert snapshot_store_from_url("") is None
+
+    bucket = snapshot_store_from_url("gs://cunhaobot-assets/cache")
+    assert isinstance(bucket, BucketSnapshotStore)
+    assert (bucket.bucket_name, bucket.prefix) == ("cunhaobot-assets", "cache")
+
+    assert isinstance(snapshot_store_from_url("/tmp/snapshots"), LocalSnapshotStore)
+
+
+def test_older_generation_does_not_overwrite(tmp_path):
+    snapshot = CacheSnapshot(LocalSnapshotStore(str(tmp_path)), Phrase, "Phrase")
+
+    assert snapshot.save(7, [Phrase(id=1, text="Fiera")])
+    assert not snapshot.save(6, [Phrase(id=1, text="Máquina")])
+    assert snapshot.save(7, [Phrase(id=1, text="Crack")])
+
+    assert snapshot.load() == (7, [Phrase(id=1, text="Crack")])
+
+
+def test_bucket_write_only_replaces_the_copy_it_checked():
+    store = BucketSnapshotStore("bucket", "cache")
+    with patch("infrastructure.datastore.snapshot.get_storage_client") as client:
+        bucket = client.return_value.bucket.return_value
+        bucket.get_blob.return_value = MagicMock(
+            metadata={"generation": "9"}, generation=123
+        )
+        blob = bucket.blob.return_value
+
+        assert not store.write("Phrase.json.gz", b"old", 8)
+        blob.upload_from_string.assert_not_called()
+
+        assert store.write("Phrase.json.gz", b"new", 10)
+        bucket.blob.assert_called_with("cache/Phrase.json.gz")
+        assert blob.metadata == {"generation": "10"}
+        assert blob.upload_from_string.call_args.kwargs["if_generation_match"] == 123
+
+        # Another instance wrote in between
+        blob.upload_from_string.side_effect = PreconditionFailed("changed")
+        assert not store.write("Phrase.json.gz", b"new", 10)
+
+        bucket.get_blob.return_value = None
+        blob.upload_from_string.side_effect = None
+        assert store.write("Phrase.json.gz", b"first", 0)
+        assert blob.upload_from_string.call_args.kwargs["if_generation_match"] == 0
@@ -0,0 +1,126 @@
+"""Request-scoped identity map and unit of work for Datastore repositories.
+
+Handling a single update touches the same entities several times (the user is
+loaded by the update logger, the inline usage counter, the usage log and the
+badge check). Inside ``unit_of_work()`` the first ``load`` of an entity is
+remembered and returned to every later caller, ``save`` only marks the
+instance dirty, and one batched put per kind writes everything on exit.
+
+Queries (and reads of a repository's ``load_all`` cache) can't see deferred
+saves, so before running one a repository writes the pending saves of its
+kind with ``write_pending``.
+"""
+
+import logging
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from infrastructure.datastore.base import DatastoreRepository
+
+logger = logging.getLogger(__name__)
+
+_IdentityKey = tuple[str, str | int]
+
+
+class UnitOfWork:
+    def __init__(self) -> None:
+        # Loaded models (or None for known misses) by (kind, id)
+        self._identity: dict[_IdentityKey, BaseModel | None] = {}
+        self._dirty: dict[_IdentityKey, tuple[DatastoreRepository[Any], BaseModel]] = {}
+        self.active = True
+
+    def get(self, kind: str, entity_id: str | int) -> tuple[bool, BaseModel | None]:
+        """Returns whether the entity is known and, if so, its model."""
+        key = (kind, entity_id)
+        if key not in self._identity:
+            return False, None
+        return True, self._identity[key]
+
+    def register(
+        self, kind: str, entity_id: str | int, model: BaseModel | None
+    ) -> None:
+        """Remembers a model as stored. It replaces any dirty instance, which
+        would otherwise overwrite it on flush."""
+        self._identity[(kind, entity_id)] = model
+        self._dirty.pop((kind, entity_id), None)
+
+    def register_dirty(
+        self, repo: DatastoreRepository[Any], entity_id: str | int, model: BaseModel
+    ) -> None:
+        key = (repo.kind, entity_id)
+        self._identity[key] = model
+        self._dirty[key] = (repo, model)
+
+    def forget(self, kind: str, entity_id: str | int) -> None:
+        """Drops an entity that was deleted (or written outside this unit)."""
+        self._identity.pop((kind, entity_id), None)
+        self._dirty.pop((kind, entity_id), None)
+
+    async def write_pending(self, kind: str) -> None:
+        """Writes the dirty entities of ``kind`` now, ahead of the flush. They
+        stay dirty if the write fails."""
+        keys = [key for key in self._dirty if key[0] == kind]
+        if not keys:
+            return
+        pending = {key: self._dirty.pop(key) for key in keys}
+        try:
+            await _save_batches(pending.values())
+        except Exception:
+            for key, entry in pending.items():
+                self._dirty.setdefault(key, entry)
+            raise
+
+    async def flush(self) -> None:
+        """Writes every dirty entity with one batched put per repository."""
+        # From here on repositories must hit Datastore directly
+        self.active = False
+        dirty, self._dirty = self._dirty, {}
+        await _save_batches(dirty.values())
+
+
+async def _save_batches(
+    entries: Iterable[tuple[DatastoreRepository[Any], BaseModel]],
+) -> None:
+    """One batched put per repository."""
+    batches: dict[int, tuple[DatastoreRepository[Any], list[BaseModel]]] = {}
+    for repo, model in entries:
+        batches.setdefault(id(repo), (repo, []))[1].append(model)
+    for repo, models in batches.values():
+        await repo.save_many(models)
+
+
+_current: ContextVar[UnitOfWork | None] = ContextVar("unit_of_work", default=None)
+
+
+def current_unit_of_work() -> UnitOfWork | None:
+    uow = _current.get()
+    return uow if uow is not None and uow.active else None
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """Scopes loads and saves to a single unit, flushed on exit.
+
+    Nested calls join the outer unit. Dirty entities are flushed even if the
+    body raises, as they would have been saved immediately without the unit.
+    """
+    if (existing := current_unit_of_work()) is not None:
+        yield existing
+        return
+
+    uow = UnitOfWork()
+    token = _current.set(uow)
+    try:
+        yield uow
+    finally:
+        _current.reset(token)
+        try:
+            await uow.flush()
+        except Exception as e:
+            logger.error(f"Error flushing unit of work: {e}")
+            raise
@@ -0,0 +1,179 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from pydantic import BaseModel
+
+from infrastructure.datastore.base import DatastoreRepository
+from infrastructure.datastore.unit_of_work import current_unit_of_work, unit_of_work
+
+
+class _Item(BaseModel):
+    id: int | None = None
+    text: str = ""
+
+
+class _ItemRepository(DatastoreRepository[_Item]):
+    def _entity_to_domain(self, entity):
+        return _Item(id=entity.key.id_or_name, text=entity["text"])
+
+
+def _mock_entity(entity_id: int, text: str) -> MagicMock:
+    entity = MagicMock()
+    entity.key.id_or_name = entity_id
+    entity.key.flat_path = ("Item", entity_id)
+    entity.__getitem__.side_effect = {"text": text}.__getitem__
+    return entity
+
+
+@pytest.mark.asyncio
+async def test_loads_are_shared_and_saves_flushed_once():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.get.return_value = _mock_entity(1, "uno")
+        repo = _ItemRepository(kind="Item")
+
+        async with unit_of_work():
+            first = await repo.load(1)
+            second = await repo.load(1)
+            assert first is second
+            assert first is not None
+
+            first.text = "uno editado"
+            await repo.save(first)
+            await repo.save(first)
+            mock_client.put.assert_not_called()
+
+        mock_client.get.assert_called_once()
+        mock_client.put_multi.assert_called_once()
+        assert len(mock_client.put_multi.call_args[0][0]) == 1
+        assert current_unit_of_work() is None
+
+
+@pytest.mark.asyncio
+async def test_misses_are_remembered_and_new_entities_written_immediately():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.get.return_value = None
+        repo = _ItemRepository(kind="Item")
+
+        async with unit_of_work():
+            assert await repo.load(7) is None
+            assert await repo.load(7) is None
+            # No id yet: Datastore has to assign it now
+            await repo.save(_Item(text="nuevo"))
+            mock_client.put.assert_called_once()
+
+        mock_client.get.assert_called_once()
+        mock_client.put_multi.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_nested_units_join_the_outer_one():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        repo = _ItemRepository(kind="Item")
+
+        async with unit_of_work() as outer:
+            async with unit_of_work() as inner:
+                assert inner is outer
+                await repo.save(_Item(id=1, text="uno"))
+            mock_client.put_multi.assert_not_called()
+
+        mock_client.put_multi.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_dirty_entities_are_flushed_when_the_body_raises():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        repo = _ItemRepository(kind="Item")
+
+        with pytest.raises(ValueError):
+            async with unit_of_work():
+                await repo.save(_Item(id=1, text="uno"))
+                raise ValueError("boom")
+
+        mock_client.put_multi.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_queries_see_deferred_saves():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.get.return_value = _mock_entity(1, "uno")
+        mock_client.query.return_value.fetch.return_value = [_mock_entity(1, "uno")]
+        repo = _ItemRepository(kind="Item")
+        other = _ItemRepository(kind="Other")
+        await repo.load_all()
+
+        async with unit_of_work():
+            item = await repo.load(1)
+            item.text = "uno editado"
+            await repo.save(item)
+
+            # A query of another kind doesn't write them
+            await other._query("scan", lambda: [])
+            mock_client.put_multi.assert_not_called()
+
+            # The cache is patched before it answers
+            assert [i.text for i in await repo.load_all()] == ["uno editado"]
+            mock_client.put_multi.assert_called_once()
+
+            item.text = "otra vez"
+            await repo.save(item)
+            await repo._query("scan", lambda: [])
+            assert mock_client.put_multi.call_count == 2
+
+        # Nothing left to write on exit
+        assert mock_client.put_multi.call_count == 2
+
+
+class _Counter(BaseModel):
+    id: int | None = None
+    text: str = ""
+    count: int = 0
+
+
+class _CounterRepository(DatastoreRepository[_Counter]):
+    def _entity_to_domain(self, entity):
+        return _Counter(
+            id=entity.key.id_or_name, text=entity["text"], count=entity["count"]
+        )
+
+
+class _Entity(dict):
+    def __init__(self, entity_id: int, **fields):
+        super().__init__(fields)
+        self.key = MagicMock(id_or_name=entity_id, flat_path=("Counter", entity_id))
+
+
+@pytest.mark.asyncio
+async def test_increments_survive_the_flush_of_earlier_saves():
+    with patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        stored = {1: {"id": 1, "text": "uno", "count": 0}}
+
+        def _put_multi(entities):
+            for entity in entities:
+                # Saves build their entities with the (mocked) datastore module
+                data = (
+                    entity
+                    if isinstance(entity, _Entity)
+                    else entity.update.call_args.args[0]
+                )
+                stored[data["id"]] = dict(data)
+
+        mock_client.key.side_effect = lambda kind, i: i
+        mock_client.get.side_effect = lambda i: _Entity(i, **stored[i])
+        mock_client.get_multi.side_effect = lambda keys: [
+            _Entity(i, **stored[i]) for i in keys
+        ]
+        mock_client.put_multi.side_effect = _put_multi
+        repo = _CounterRepository(kind="Counter")
+
+        async with unit_of_work():
+            item = await repo.load(1)
+            item.text = "uno editado"
+            await repo.save(item)
+            await repo.increment_many({1: {"count": 1}})
+
+        assert stored[1] == {"id": 1, "text": "uno editado", "count": 1}
@@ -1,7 +1,6 @@
-import asyncio
 import logging
 from google.cloud import datastore
-from models.usage import UsageRecord
+from models.usage import ActionType, UsageRecord
 from infrastructure.datastore.base import DatastoreRepository
 
 logger = logging.getLogger(__name__)
@@ -12,13 +11,16 @@ class UsageDatastoreRepository(DatastoreRepository[UsageRecord]):
         super().__init__("Usage")
 
     def _entity_to_domain(self, entity: datastore.Entity) -> UsageRecord:
-        return UsageRecord(
-            user_id=entity["user_id"],
-            platform=entity["platform"],
-            action=entity["action"],
-            phrase_id=entity.get("phrase_id"),
-            timestamp=entity["timestamp"],
-            metadata=entity.get("metadata", {}),
+        return self._build(
+            UsageRecord,
+            dict(
+                user_id=str(entity["user_id"]),
+                platform=entity["platform"],
+                action=ActionType(entity["action"]),
+                phrase_id=entity.get("phrase_id"),
+                timestamp=entity["timestamp"],
+                metadata=entity.get("metadata", {}),
+            ),
         )
 
     async def get_user_usage_count(
@@ -41,7 +43,7 @@ class UsageDatastoreRepository(DatastoreRepository[UsageRecord]):
                 logger.error(f"Error counting usage for {user_id}: {e}")
                 return 0
 
-        return await asyncio.to_thread(_count)
+        return await self._query("get_user_usage_count", _count)
 
     async def get_user_action_count(self, user_id: str, action: str) -> int:
         """Counts how many times a user has performed a specific action."""
@@ -62,7 +64,7 @@ class UsageDatastoreRepository(DatastoreRepository[UsageRecord]):
                 logger.error(f"Error counting action {action} for {user_id}: {e}")
                 return 0
 
-        return await asyncio.to_thread(_count)
+        return await self._query("get_user_action_count", _count)
 
 
 usage_repository = UsageDatastoreRepository()
@@ -1,42 +1,110 @@
-import asyncio
+import time
+from collections.abc import Iterable
 from google.cloud import datastore
 from models.user import User
-from infrastructure.datastore.base import DatastoreRepository
+from infrastructure.datastore.base import (
+    DatastoreRepository,
+    key_id,
+)
+from infrastructure.keys import KeyResolver
+from utils import canonical_id, id_forms
+
+# Seconds a master's alias list is trusted before it's queried again, so links
+# completed on other instances show up eventually.
+ALIAS_INDEX_TTL = 600.0
+
+
+class LinkCache:
+    """Alias -> master ids, plus the reverse master -> aliases index.
+
+    Filled lazily as alias chains are followed and alias lists are queried.
+    Ids are keyed by their canonical form.
+    """
+
+    def __init__(self, alias_index_ttl: float = ALIAS_INDEX_TTL):
+        self.alias_index_ttl = alias_index_ttl
+        self._masters: dict[str | int, str | int] = {}
+        self._aliases: dict[str | int, set[str | int]] = {}
+        # Masters whose full alias set is known, until when
+        self._complete_until: dict[str | int, float] = {}
+
+    def master_of(self, alias_id: str | int) -> str | int | None:
+        return self._masters.get(canonical_id(alias_id))
+
+    def link(self, alias_id: str | int, master_id: str | int) -> None:
+        alias, master = canonical_id(alias_id), canonical_id(master_id)
+        self._masters[alias] = master_id
+        self._aliases.setdefault(master, set()).add(alias)
+
+    def aliases_of(self, master_id: str | int) -> list[str | int] | None:
+        """The master's aliases, or None if they aren't (or no longer) known."""
+        master = canonical_id(master_id)
+        if self._complete_until.get(master, 0.0) < time.monotonic():
+            return None
+        return list(self._aliases.get(master, ()))
+
+    def set_aliases(self, master_id: str | int, alias_ids: Iterable[str | int]) -> None:
+        for alias_id in alias_ids:
+            self.link(alias_id, master_id)
+        master = canonical_id(master_id)
+        self._aliases.setdefault(master, set())
+        self._complete_until[master] = time.monotonic() + self.alias_index_ttl
+
+    def forget(self, user_id: str | int) -> None:
+        """Drops everything known about a user, as alias and as master."""
+        key = canonical_id(user_id)
+        if (master_id := self._masters.pop(key, None)) is not None:
+            master = canonical_id(master_id)
+            self._aliases.get(master, set()).discard(key)
+            self._complete_until.pop(master, None)
+        for alias in self._aliases.pop(key, set()):
+            self._masters.pop(alias, None)
+        self._complete_until.pop(key, None)
 
 
 class UserDatastoreRepository(DatastoreRepository[User]):
-    def __init__(self):
-        super().__init__(User.kind)
+    def __init__(
+        self,
+        generation_check_interval: float | None = None,
+        refresh_after: float | None = None,
+    ):
+        super().__init__(User.kind, generation_check_interval, refresh_after)
+        # Legacy entities are keyed by the string form of numeric ids
+        self._keys = KeyResolver()
+        self._links = LinkCache()
 
     def _entity_to_domain(self, entity: datastore.Entity) -> User:
-        data = dict(entity)
         # We assume data is now normalized after migration
-        return User(**data)
+        return self._build(User, dict(entity))
 
     async def load(self, entity_id: str | int, follow_link: bool = True) -> User | None:
-        if not follow_link:
-            return await super().load(entity_id)
+        if follow_link and (master_id := self._links.master_of(entity_id)) is not None:
+            # Known alias: go straight to its master
+            master = await super().load(master_id)
+            if master and not master.linked_to:
+                return master
+            # The master was deleted or linked elsewhere since; walk the chain
+            self._links.forget(entity_id)
 
-        def _get():
-            key = self.get_key(entity_id)
-            entity = self.client.get(key)
-            if not entity:
-                return None
-            user = self._entity_to_domain(entity)
-            if user.linked_to:
-                visited = {entity_id}
-                current_user = user
-                while current_user.linked_to and current_user.linked_to not in visited:
-                    visited.add(current_user.linked_to)
-                    master_key = self.get_key(current_user.linked_to)
-                    master_entity = self.client.get(master_key)
-                    if not master_entity:
-                        break
-                    current_user = self._entity_to_domain(master_entity)
-                return current_user
+        user = await super().load(entity_id)
+        if not follow_link or not user:
             return user
 
-        return await asyncio.to_thread(_get)
+        # Follow the alias chain hop by hop (each hop goes through the unit of
+        # work, if any, so repeated loads in a request don't hit Datastore).
+        visited = {entity_id}
+        chain: list[str | int] = []
+        while user.linked_to and user.linked_to not in visited:
+            chain.append(user.id)
+            visited.add(user.linked_to)
+            master = await super().load(user.linked_to)
+            if not master:
+                break
+            user = master
+        if not user.linked_to:
+            for alias_id in chain:
+                self._links.link(alias_id, user.id)
+        return user
 
     async def load_raw(self, entity_id: str | int) -> User | None:
         """Loads the user entity without following linked_to."""
@@ -48,6 +116,50 @@ class UserDatastoreRepository(DatastoreRepository[User]):
             return results
         return [u for u in results if not u.gdpr]
 
+    async def get_aliases(self, master_id: str | int) -> list[str | int]:
+        """Ids of every account linked (directly or through a chain) to a master."""
+        if (known := self._links.aliases_of(master_id)) is not None:
+            return known
+
+        def _query(targets: list[str | int]) -> list[str | int]:
+            found: list[str | int] = []
+            for target in targets:
+                query = self.client.query(kind=self.kind)
+                query.add_filter(
+                    filter=datastore.query.PropertyFilter("linked_to", "=", target)
+                )
+                query.keys_only()
+                found.extend(key_id(e.key) for e in query.fetch())
+            return found
+
+        aliases: list[str | int] = []
+        pending = [master_id]
+        seen = {canonical_id(master_id)}
+        while pending:
+            # linked_to may hold either form of the id
+            targets = [form for user_id in pending for form in id_forms(user_id)]
+            found = await self._query("get_aliases", lambda: _query(targets))
+            pending = [a for a in found if canonical_id(a) not in seen]
+            seen.update(canonical_id(a) for a in pending)
+            aliases.extend(pending)
+
+        self._links.set_aliases(master_id, aliases)
+        return aliases
+
+    async def forget_links(self, *user_ids: str | int) -> None:
+        """Drops cached links of users whose linked_to just changed."""
+        for user_id in user_ids:
+            self._links.forget(user_id)
+
+    async def save(self, model: User) -> None:
+        if model.linked_to:
+            self._links.forget(model.id)
+        await super().save(model)
+
+    async def delete(self, entity_id: str | int) -> None:
+        self._links.forget(entity_id)
+        await super().delete(entity_id)
+
     async def get_by_username(self, username: str) -> User | None:
         def _query():
             query = self.client.query(kind=self.kind)
@@ -59,9 +171,12 @@ class UserDatastoreRepository(DatastoreRepository[User]):
                 return None
             return self._entity_to_domain(results[0])
 
-        return await asyncio.to_thread(_query)
+        return await self._query("get_by_username", _query)
 
 
-user_repository = UserDatastoreRepository()
+# Written on nearly every update: bumping a shared generation entity on each
+# write would make it a contention hotspot, so other instances' writes show
+# up through the periodic refresh instead
+user_repository = UserDatastoreRepository(refresh_after=1800)
 # For backward compatibility with imports in some legacy files
 inline_user_repository = user_repository
@@ -0,0 +1,46 @@
+from collections.abc import Mapping
+from google.cloud import datastore
+
+from infrastructure.datastore.base import DatastoreRepository, key_id
+from infrastructure.datastore.unit_of_work import current_unit_of_work
+from models.user_stats import UserStats
+
+
+class UserStatsDatastoreRepository(DatastoreRepository[UserStats]):
+    def __init__(self) -> None:
+        super().__init__(UserStats.kind)
+
+    def _entity_to_domain(self, entity: datastore.Entity) -> UserStats:
+        return UserStats.from_counts(str(key_id(entity.key)), entity)
+
+    def _domain_to_entity(
+        self, model: UserStats, key: datastore.Key
+    ) -> datastore.Entity:
+        entity = datastore.Entity(key=key)
+        entity.update(model.to_counts())
+        return entity
+
+    async def add(self, user_id: str, counts: Mapping[str, int]) -> UserStats:
+        """Adds ``counts`` to the user's stats in one transaction, creating
+        them if needed, and returns the result."""
+        # Like increment_many: pending saves first, so neither overwrites
+        # the other
+        await self._write_pending()
+
+        def _add() -> UserStats:
+            with self.client.transaction():
+                key = self.get_key(user_id)
+                entity = self.client.get(key) or datastore.Entity(key=key)
+                for name, delta in counts.items():
+                    entity[name] = entity.get(name, 0) + delta
+                self.client.put(entity)
+            return self._entity_to_domain(entity)
+
+        stats = await self._run("add", _add)
+        # Later loads in this update (the badge check) reuse the result
+        if (uow := current_unit_of_work()) is not None:
+            uow.register(self.kind, user_id, stats)
+        return stats
+
+
+user_stats_repository = UserStatsDatastoreRepository()
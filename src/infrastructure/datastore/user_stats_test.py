@@ -0,0 +1,38 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from infrastructure.datastore.unit_of_work import unit_of_work
+from infrastructure.datastore.user_stats import UserStatsDatastoreRepository
+from models.usage import ActionType
+from models.user_stats import UserStats
+
+
+class _Entity(dict):
+    def __init__(self, key):
+        super().__init__()
+        self.key = key
+
+
+@pytest.mark.asyncio
+async def test_add_creates_and_increments_in_a_transaction():
+    with (
+        patch("infrastructure.datastore.base.get_datastore_client") as mock_get_client,
+        patch("infrastructure.datastore.user_stats.datastore.Entity", _Entity),
+    ):
+        mock_client = mock_get_client.return_value
+        mock_client.key.side_effect = lambda kind, i: MagicMock(flat_path=(kind, i))
+        stored: dict[str, _Entity] = {}
+        mock_client.get.side_effect = lambda key: stored.get(key.flat_path[1])
+        mock_client.put.side_effect = lambda e: stored.update({e.key.flat_path[1]: e})
+
+        repo = UserStatsDatastoreRepository()
+        await repo.add("7", UserStats.deltas(ActionType.AUDIO))
+        async with unit_of_work():
+            stats = await repo.add("7", UserStats.deltas(ActionType.AUDIO, posters=1))
+            # The badge check that follows reads it without another get
+            assert await repo.load("7") == stats
+
+        assert stats == UserStats(id="7", usages=2, actions={"audio": 2}, posters=1)
+        assert mock_client.transaction.call_count == 2
+        assert mock_client.get.call_count == 2
@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 import pytest
 from models.user import User
 from infrastructure.datastore.user import (
@@ -19,6 +19,7 @@ def create_mock_entity(data, kind="User", entity_id=None):
         entity_id or data.get("id") or data.get("chat_id") or data.get("user_id")
     )
     m.key.kind = kind
+    m.key.flat_path = (kind, m.key.id)
     m.key.id = entity_id or data.get("id") or data.get("chat_id") or data.get("user_id")
     return m
 
@@ -74,6 +75,38 @@ class TestUserRepository:
         assert user.id == 123
         assert mock_datastore_client.get.called
 
+    @pytest.mark.asyncio
+    async def test_load_resolves_legacy_string_key_once(
+        self, repo, mock_datastore_client
+    ):
+        legacy = create_mock_entity({"id": "123", "name": "Legacy"}, entity_id="123")
+        mock_datastore_client.get.side_effect = lambda key: (
+            legacy if key.id == "123" else None
+        )
+
+        assert (await repo.load(123)).name == "Legacy"
+        assert (await repo.load(123)).name == "Legacy"
+        # int miss + str hit, then straight to the remembered string key
+        assert [c.args[0].id for c in mock_datastore_client.get.call_args_list] == [
+            123,
+            "123",
+            "123",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_load_skips_known_missing_legacy_key(
+        self, repo, mock_datastore_client
+    ):
+        mock_datastore_client.get.return_value = None
+
+        assert await repo.load(999) is None
+        assert await repo.load(999) is None
+        assert [c.args[0].id for c in mock_datastore_client.get.call_args_list] == [
+            999,
+            "999",
+            999,
+        ]
+
     @pytest.mark.asyncio
     async def test_load_all_users(self, repo, mock_datastore_client):
         user1_data = {"id": 1, "name": "User 1", "gdpr": False}
@@ -110,3 +143,60 @@ class TestUserRepository:
     async def test_save_user(self, repo):
         user = User(id=123, name="Test")
         await repo.save(user)
+
+    @pytest.mark.asyncio
+    async def test_load_alias_goes_straight_to_cached_master(
+        self, repo, mock_datastore_client
+    ):
+        entities = {
+            1: create_mock_entity({"id": 1, "linked_to": 2}, entity_id=1),
+            2: create_mock_entity({"id": 2, "name": "Master"}, entity_id=2),
+        }
+        mock_datastore_client.get.side_effect = lambda key: entities.get(key.id)
+
+        assert (await repo.load(1)).id == 2
+        mock_datastore_client.get.reset_mock()
+
+        assert (await repo.load(1)).id == 2
+        assert [c.args[0].id for c in mock_datastore_client.get.call_args_list] == [2]
+
+        # A new link invalidates it: the chain is walked again
+        await repo.forget_links(1, 2)
+        mock_datastore_client.get.reset_mock()
+        assert (await repo.load(1)).id == 2
+        assert [c.args[0].id for c in mock_datastore_client.get.call_args_list] == [
+            1,
+            2,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_get_aliases_queries_once(self, repo, mock_datastore_client):
+        alias_key = MagicMock()
+        alias_key.flat_path = ("User", 1)
+
+        def mock_query_side_effect(kind=None):
+            q = MagicMock()
+            q.filters = []
+            q.add_filter.side_effect = lambda filter=None, *args: q.filters.append(
+                filter
+            )
+            q.fetch.side_effect = lambda: (
+                [MagicMock(key=alias_key)] if ("linked_to", "=", 2) in q.filters else []
+            )
+            return q
+
+        mock_datastore_client.query.side_effect = mock_query_side_effect
+
+        with patch(
+            "infrastructure.datastore.user.datastore.query.PropertyFilter",
+            side_effect=lambda *args: args,
+        ):
+            assert await repo.get_aliases(2) == [1]
+            calls = mock_datastore_client.query.call_count
+            assert await repo.get_aliases(2) == [1]
+            assert mock_datastore_client.query.call_count == calls
+
+            await repo.forget_links(2)
+            assert await repo.get_aliases(2) == [1]
+            assert mock_datastore_client.query.call_count > calls
+        mock_datastore_client.query.side_effect = None
@@ -0,0 +1,63 @@
+"""In-memory search and filtering shared by every repository backend.
+
+The Datastore repositories fall back to these when they serve a query from
+their cache, and the in-memory backend uses them for everything, so both
+backends answer ``get_phrases``/``get_proposals`` the same way.
+"""
+
+from collections.abc import Sequence
+from typing import Any, TypeVar
+
+from utils import normalize_str
+
+M = TypeVar("M")
+
+# Filter value meaning "field is unset/falsy"
+EMPTY = "__EMPTY__"
+
+
+def normalized_text(item: object) -> str:
+    """The item's normalized text, precomputed when the model provides it."""
+    normalized = getattr(item, "normalized_text", None)
+    if normalized is None:
+        normalized = normalize_str(getattr(item, "text", ""))
+    return normalized
+
+
+def search_text(items: Sequence[M], search: str) -> list[M]:
+    """Keeps the items whose normalized text contains the normalized search."""
+    if not search:
+        return list(items)
+    norm_search = normalize_str(search)
+    return [i for i in items if norm_search in normalized_text(i)]
+
+
+def filter_phrases(items: Sequence[M], filters: dict[str, Any]) -> list[M]:
+    """Phrase filters: falsy values are ignored, matches compare as strings."""
+    results = list(items)
+    for field, value in filters.items():
+        if value == EMPTY:
+            results = [p for p in results if not getattr(p, field, None)]
+        elif value:
+            results = [p for p in results if str(getattr(p, field, None)) == str(value)]
+    return results
+
+
+def filter_proposals(items: Sequence[M], filters: dict[str, Any]) -> list[M]:
+    """Proposal filters: like phrases, but matches are case-insensitive."""
+    results = list(items)
+    for field, value in filters.items():
+        if value is None or value == "":
+            continue
+        if value == EMPTY:
+            results = [p for p in results if not getattr(p, field, None)]
+        else:
+            str_val = str(value).lower()
+            results = [
+                p for p in results if str(getattr(p, field, None)).lower() == str_val
+            ]
+    return results
+
+
+def paginate(items: list[M], limit: int = 0, offset: int = 0) -> list[M]:
+    return items[offset : offset + limit] if limit > 0 else items
@@ -0,0 +1,65 @@
+"""Resolution of ids that may be stored as ints or as legacy digit strings.
+
+Telegram ids are ints, but older entities (and ``user_id`` properties) were
+written with the id as a string. Looking one up used to mean trying one form
+and retrying with the other on a miss. ``KeyResolver`` remembers which form
+an id was found under, and that the legacy form is missing (for a while), so
+the usual lookup is a single RPC.
+
+Only the legacy form is ever cached as missing: the canonical form is always
+tried, so an entity created by another instance is never hidden.
+"""
+
+import time
+
+from utils import canonical_id, id_forms
+
+# Seconds a legacy form is remembered as missing
+NEGATIVE_TTL = 600.0
+# Bound on remembered ids, oldest dropped first
+MAX_ENTRIES = 50_000
+
+
+class KeyResolver:
+    def __init__(
+        self, negative_ttl: float = NEGATIVE_TTL, max_entries: int = MAX_ENTRIES
+    ):
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        # Canonical id -> form it was found under
+        self._found: dict[str | int, str | int] = {}
+        # Legacy form -> monotonic time until which it's known to be missing
+        self._missing: dict[str | int, float] = {}
+
+    def candidates(self, entity_id: str | int) -> list[str | int]:
+        """The forms worth trying for an id, in order."""
+        forms = id_forms(entity_id)
+        if (known := self._found.get(forms[0])) is not None:
+            return [known]
+        now = time.monotonic()
+        return [forms[0]] + [f for f in forms[1:] if self._missing.get(f, 0.0) <= now]
+
+    def found(self, entity_id: str | int, form: str | int) -> None:
+        self._missing.pop(form, None)
+        _bounded_set(self._found, canonical_id(entity_id), form, self.max_entries)
+
+    def missed(self, entity_id: str | int, form: str | int) -> None:
+        canonical = canonical_id(entity_id)
+        if self._found.get(canonical) == form:
+            self._found.pop(canonical)
+        if form != canonical:
+            expires = time.monotonic() + self.negative_ttl
+            _bounded_set(self._missing, form, expires, self.max_entries)
+
+    def forget(self, entity_id: str | int) -> None:
+        for form in id_forms(entity_id):
+            self._found.pop(form, None)
+            self._missing.pop(form, None)
+
+
+def _bounded_set(d: dict, key: object, value: object, max_entries: int) -> None:
+    d.pop(key, None)
+    d[key] = value
+    if len(d) > max_entries:
+        # Dicts keep insertion order: drop the oldest entry
+        d.pop(next(iter(d)))
@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+from infrastructure.keys import KeyResolver
+
+
+def test_candidates_canonical_first():
+    keys = KeyResolver()
+    assert keys.candidates("123") == [123, "123"]
+    assert keys.candidates(-5) == [-5, "-5"]
+    assert keys.candidates("U123") == ["U123"]
+
+
+def test_found_form_is_remembered():
+    keys = KeyResolver()
+    keys.found(123, "123")
+    assert keys.candidates("123") == ["123"]
+
+    # A miss on the remembered form goes back to trying everything
+    keys.missed(123, "123")
+    assert keys.candidates(123) == [123]
+
+
+def test_legacy_miss_expires():
+    keys = KeyResolver(negative_ttl=10)
+    with patch("infrastructure.keys.time.monotonic", return_value=100.0):
+        keys.missed(123, 123)
+        keys.missed(123, "123")
+        assert keys.candidates(123) == [123]
+    with patch("infrastructure.keys.time.monotonic", return_value=111.0):
+        assert keys.candidates(123) == [123, "123"]
+
+
+def test_forget_and_bound():
+    keys = KeyResolver(max_entries=2)
+    keys.found(1, 1)
+    keys.found(2, "2")
+    keys.found(3, 3)
+    assert keys.candidates(1) == [1, "1"]
+    assert keys.candidates(2) == ["2"]
+
+    keys.forget("2")
+    assert keys.candidates(2) == [2, "2"]
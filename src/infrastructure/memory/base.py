@@ -0,0 +1,86 @@
+"""Dict-backed repository base for the in-memory backend.
+
+Models are copied on the way in and out, so callers see the same semantics
+as with Datastore: changes only persist once a model is saved, and new
+entities get an integer id assigned on their first save.
+"""
+
+import itertools
+from collections.abc import AsyncIterator, Mapping, Sequence
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+from utils import id_forms
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class InMemoryRepository(Generic[T]):
+    # Kinds whose numeric ids may also be stored as legacy strings
+    legacy_string_keys = False
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._store: dict[str | int, T] = {}
+        self._ids = itertools.count(1)
+
+    def _copy(self, model: T) -> T:
+        return model.model_copy(deep=True)
+
+    def _assign_id(self, model: T) -> str | int:
+        entity_id = getattr(model, "id", None)
+        if entity_id:
+            return entity_id
+        # Mimic Datastore's auto-allocated numeric ids
+        entity_id = next(self._ids)
+        while entity_id in self._store:
+            entity_id = next(self._ids)
+        if "id" in type(model).model_fields:
+            setattr(model, "id", entity_id)
+        return entity_id
+
+    async def save(self, model: T) -> None:
+        entity_id = self._assign_id(model)
+        self._store[entity_id] = self._copy(model)
+
+    async def delete(self, entity_id: str | int) -> None:
+        self._store.pop(entity_id, None)
+
+    async def load(self, entity_id: str | int) -> T | None:
+        forms = id_forms(entity_id) if self.legacy_string_keys else [entity_id]
+        for form in forms:
+            if (model := self._store.get(form)) is not None:
+                return self._copy(model)
+        return None
+
+    async def load_all(self) -> list[T]:
+        return [self._copy(m) for m in self._store.values()]
+
+    async def iter_pages(self, page_size: int = 500) -> AsyncIterator[list[T]]:
+        models = list(self._store.values())
+        for start in range(0, len(models), page_size):
+            yield [self._copy(m) for m in models[start : start + page_size]]
+
+    async def load_many(self, entity_ids: Sequence[str | int]) -> list[T]:
+        return [self._copy(self._store[i]) for i in entity_ids if i in self._store]
+
+    async def save_many(self, models: Sequence[T]) -> None:
+        for model in models:
+            await self.save(model)
+
+    async def increment_many(
+        self, deltas: Mapping[str | int, Mapping[str, int]]
+    ) -> None:
+        for entity_id, fields in deltas.items():
+            if (model := self._store.get(entity_id)) is not None:
+                for field, delta in fields.items():
+                    setattr(model, field, getattr(model, field) + delta)
+
+    async def delete_many(self, entity_ids: Sequence[str | int]) -> None:
+        for entity_id in entity_ids:
+            self._store.pop(entity_id, None)
+
+    def clear_cache(self) -> None:
+        # The store is the source of truth; there's no cache to drop
+        pass
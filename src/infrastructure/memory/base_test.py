@@ -0,0 +1,58 @@
+import pytest
+from models.chat import Chat
+from models.phrase import Phrase
+from models.usage import ActionType, UsageRecord
+from infrastructure.memory.base import InMemoryRepository
+from infrastructure.memory.chat import ChatMemoryRepository
+from infrastructure.memory.phrase import PhraseMemoryRepository
+from infrastructure.memory.usage import UsageMemoryRepository
+
+
+class TestInMemoryRepository:
+    @pytest.mark.asyncio
+    async def test_save_assigns_numeric_id(self):
+        repo = PhraseMemoryRepository()
+        first, second = Phrase(text="uno"), Phrase(text="dos")
+        await repo.save(first)
+        await repo.save(second)
+
+        assert first.id == 1
+        assert second.id == 2
+        assert (await repo.load(2)).text == "dos"
+
+    @pytest.mark.asyncio
+    async def test_changes_need_save(self):
+        repo = ChatMemoryRepository()
+        await repo.save(Chat(id=10, title="Bar"))
+
+        chat = await repo.load(10)
+        chat.title = "Taberna"
+        assert (await repo.load(10)).title == "Bar"
+
+        await repo.save(chat)
+        assert (await repo.load(10)).title == "Taberna"
+
+    @pytest.mark.asyncio
+    async def test_batch_operations(self):
+        repo = ChatMemoryRepository()
+        await repo.save_many([Chat(id=1), Chat(id=2), Chat(id=3)])
+
+        assert [c.id for c in await repo.load_many([3, 99, 1])] == [3, 1]
+
+        await repo.delete_many([1, 2])
+        assert [c.id for c in await repo.load_all()] == [3]
+
+    @pytest.mark.asyncio
+    async def test_models_without_id(self):
+        repo = UsageMemoryRepository()
+        await repo.save(UsageRecord(user_id="1", platform="telegram", action="phrase"))
+        await repo.save(
+            UsageRecord(user_id="1", platform="slack", action=ActionType.AUDIO)
+        )
+
+        assert await repo.get_user_usage_count("1") == 2
+        assert await repo.get_user_usage_count("1", platform="slack") == 1
+        assert await repo.get_user_action_count("1", ActionType.AUDIO) == 1
+
+    def test_generic_base_keeps_kind(self):
+        assert InMemoryRepository[Chat]("Chat").kind == "Chat"
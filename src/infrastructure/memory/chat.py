@@ -0,0 +1,9 @@
+from models.chat import Chat
+from infrastructure.memory.base import InMemoryRepository
+
+
+class ChatMemoryRepository(InMemoryRepository[Chat]):
+    legacy_string_keys = True
+
+    def __init__(self):
+        super().__init__("Chat")
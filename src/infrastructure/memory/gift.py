@@ -0,0 +1,14 @@
+from models.gift import Gift
+from infrastructure.memory.base import InMemoryRepository
+
+
+class GiftMemoryRepository(InMemoryRepository[Gift]):
+    def __init__(self):
+        super().__init__(Gift.kind)
+
+    async def get_gifts_for_user(self, user_id: int) -> list[Gift]:
+        results = [
+            self._copy(g) for g in self._store.values() if g.receiver_id == user_id
+        ]
+        results.sort(key=lambda x: x.created_at, reverse=True)
+        return results
@@ -0,0 +1,7 @@
+from models.link_request import LinkRequest
+from infrastructure.memory.base import InMemoryRepository
+
+
+class LinkRequestMemoryRepository(InMemoryRepository[LinkRequest]):
+    def __init__(self):
+        super().__init__("LinkRequest")
@@ -0,0 +1,64 @@
+from collections.abc import Sequence
+
+from models.phrase import Phrase, LongPhrase
+from infrastructure.filters import filter_phrases, paginate, search_text
+from infrastructure.memory.base import InMemoryRepository
+from infrastructure.similarity import best_match
+from utils import normalize_str
+
+
+class PhraseMemoryRepository(InMemoryRepository[Phrase]):
+    def __init__(self, model_class: type[Phrase] | type[LongPhrase] = Phrase):
+        super().__init__(model_class.kind)
+        self.model_class = model_class
+        self._version = 0
+
+    async def save(self, model: Phrase) -> None:
+        await super().save(model)
+        self._version += 1
+
+    async def delete(self, entity_id: str | int) -> None:
+        await super().delete(entity_id)
+        self._version += 1
+
+    async def delete_many(self, entity_ids: Sequence[str | int]) -> None:
+        await super().delete_many(entity_ids)
+        self._version += 1
+
+    def catalogue_version(self) -> int:
+        return self._version
+
+    async def get_phrases(
+        self, search: str = "", limit: int = 0, offset: int = 0, **filters: object
+    ) -> list[Phrase]:
+        results = filter_phrases(search_text(await self.load_all(), search), filters)
+        return paginate(results, limit, offset)
+
+    async def get_phrase_pool(self, search: str = "") -> Sequence[Phrase]:
+        return await self.get_phrases(search=search)
+
+    async def find_similar(
+        self, text: str, threshold: int = 0
+    ) -> tuple[Phrase | None, int]:
+        models = self._store.values()
+        best, score = best_match(
+            normalize_str(text), ((m, m.normalized_text) for m in models), threshold
+        )
+        return (self._copy(best) if best is not None else None), score
+
+    async def add_usage(self, phrase_text: str, usage_type: str) -> None:
+        phrase = next((p for p in self._store.values() if p.text == phrase_text), None)
+        if phrase:
+            phrase.usages += 1
+            phrase.score += 1
+            if usage_type == "audio":
+                phrase.audio_usages += 1
+            elif usage_type == "sticker":
+                phrase.sticker_usages += 1
+
+    async def add_usage_by_id(self, phrase_id: str | int) -> None:
+        if phrase := self._store.get(phrase_id):
+            phrase.usages += 1
+
+    async def get_user_phrase_count(self, user_id: str | int) -> int:
+        return sum(1 for p in self._store.values() if str(p.user_id) == str(user_id))
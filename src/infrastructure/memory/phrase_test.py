@@ -0,0 +1,61 @@
+import pytest
+from models.phrase import Phrase
+from infrastructure.memory.phrase import PhraseMemoryRepository
+
+
+@pytest.fixture
+async def repo():
+    repo = PhraseMemoryRepository()
+    await repo.save_many(
+        [
+            Phrase(text="Cuñado", user_id=1, sticker_file_id="s1"),
+            Phrase(text="Fiera", user_id="1"),
+            Phrase(text="Máquina", user_id=2),
+        ]
+    )
+    return repo
+
+
+class TestPhraseMemoryRepository:
+    @pytest.mark.asyncio
+    async def test_search_is_normalized(self, repo):
+        results = await repo.get_phrases(search="cunado")
+        assert [p.text for p in results] == ["Cuñado"]
+
+    @pytest.mark.asyncio
+    async def test_filters_compare_as_strings(self, repo):
+        results = await repo.get_phrases(user_id="1")
+        assert [p.text for p in results] == ["Cuñado", "Fiera"]
+
+    @pytest.mark.asyncio
+    async def test_empty_filter(self, repo):
+        results = await repo.get_phrases(sticker_file_id="__EMPTY__")
+        assert [p.text for p in results] == ["Fiera", "Máquina"]
+
+    @pytest.mark.asyncio
+    async def test_limit_and_offset(self, repo):
+        results = await repo.get_phrases(limit=1, offset=1)
+        assert [p.text for p in results] == ["Fiera"]
+
+    @pytest.mark.asyncio
+    async def test_usage_counters(self, repo):
+        await repo.add_usage("Fiera", "audio")
+        await repo.add_usage_by_id(1)
+
+        fiera = await repo.load(2)
+        assert (fiera.usages, fiera.audio_usages, fiera.score) == (1, 1, 1)
+        assert (await repo.load(1)).usages == 1
+
+    @pytest.mark.asyncio
+    async def test_user_phrase_count(self, repo):
+        assert await repo.get_user_phrase_count(1) == 2
+        assert await repo.get_user_phrase_count("2") == 1
+
+    @pytest.mark.asyncio
+    async def test_find_similar(self, repo):
+        found, score = await repo.find_similar("maquinas", 90)
+        assert (found.text, score) == ("Máquina", 93)
+
+        found.text = "Otra"
+        assert (await repo.load(found.id)).text == "Máquina"
+        assert await repo.find_similar("zzz", 90) == (None, 0)
@@ -0,0 +1,19 @@
+from models.poster_request import PosterRequest
+from infrastructure.memory.base import InMemoryRepository
+
+
+class PosterRequestMemoryRepository(InMemoryRepository[PosterRequest]):
+    def __init__(self) -> None:
+        super().__init__("PosterRequest")
+
+    async def count_completed_by_user(self, user_id: str | int) -> int:
+        return len(await self.get_completed_by_user(user_id))
+
+    async def get_completed_by_user(self, user_id: str | int) -> list[PosterRequest]:
+        results = [
+            self._copy(p)
+            for p in self._store.values()
+            if str(p.user_id) == str(user_id) and p.status == "completed"
+        ]
+        results.sort(key=lambda x: x.message_id or 0, reverse=True)
+        return results
@@ -0,0 +1,26 @@
+from models.proposal import Proposal, LongProposal
+from infrastructure.filters import filter_proposals, paginate, search_text
+from infrastructure.memory.base import InMemoryRepository
+from infrastructure.similarity import best_match
+from utils import normalize_str
+
+
+class ProposalMemoryRepository(InMemoryRepository[Proposal]):
+    def __init__(self, model_class: type[Proposal] | type[LongProposal] = Proposal):
+        super().__init__(model_class.kind)
+        self.model_class = model_class
+
+    async def get_proposals(
+        self, search: str = "", limit: int = 0, offset: int = 0, **filters: object
+    ) -> list[Proposal]:
+        results = filter_proposals(search_text(await self.load_all(), search), filters)
+        return paginate(results, limit, offset)
+
+    async def find_similar(
+        self, text: str, threshold: int = 0
+    ) -> tuple[Proposal | None, int]:
+        models = self._store.values()
+        best, score = best_match(
+            normalize_str(text), ((m, m.normalized_text) for m in models), threshold
+        )
+        return (self._copy(best) if best is not None else None), score
@@ -0,0 +1,24 @@
+from models.usage import UsageRecord
+from infrastructure.memory.base import InMemoryRepository
+
+
+class UsageMemoryRepository(InMemoryRepository[UsageRecord]):
+    def __init__(self):
+        super().__init__("Usage")
+
+    async def get_user_usage_count(
+        self, user_id: str, platform: str | None = None
+    ) -> int:
+        return sum(
+            1
+            for u in self._store.values()
+            if u.user_id == user_id and (not platform or u.platform == platform)
+        )
+
+    async def get_user_action_count(self, user_id: str, action: str) -> int:
+        """Counts how many times a user has performed a specific action."""
+        return sum(
+            1
+            for u in self._store.values()
+            if u.user_id == str(user_id) and u.action == action
+        )
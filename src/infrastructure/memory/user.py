@@ -0,0 +1,60 @@
+from models.user import User
+from utils import canonical_id
+from infrastructure.memory.base import InMemoryRepository
+
+
+class UserMemoryRepository(InMemoryRepository[User]):
+    legacy_string_keys = True
+
+    def __init__(self):
+        super().__init__(User.kind)
+
+    async def load(self, entity_id: str | int, follow_link: bool = True) -> User | None:
+        user = await super().load(entity_id)
+        if not follow_link or not user:
+            return user
+
+        visited = {entity_id}
+        while user.linked_to and user.linked_to not in visited:
+            visited.add(user.linked_to)
+            master = await super().load(user.linked_to)
+            if not master:
+                break
+            user = master
+        return user
+
+    async def load_raw(self, entity_id: str | int) -> User | None:
+        """Loads the user without following linked_to."""
+        return await self.load(entity_id, follow_link=False)
+
+    async def load_all(self, ignore_gdpr: bool = False) -> list[User]:
+        results = await super().load_all()
+        if ignore_gdpr:
+            return results
+        return [u for u in results if not u.gdpr]
+
+    async def get_aliases(self, master_id: str | int) -> list[str | int]:
+        aliases: list[str | int] = []
+        pending = {canonical_id(master_id)}
+        seen = set(pending)
+        while pending:
+            found = [
+                u.id
+                for u in self._store.values()
+                if u.linked_to is not None and canonical_id(u.linked_to) in pending
+            ]
+            pending = {canonical_id(a) for a in found} - seen
+            seen |= pending
+            aliases.extend(a for a in found if canonical_id(a) in pending)
+        return aliases
+
+    async def forget_links(self, *user_ids: str | int) -> None:
+        # Nothing cached: links are read straight from the store
+        pass
+
+    async def get_by_username(self, username: str) -> User | None:
+        clean_username = username.lstrip("@")
+        user = next(
+            (u for u in self._store.values() if u.username == clean_username), None
+        )
+        return self._copy(user) if user else None
@@ -0,0 +1,17 @@
+from collections import Counter
+from collections.abc import Mapping
+
+from models.user_stats import UserStats
+from infrastructure.memory.base import InMemoryRepository
+
+
+class UserStatsMemoryRepository(InMemoryRepository[UserStats]):
+    def __init__(self) -> None:
+        super().__init__(UserStats.kind)
+
+    async def add(self, user_id: str, counts: Mapping[str, int]) -> UserStats:
+        stored = self._store.get(user_id) or UserStats(id=user_id)
+        totals = Counter(stored.to_counts())
+        totals.update(counts)
+        self._store[user_id] = UserStats.from_counts(user_id, totals)
+        return self._copy(self._store[user_id])
@@ -0,0 +1,34 @@
+import pytest
+from models.user import User
+from infrastructure.memory.user import UserMemoryRepository
+
+
+class TestUserMemoryRepository:
+    @pytest.mark.asyncio
+    async def test_load_follows_link(self):
+        repo = UserMemoryRepository()
+        await repo.save_many(
+            [
+                User(id="slack_1", platform="slack", linked_to=1),
+                User(id=1, name="Master", username="master"),
+            ]
+        )
+
+        assert (await repo.load("slack_1")).id == 1
+        assert (await repo.load_raw("slack_1")).id == "slack_1"
+
+    @pytest.mark.asyncio
+    async def test_load_all_hides_gdpr(self):
+        repo = UserMemoryRepository()
+        await repo.save_many([User(id=1), User(id=2, gdpr=True)])
+
+        assert [u.id for u in await repo.load_all()] == [1]
+        assert len(await repo.load_all(ignore_gdpr=True)) == 2
+
+    @pytest.mark.asyncio
+    async def test_get_by_username(self):
+        repo = UserMemoryRepository()
+        await repo.save(User(id=1, username="fiera"))
+
+        assert (await repo.get_by_username("@fiera")).id == 1
+        assert await repo.get_by_username("nadie") is None
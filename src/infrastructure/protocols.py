@@ -1,9 +1,11 @@
+from collections.abc import AsyncIterator, Mapping, Sequence
 from typing import Protocol, TypeVar, runtime_checkable
 from models.phrase import Phrase, LongPhrase
 from models.proposal import Proposal, LongProposal
 from models.user import User
 from models.chat import Chat
 from models.usage import UsageRecord
+from models.user_stats import UserStats
 from models.gift import Gift
 from models.link_request import LinkRequest
 from models.poster_request import PosterRequest
@@ -11,12 +13,28 @@ from models.poster_request import PosterRequest
 T = TypeVar("T")
 
 
+class IncrementError(Exception):
+    """``increment_many`` failed after applying some of the increments;
+    ``pending`` holds the ones it didn't apply."""
+
+    def __init__(self, pending: Mapping[str | int, Mapping[str, int]]):
+        super().__init__(f"{len(pending)} increments were not applied")
+        self.pending = pending
+
+
 @runtime_checkable
 class Repository(Protocol[T]):
     async def save(self, model: T) -> None: ...
     async def delete(self, entity_id: str | int) -> None: ...
     async def load(self, entity_id: str | int) -> T | None: ...
     async def load_all(self) -> list[T]: ...
+    def iter_pages(self, page_size: int = ...) -> AsyncIterator[list[T]]: ...
+    async def load_many(self, entity_ids: Sequence[str | int]) -> list[T]: ...
+    async def save_many(self, models: Sequence[T]) -> None: ...
+    async def increment_many(
+        self, deltas: Mapping[str | int, Mapping[str, int]]
+    ) -> None: ...
+    async def delete_many(self, entity_ids: Sequence[str | int]) -> None: ...
     def clear_cache(self) -> None: ...
 
 
@@ -30,6 +48,11 @@ class PhraseRepository(Repository[Phrase], Protocol):
     async def get_phrases(
         self, search: str = "", limit: int = 0, **filters: object
     ) -> list[Phrase]: ...
+    async def get_phrase_pool(self, search: str = "") -> Sequence[Phrase]: ...
+    def catalogue_version(self) -> int: ...
+    async def find_similar(
+        self, text: str, threshold: int = 0
+    ) -> tuple[Phrase | None, int]: ...
     async def add_usage(self, phrase_text: str, usage_type: str) -> None: ...
     async def get_user_phrase_count(self, user_id: str) -> int: ...
 
@@ -39,6 +62,11 @@ class LongPhraseRepository(Repository[LongPhrase], Protocol):
     async def get_phrases(
         self, search: str = "", limit: int = 0, **filters: object
     ) -> list[LongPhrase]: ...
+    async def get_phrase_pool(self, search: str = "") -> Sequence[LongPhrase]: ...
+    def catalogue_version(self) -> int: ...
+    async def find_similar(
+        self, text: str, threshold: int = 0
+    ) -> tuple[LongPhrase | None, int]: ...
     async def get_user_phrase_count(self, user_id: str) -> int: ...
 
 
@@ -47,6 +75,9 @@ class ProposalRepository(Repository[Proposal], Protocol):
     async def get_proposals(
         self, search: str = "", limit: int = 0, offset: int = 0, **filters: object
     ) -> list[Proposal]: ...
+    async def find_similar(
+        self, text: str, threshold: int = 0
+    ) -> tuple[Proposal | None, int]: ...
 
 
 @runtime_checkable
@@ -54,6 +85,9 @@ class LongProposalRepository(Repository[LongProposal], Protocol):
     async def get_proposals(
         self, search: str = "", limit: int = 0, offset: int = 0, **filters: object
     ) -> list[LongProposal]: ...
+    async def find_similar(
+        self, text: str, threshold: int = 0
+    ) -> tuple[LongProposal | None, int]: ...
 
 
 @runtime_checkable
@@ -61,6 +95,8 @@ class UserRepository(Repository[User], Protocol):
     async def load_all(self, ignore_gdpr: bool = False) -> list[User]: ...
     async def load_raw(self, entity_id: str | int) -> User | None: ...
     async def get_by_username(self, username: str) -> User | None: ...
+    async def get_aliases(self, master_id: str | int) -> list[str | int]: ...
+    async def forget_links(self, *user_ids: str | int) -> None: ...
 
 
 @runtime_checkable
@@ -89,6 +125,11 @@ class UsageRepository(Protocol):
     async def get_user_action_count(self, user_id: str, action: str) -> int: ...
 
 
+@runtime_checkable
+class UserStatsRepository(Repository[UserStats], Protocol):
+    async def add(self, user_id: str, counts: Mapping[str, int]) -> UserStats: ...
+
+
 # Keeping it as an alias for backward compatibility in some places,
 # but now it uses User model.
 class InlineUserRepository(UserRepository, Protocol): ...
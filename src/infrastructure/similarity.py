@@ -0,0 +1,216 @@
+"""Fuzzy duplicate lookup over normalized texts.
+
+``ratio`` is ``fuzz.ratio``: the rounded indel similarity of two strings.
+Scoring every stored text against a new one is linear in the catalogue, so a
+lookup that only cares about matches above a threshold first narrows the
+texts down with two necessary conditions for such a match:
+
+- Length: a ratio ``r`` needs the shorter text to be at least ``r / (2 - r)``
+  of the longer one.
+- Shared trigrams: each insertion or deletion breaks at most three of a
+  text's distinct trigrams, so a match within ``d`` edits shares all but
+  ``3 * d`` of them. Any ``3 * d + 1`` of the query's trigrams therefore
+  include one the match has; probing the rarest ones keeps candidates few.
+
+Candidates are then scored exactly, so the best match and its score are the
+same as a full scan's whenever that score is above the threshold. Below it
+the result is the best among the candidates only.
+"""
+
+from collections.abc import Callable, Collection, Iterable, Iterator, MutableMapping
+from typing import Any, Generic, Protocol, TypeVar
+
+from Levenshtein import ratio as _indel_ratio
+
+from utils import normalize_str
+
+K = TypeVar("K")
+M = TypeVar("M", bound="HasNormalizedText")
+
+# Keeps float error from excluding a match sitting right on a bound
+_EPSILON = 1e-9
+
+
+class HasNormalizedText(Protocol):
+    @property
+    def normalized_text(self) -> str: ...
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def ratio(a: str, b: str) -> int:
+    """Same score as ``fuzzywuzzy.fuzz.ratio``, without its per-call overhead."""
+    if a == b:
+        return 100
+    if not a or not b:
+        return 0
+    return int(round(100 * _indel_ratio(a, b)))
+
+
+def _min_ratio(threshold: int) -> float:
+    # Lowest raw ratio that can round to a score above ``threshold``
+    return (threshold + 0.5) / 100 - _EPSILON
+
+
+def length_bounds(length: int, threshold: int) -> tuple[int, int]:
+    """Text lengths that can score above ``threshold`` against ``length``."""
+    r = _min_ratio(threshold)
+    if r <= 0:
+        return 0, 2**63
+    factor = r / (2 - r)
+    return int(-(-length * factor // 1)), int(length / factor + _EPSILON)
+
+
+def max_edits(length: int, threshold: int) -> int:
+    """Most insertions and deletions a text can be away from one of ``length``
+    characters while still scoring above ``threshold``."""
+    r = _min_ratio(threshold)
+    longest = length_bounds(length, threshold)[1]
+    return int((length + longest) * (1 - r) + _EPSILON)
+
+
+def probe(
+    query: str, threshold: int, posting: Callable[[str], Collection[K]]
+) -> set[K] | None:
+    """Keys that may score above ``threshold`` against ``query``: those in the
+    postings of its rarest ``3 * d + 1`` trigrams. None when the query has too
+    few trigrams for that to rule anything out, and a scan is needed instead.
+    """
+    grams = trigrams(query)
+    needed = 3 * max_edits(len(query), threshold) + 1
+    if needed > len(grams):
+        return None
+    postings = sorted((posting(gram) for gram in grams), key=len)
+    keys: set[K] = set()
+    for keys_with_gram in postings[:needed]:
+        keys.update(keys_with_gram)
+    return keys
+
+
+def best_match(
+    query: str, candidates: Iterable[tuple[K, str]], threshold: int = 0
+) -> tuple[K | None, int]:
+    """Scores ``(key, normalized text)`` pairs against ``query`` in one pass.
+
+    The first key with the highest score wins, like ``max`` over the scores.
+    Texts whose length rules out a score above ``threshold`` are skipped, and
+    once a score is known, texts that can't beat it stop being scored early.
+    """
+    if not query:
+        # Only an empty text matches an empty query; all else scores 0
+        first: tuple[K | None, int] = (None, 0)
+        for key, text in candidates:
+            if not text:
+                return key, 100
+            if first[0] is None:
+                first = (key, 0)
+        return first
+    low, high = length_bounds(len(query), threshold)
+    best_key: K | None = None
+    best = -1
+    cutoff = 0.0
+    for key, text in candidates:
+        if not low <= len(text) <= high:
+            continue
+        if text == query:
+            score = 100
+        elif not text:
+            score = 0
+        else:
+            score = int(round(100 * _indel_ratio(query, text, score_cutoff=cutoff)))
+        if score > best:
+            best_key, best = key, score
+            if best == 100:
+                break
+            # Anything under this rounds to ``best`` or less
+            cutoff = (best + 0.5) / 100 - _EPSILON
+    return (best_key, best) if best_key is not None else (None, 0)
+
+
+class SimilarityIndex(Generic[K]):
+    """Trigram postings of keyed normalized texts."""
+
+    def __init__(self) -> None:
+        self._texts: dict[K, str] = {}
+        self._postings: dict[str, set[K]] = {}
+        # Insertion order of each key, to score candidates in scan order
+        self._seq: dict[K, int] = {}
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, key: K, text: str) -> None:
+        old = self._texts.get(key)
+        if old == text:
+            return
+        if old is None:
+            self._seq[key] = self._next_seq
+            self._next_seq += 1
+        else:
+            self._unpost(key, old)
+        self._texts[key] = text
+        for gram in trigrams(text):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def discard(self, key: K) -> None:
+        text = self._texts.pop(key, None)
+        if text is not None:
+            del self._seq[key]
+            self._unpost(key, text)
+
+    def _unpost(self, key: K, text: str) -> None:
+        for gram in trigrams(text):
+            keys = self._postings[gram]
+            keys.discard(key)
+            if not keys:
+                del self._postings[gram]
+
+    def posting(self, gram: str) -> Collection[K]:
+        return self._postings.get(gram, ())
+
+    def best_match(self, query: str, threshold: int = 0) -> tuple[K | None, int]:
+        """Best scoring key for ``query``, the earliest inserted one on ties."""
+        texts = self._texts
+        keys = probe(query, threshold, self.posting)
+        if keys is None:
+            return best_match(query, texts.items(), threshold)
+        ordered = sorted(keys, key=self._seq.__getitem__)
+        return best_match(query, ((k, texts[k]) for k in ordered), threshold)
+
+
+class IndexedModels(MutableMapping[Any, M], Generic[M]):
+    """A dict of models kept indexed by their normalized text, for repositories
+    whose cache is a plain dict of models."""
+
+    def __init__(self, models: dict[Any, M] | None = None):
+        self._models: dict[Any, M] = {}
+        self._index: SimilarityIndex[Any] = SimilarityIndex()
+        for entity_id, model in (models or {}).items():
+            self[entity_id] = model
+
+    def __getitem__(self, entity_id: Any) -> M:
+        return self._models[entity_id]
+
+    def __setitem__(self, entity_id: Any, model: M) -> None:
+        self._models[entity_id] = model
+        self._index.add(entity_id, model.normalized_text)
+
+    def __delitem__(self, entity_id: Any) -> None:
+        del self._models[entity_id]
+        self._index.discard(entity_id)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._models)
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def find_similar(self, text: str, threshold: int = 0) -> tuple[M | None, int]:
+        """The model most similar to ``text`` by ``fuzz.ratio`` and its score."""
+        entity_id, score = self._index.best_match(normalize_str(text), threshold)
+        if entity_id is None:
+            return None, 0
+        return self._models[entity_id], score
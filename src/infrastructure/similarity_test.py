@@ -0,0 +1,108 @@
+import random
+
+from fuzzywuzzy import fuzz
+
+from models.proposal import Proposal
+from infrastructure.similarity import (
+    IndexedModels,
+    SimilarityIndex,
+    best_match,
+    length_bounds,
+    ratio,
+)
+
+WORDS = ["cuñado", "máquina", "fiera", "crack", "jefe", "figura", "torero", "tú"]
+
+
+def _text(rng: random.Random) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(1, 4)))
+
+
+def _mutate(rng: random.Random, text: str) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(0, 3)):
+        i = rng.randrange(len(chars) + 1)
+        if chars and rng.random() < 0.5:
+            del chars[min(i, len(chars) - 1)]
+        else:
+            chars.insert(i, rng.choice("aeiou xz"))
+    return "".join(chars)
+
+
+def _scan(query: str, texts: dict) -> tuple:
+    """What the services did before: ``max`` over every ``fuzz.ratio``."""
+    if not texts:
+        return None, 0
+    return max(
+        ((k, fuzz.ratio(query, t)) for k, t in texts.items()), key=lambda x: x[1]
+    )
+
+
+def test_ratio_matches_fuzz():
+    rng = random.Random(3)
+    pairs = [("", ""), ("", "a"), ("a", ""), ("abc", "abc")]
+    pairs += [(_text(rng), _mutate(rng, _text(rng))) for _ in range(300)]
+    for a, b in pairs:
+        assert ratio(a, b) == fuzz.ratio(a, b), (a, b)
+
+
+def test_length_bounds_admit_every_match_above_threshold():
+    for length in range(1, 60):
+        low, high = length_bounds(length, 90)
+        for other in range(1, 120):
+            # The best ratio two texts of these lengths can reach
+            best = fuzz.ratio("a" * length, "a" * other)
+            assert (best <= 90) or (low <= other <= high), (length, other)
+
+
+def test_best_match_keeps_first_of_ties_and_empty_texts():
+    assert best_match("abc", [(1, "abd"), (2, "abd")]) == (1, 67)
+    assert best_match("", [(1, "a"), (2, "")]) == (2, 100)
+    assert best_match("", [(1, "a")]) == (1, 0)
+    assert best_match("abc", []) == (None, 0)
+
+
+def test_index_matches_scan_above_threshold():
+    rng = random.Random(7)
+    index: SimilarityIndex[int] = SimilarityIndex()
+    texts: dict[int, str] = {}
+
+    for step in range(400):
+        key = rng.randint(1, 80)
+        if rng.random() < 0.2:
+            index.discard(key)
+            texts.pop(key, None)
+        else:
+            # Re-adding an existing key keeps its place, like a dict
+            texts[key] = _text(rng)
+            index.add(key, texts[key])
+        if step % 20:
+            continue
+        for _ in range(10):
+            query = _mutate(rng, rng.choice(list(texts.values()) or [""]))
+            for threshold in (0, 60, 90):
+                expected = _scan(query, texts)
+                found = index.best_match(query, threshold)
+                if expected[1] > threshold or threshold == 0:
+                    assert found == expected, (query, threshold)
+                else:
+                    assert found[1] <= threshold
+
+
+def test_indexed_models_find_similar():
+    models = IndexedModels(
+        {
+            "1": Proposal(id="1", text="Cuñado"),
+            "2": Proposal(id="2", text="Máquina"),
+        }
+    )
+    models["3"] = Proposal(id="3", text="Fiera")
+
+    assert models.find_similar("MAQUINAS", 90)[0].id == "2"
+    assert models.find_similar("torero", 90) == (None, 0)
+
+    del models["2"]
+    models["1"] = Proposal(id="1", text="Máquinas")
+    found, score = models.find_similar("maquina", 90)
+    assert (found.id, score) == ("1", 93)
+    assert list(models) == ["1", "3"]
@@ -9,6 +9,7 @@ from litestar.middleware.session.client_side import CookieBackendConfig
 from litestar.static_files import create_static_files_router
 from litestar.params import Dependency
 
+from core.background import background_tasks
 from core.config import config
 from core.di import dependencies
 from api import WebController, AdminController, GameController
@@ -19,6 +20,8 @@ from services import UserService
 from utils import verify_telegram_auth
 from utils.ui import apelativo
 from infrastructure.protocols import ProposalRepository, LongProposalRepository
+from infrastructure.counters import usage_counters
+from infrastructure.datastore.executor import datastore_executor
 
 # Enable logging
 logging.basicConfig(format="%(message)s", level=logging.INFO)
@@ -125,6 +128,12 @@ app = Litestar(
     ),
     request_class=HTMXRequest,
     before_request=auto_login_local,
+    # Let background writes finish while Datastore is still reachable
+    on_shutdown=[
+        background_tasks.drain,
+        usage_counters.stop,
+        datastore_executor.shutdown,
+    ],
     debug=not config.is_gae,
 )
 
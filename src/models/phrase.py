@@ -1,7 +1,10 @@
 from datetime import datetime
+from functools import cached_property
 from typing import ClassVar
 from pydantic import BaseModel
 
+from utils import normalize_str
+
 
 class Phrase(BaseModel):
     id: int | None = None
@@ -26,6 +29,11 @@ class Phrase(BaseModel):
     def __str__(self) -> str:
         return self.text
 
+    @cached_property
+    def normalized_text(self) -> str:
+        """``normalize_str(text)``, computed once per instance for searches."""
+        return normalize_str(self.text)
+
     def __hash__(self) -> int:
         return hash((self.text, self.kind))
 
@@ -19,6 +19,13 @@ class TestPhrase:
         assert p1 != p3
         assert p1 != "foo"
 
+    def test_phrase_normalized_text(self):
+        p = Phrase(text="¡Qué Máquina, cuñao!")
+        assert p.normalized_text == "quemaquinacunao"
+        # Computed once and kept out of the stored fields
+        assert p.__dict__["normalized_text"] == "quemaquinacunao"
+        assert "normalized_text" not in p.model_dump()
+
 
 class TestLongPhrase:
     def test_long_phrase_init(self):
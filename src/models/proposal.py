@@ -1,7 +1,9 @@
 from datetime import datetime
+from functools import cached_property
 from typing import ClassVar
 from pydantic import BaseModel, Field
 from models.phrase import Phrase, LongPhrase
+from utils import normalize_str
 
 
 class Proposal(BaseModel):
@@ -19,6 +21,11 @@ class Proposal(BaseModel):
     kind: ClassVar[str] = "Proposal"
     phrase_class: ClassVar[type[Phrase]] = Phrase
 
+    @cached_property
+    def normalized_text(self) -> str:
+        """``normalize_str(text)``, computed once per instance for searches."""
+        return normalize_str(self.text)
+
 
 class LongProposal(Proposal):
     kind: ClassVar[str] = "LongProposal"
@@ -39,3 +39,9 @@ class TestProposalFunctions:
     def test_get_proposal_class_by_kind_unknown(self):
         cls = get_proposal_class_by_kind("UnknownKind")
         assert cls == Proposal
+
+
+def test_proposal_normalized_text():
+    p = Proposal(text="Fiera Ñoña")
+    assert p.normalized_text == "fieranona"
+    assert p == Proposal(**p.model_dump())
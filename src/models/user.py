@@ -14,6 +14,8 @@ class User(BaseModel):
     points: int = 0
     badges: list[str] = Field(default_factory=list)
     linked_to: str | int | None = None
+    # Other accounts are linked to this one
+    has_aliases: bool = False
     last_usages: list[datetime] = Field(default_factory=list)
     game_stats: int = 0
     game_streak: int = 0
@@ -0,0 +1,59 @@
+from collections.abc import Mapping
+from typing import ClassVar
+
+from pydantic import BaseModel, Field
+
+from models.usage import ActionType
+
+_ACTION_PREFIX = "action_"
+
+
+class UserStats(BaseModel):
+    """Running totals of what a user has done, kept up to date by the code
+    that records it so badges and profiles don't have to count ``Usage``."""
+
+    id: str
+    usages: int = 0
+    actions: dict[str, int] = Field(default_factory=dict)
+    phrases: int = 0
+    posters: int = 0
+    kind: ClassVar[str] = "UserStats"
+
+    def count(self, action: ActionType) -> int:
+        return self.actions.get(action.value, 0)
+
+    @staticmethod
+    def deltas(
+        action: ActionType | None = None, phrases: int = 0, posters: int = 0
+    ) -> dict[str, int]:
+        """The counters (as stored) an action, authored phrases or completed
+        posters add to."""
+        counts: dict[str, int] = {}
+        if action is not None:
+            counts["usages"] = 1
+            counts[_ACTION_PREFIX + action.value] = 1
+        if phrases:
+            counts["phrases"] = phrases
+        if posters:
+            counts["posters"] = posters
+        return counts
+
+    @classmethod
+    def from_counts(cls, user_id: str, counts: Mapping[str, int]) -> "UserStats":
+        return cls(
+            id=user_id,
+            usages=counts.get("usages", 0),
+            actions={
+                name.removeprefix(_ACTION_PREFIX): value
+                for name, value in counts.items()
+                if name.startswith(_ACTION_PREFIX)
+            },
+            phrases=counts.get("phrases", 0),
+            posters=counts.get("posters", 0),
+        )
+
+    def to_counts(self) -> dict[str, int]:
+        """Flat counters, one stored property each."""
+        counts = {_ACTION_PREFIX + name: value for name, value in self.actions.items()}
+        counts.update(usages=self.usages, phrases=self.phrases, posters=self.posters)
+        return counts
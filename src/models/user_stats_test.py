@@ -0,0 +1,17 @@
+from models.usage import ActionType
+from models.user_stats import UserStats
+
+
+def test_counts_round_trip():
+    stats = UserStats(id="1", usages=3, actions={"audio": 2, "vision": 1}, posters=1)
+
+    counts = stats.to_counts()
+    assert counts["action_audio"] == 2
+    assert UserStats.from_counts("1", counts) == stats
+    assert stats.count(ActionType.VISION) == 1
+    assert stats.count(ActionType.POSTER) == 0
+
+
+def test_deltas():
+    assert UserStats.deltas(ActionType.AUDIO) == {"usages": 1, "action_audio": 1}
+    assert UserStats.deltas(phrases=1, posters=2) == {"phrases": 1, "posters": 2}
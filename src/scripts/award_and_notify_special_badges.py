@@ -1,16 +1,13 @@
 import asyncio
 import logging
+from pathlib import Path
 from typing import Annotated
 
 import typer
 from rich.console import Console
-from rich.progress import (
-    Progress,
-    SpinnerColumn,
-    TextColumn,
-    BarColumn,
-    MofNCompleteColumn,
-)
+
+from scripts.backfill_user_stats import UsageCheckpoint
+from scripts.recalculate_badges import DEFAULT_CHECKPOINT, load_stats, print_change
 
 # Configure logging
 logging.basicConfig(level=logging.WARNING)
@@ -74,54 +71,43 @@ async def notify_user(user, badges, tg_app, slack_app) -> bool:
     return False
 
 
-async def process_user(
-    user, badge_service, progress, task, semaphore, stats, dry_run, tg_app, slack_app
-) -> None:
-    async with semaphore:
-        try:
-            # check_badges returns newly awarded Badge objects
-            new_badges = await badge_service.check_badges(
-                user.id, user.platform, save=not dry_run
-            )
+async def notify_batch(batch, semaphore, stats, dry_run, tg_app, slack_app) -> None:
+    from core.container import services
 
-            if new_badges:
-                # Filter for the ones the user specifically asked for if needed, 
-                # but the user asked to "le de... y se les notifique", 
-                # usually we notify for any new badge.
-                
-                # Check if any of the new badges are in our target list
-                important_new_badges = [b for b in new_badges if b.id in TARGET_BADGE_IDS]
-                
-                stats["users_with_updates"] += 1
-                stats["total_new_badges"] += len(new_badges)
-                
-                badge_names = ", ".join([b.name for b in new_badges])
-                console.print(
-                    f"  [green]+[/green] User {user.name or user.id} ({user.platform}) awarded: [bold]{badge_names}[/bold]"
-                )
+    async def _notify(change) -> None:
+        user = change.user
+        important_new_badges = [
+            services.badge_service.get_badge_info(b)
+            for b in change.added
+            if b in TARGET_BADGE_IDS
+        ]
+        if not important_new_badges:
+            return
+        if dry_run:
+            console.print(
+                f"    [yellow]i[/yellow] Dry run: Would notify {user.id} about {len(important_new_badges)} badges"
+            )
+            return
+        async with semaphore:
+            success = await notify_user(user, important_new_badges, tg_app, slack_app)
+        if success:
+            stats["notifications_sent"] += 1
+            console.print(f"    [blue]i[/blue] Notification sent to {user.id}")
+        else:
+            console.print(f"    [yellow]![/yellow] Could not notify {user.id}")
 
-                if important_new_badges and not dry_run:
-                    success = await notify_user(user, important_new_badges, tg_app, slack_app)
-                    if success:
-                        stats["notifications_sent"] += 1
-                        console.print(f"    [blue]i[/blue] Notification sent to {user.id}")
-                    else:
-                        console.print(f"    [yellow]![/yellow] Could not notify {user.id}")
-                elif important_new_badges and dry_run:
-                    console.print(f"    [yellow]i[/yellow] Dry run: Would notify {user.id} about {len(important_new_badges)} badges")
+    await asyncio.gather(*(_notify(change) for change in batch))
 
-        except Exception as e:
-            console.print(f"  [red]![/red] Error processing user {user.id}: {e}")
-        finally:
-            progress.advance(task)
 
+async def run_award_and_notify(
+    dry_run: bool, concurrency: int, from_stats: bool, checkpoint: UsageCheckpoint
+) -> None:
+    from core.container import services
+    from services.badge_recalculation import BadgeRecalculation
 
-async def run_award_and_notify(dry_run: bool, concurrency: int) -> None:
-    from services import user_service, badge_service
-    
     tg_app = None
     slack_app = None
-    
+
     if not dry_run:
         try:
             from tg import get_initialized_tg_application
@@ -135,34 +121,25 @@ async def run_award_and_notify(dry_run: bool, concurrency: int) -> None:
         except Exception as e:
             console.print(f"[yellow]Warning: Could not initialize Slack app: {e}[/yellow]")
 
-    users = await user_service.user_repo.load_all(ignore_gdpr=True)
-    console.print(f"Found [bold]{len(users)}[/bold] users to process.")
+    user_stats = await load_stats(from_stats, checkpoint)
+    console.print(f"Stats loaded for [bold]{len(user_stats)}[/bold] accounts.")
 
     stats = {"total_new_badges": 0, "users_with_updates": 0, "notifications_sent": 0}
     semaphore = asyncio.Semaphore(concurrency)
 
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        MofNCompleteColumn(),
-        console=console,
-    ) as progress:
-        task = progress.add_task("Processing users...", total=len(users))
-
-        tasks = [
-            process_user(
-                user, badge_service, progress, task, semaphore, stats, dry_run, tg_app, slack_app
-            )
-            for user in users
-        ]
-        await asyncio.gather(*tasks)
+    # Each batch is saved before its users are notified
+    engine = BadgeRecalculation(services.user_repo)
+    async for batch in engine.run(user_stats, dry_run=dry_run):
+        for change in batch:
+            print_change(change)
+            stats["total_new_badges"] += len(change.added)
+        stats["users_with_updates"] += len(batch)
+        await notify_batch(batch, semaphore, stats, dry_run, tg_app, slack_app)
 
     if not dry_run and tg_app:
         await tg_app.shutdown()
 
     console.print("\n[bold]Summary:[/bold]")
-    console.print(f"  Users processed: {len(users)}")
     console.print(f"  Users with new badges: {stats['users_with_updates']}")
     console.print(f"  Total new badges awarded: {stats['total_new_badges']}")
     console.print(f"  Notifications sent: {stats['notifications_sent']}")
@@ -179,14 +156,27 @@ def main(
         bool, typer.Option("--dry-run", "-n", help="Do not save changes or send notifications.")
     ] = False,
     concurrency: Annotated[
-        int, typer.Option("--concurrency", "-c", help="Number of concurrent users to process.")
+        int, typer.Option("--concurrency", "-c", help="Number of notifications to send at once.")
     ] = 10,
+    from_stats: Annotated[
+        bool,
+        typer.Option(
+            "--from-stats", help="Use the stored UserStats instead of recounting Usage."
+        ),
+    ] = False,
+    checkpoint: Annotated[
+        Path, typer.Option(help="File to resume the Usage scan from and save it to.")
+    ] = DEFAULT_CHECKPOINT,
 ) -> None:
     """
     Recalculate badges and notify users about specific achievements.
     """
     try:
-        asyncio.run(run_award_and_notify(dry_run, concurrency))
+        asyncio.run(
+            run_award_and_notify(
+                dry_run, concurrency, from_stats, UsageCheckpoint(checkpoint)
+            )
+        )
     except Exception as e:
         console.print(f"[red]Error during execution:[/red] {e}")
         # raise e # For debugging
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from rich.console import Console
+
+# Configure logging to be less verbose during script execution
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+app = typer.Typer(help="Rebuild every user's stats from Usage, phrases and posters.")
+console = Console()
+
+# Usages read between checkpoint saves
+CHECKPOINT_EVERY = 200_000
+
+
+class UsageCheckpoint:
+    """Where a Usage scan got to and what it had counted, kept in a file so
+    an interrupted scan resumes from there instead of from the start."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def load(self) -> tuple[str | None, dict[str, Counter[str]]]:
+        counts: dict[str, Counter[str]] = defaultdict(Counter)
+        if not self.path.exists():
+            return None, counts
+        state = json.loads(self.path.read_text())
+        for user_id, c in state["counts"].items():
+            counts[user_id] = Counter(c)
+        return state["cursor"], counts
+
+    def save(self, cursor: bytes | str, counts: dict[str, Counter[str]]) -> None:
+        if isinstance(cursor, bytes):
+            cursor = cursor.decode()
+        # Replace it whole: an interruption mid-write must not corrupt it
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"cursor": cursor, "counts": counts}))
+        tmp.replace(self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def count_usages(
+    checkpoint: UsageCheckpoint | None = None,
+) -> dict[str, Counter[str]]:
+    """Streams the Usage kind once, counting each user's usages and actions.
+
+    With a ``checkpoint``, resumes from it and saves progress every
+    ``CHECKPOINT_EVERY`` usages; it's cleared once the scan is complete.
+    """
+    from infrastructure.datastore.usage import usage_repository
+    from models.usage import ActionType
+    from models.user_stats import UserStats
+
+    # The deltas one usage of each action adds
+    deltas = {action.value: UserStats.deltas(action) for action in ActionType}
+    cursor, counts = checkpoint.load() if checkpoint else (None, defaultdict(Counter))
+    if cursor is not None:
+        console.print(f"  Resuming from checkpoint ({len(counts)} users counted)")
+    query = usage_repository.client.query(kind=usage_repository.kind)
+    iterator = query.fetch(start_cursor=cursor)
+    read = saved = 0
+    for page in iterator.pages:
+        for entity in page:
+            if (delta := deltas.get(entity.get("action"))) is not None:
+                counts[str(entity["user_id"])].update(delta)
+        before, read = read, read + page.num_items
+        if read // 50_000 > before // 50_000:
+            console.print(f"  {read:,} usages read...")
+        if checkpoint and iterator.next_page_token and read - saved >= CHECKPOINT_EVERY:
+            checkpoint.save(iterator.next_page_token, counts)
+            saved = read
+    if checkpoint:
+        checkpoint.clear()
+    return counts
+
+
+def count_phrases() -> Counter[str]:
+    """Short phrases (Poeta counts those only) per author, read from
+    Datastore itself: the repository's cache may be filled from a snapshot."""
+    from infrastructure.datastore.phrase import phrase_repository
+
+    query = phrase_repository.client.query(kind=phrase_repository.kind)
+    return Counter(str(entity.get("user_id", 0)) for entity in query.fetch())
+
+
+def count_completed_posters() -> Counter[str]:
+    from infrastructure.datastore.poster_request import poster_request_repository
+
+    query = poster_request_repository.client.query(kind=poster_request_repository.kind)
+    query.add_filter("status", "=", "completed")
+    return Counter(str(entity["user_id"]) for entity in query.fetch())
+
+
+async def count_all(
+    checkpoint: UsageCheckpoint | None = None,
+) -> dict[str, Counter[str]]:
+    """Every user's stats counters, recounted from Usage, phrases and posters."""
+    console.print("Counting usages...")
+    counts = await asyncio.to_thread(count_usages, checkpoint)
+    for user_id, phrases in (await asyncio.to_thread(count_phrases)).items():
+        counts[user_id]["phrases"] += phrases
+    for user_id, posters in (await asyncio.to_thread(count_completed_posters)).items():
+        counts[user_id]["posters"] += posters
+    return counts
+
+
+async def backfill(dry_run: bool, checkpoint: UsageCheckpoint | None) -> None:
+    from infrastructure.datastore.user_stats import user_stats_repository
+    from models.user_stats import UserStats
+
+    if dry_run:
+        console.print(
+            "[yellow]DRY RUN MODE: No changes will be saved to the database.[/yellow]"
+        )
+
+    counts = await count_all(checkpoint)
+    stats = [UserStats.from_counts(user_id, c) for user_id, c in counts.items()]
+    console.print(f"\n[bold]Stats rebuilt for {len(stats)} users.[/bold]")
+    for s in sorted(stats, key=lambda s: s.usages, reverse=True)[:10]:
+        console.print(
+            f"  {s.id}: {s.usages} usages, {s.phrases} phrases, {s.posters} posters"
+        )
+
+    if dry_run:
+        console.print("\n[yellow]No changes were saved (Dry Run).[/yellow]")
+        return
+    # Overwrites the stats: usages logged while this runs may be counted
+    # twice or not at all, so run it while traffic is low
+    await user_stats_repository.save_many(stats)
+    console.print("\n[green]User stats saved.[/green]")
+
+
+@app.command()
+def run(
+    dry_run: Annotated[
+        bool,
+        typer.Option("--dry-run", "-n", help="Do not save changes to the database."),
+    ] = False,
+    checkpoint: Annotated[
+        Path | None,
+        typer.Option(help="File to resume the Usage scan from and save it to."),
+    ] = None,
+) -> None:
+    """
+    Recount each user's UserStats from scratch. Needed once before badges read
+    them, and to repair any drift afterwards.
+    """
+    try:
+        asyncio.run(
+            backfill(dry_run, UsageCheckpoint(checkpoint) if checkpoint else None)
+        )
+    except Exception as e:
+        console.print(f"[red]Error during execution:[/red] {e}")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,260 @@
+import gc
+import logging
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from collections.abc import Iterator
+from typing import Annotated, Any
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+# Configure logging to be less verbose during script execution
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+app = typer.Typer(help="Benchmark the in-memory phrase catalogue.")
+console = Console()
+
+WORDS = (
+    "cuñado máquina fiera crack jefe campeón titán artista maestro figura "
+    "torero chaval colega majete bestia genio socio tronco líder compañero"
+).split()
+
+
+def synthetic_phrases(count: int, seed: int = 0) -> Iterator[tuple[int, Any]]:
+    """(id, phrase) pairs shaped like the real catalogue: short texts, a few
+    hundred authors, Datastore (UTC) timestamps."""
+    from models.phrase import Phrase
+
+    rng = random.Random(seed)
+    start = datetime(2018, 1, 1, tzinfo=timezone.utc)
+    for i in range(1, count + 1):
+        text = " ".join(rng.choices(WORDS, k=rng.randint(1, 3))) + f" {i}"
+        yield (
+            i,
+            Phrase(
+                id=i,
+                text=text,
+                sticker_file_id=f"CAACAgQAAxkBAAI{i:08d}" if i % 3 else "",
+                usages=rng.randint(0, 5000),
+                audio_usages=rng.randint(0, 300),
+                sticker_usages=rng.randint(0, 300),
+                score=rng.randint(-10, 500),
+                user_id=rng.randint(10_000_000, 10_000_400),
+                chat_id=0,
+                created_at=start + timedelta(minutes=rng.randint(0, 4_000_000)),
+                proposal_id=str(rng.randint(10**17, 10**18)),
+            ),
+        )
+
+
+def _retained_bytes(build) -> int:
+    """Bytes still allocated once ``build()``'s result is all that's left."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+@app.command()
+def memory(
+    count: Annotated[
+        int, typer.Option("--count", "-c", help="Number of phrases to load.")
+    ] = 10_000,
+) -> None:
+    """
+    Memory held by the catalogue as a dict of models vs a PhraseCatalogue.
+    """
+    from models.phrase import Phrase
+    from infrastructure.datastore.catalogue import PhraseCatalogue
+
+    # Texts and ids are shared by both layouts; measure what each adds
+    phrases = dict(synthetic_phrases(count))
+    as_models = _retained_bytes(
+        lambda: {i: p.model_copy(deep=True) for i, p in phrases.items()}
+    )
+    as_catalogue = _retained_bytes(lambda: PhraseCatalogue.from_models(Phrase, phrases))
+
+    per_10k = 10_000 / count
+    table = Table(title=f"Phrase catalogue memory ({count:,} phrases)")
+    table.add_column("Layout")
+    table.add_column("Total", justify="right")
+    table.add_column("Per 10k phrases", justify="right")
+    for name, size in (
+        ("dict of Phrase", as_models),
+        ("PhraseCatalogue", as_catalogue),
+    ):
+        table.add_row(
+            name, f"{size / 2**20:,.2f} MiB", f"{size * per_10k / 2**20:,.2f} MiB"
+        )
+    console.print(table)
+
+
+@app.command()
+def search(
+    sizes: Annotated[
+        list[int],
+        typer.Option("--size", "-s", help="Catalogue sizes (repeatable)."),
+    ] = [1_000, 10_000, 100_000, 500_000],
+    queries: Annotated[
+        list[str],
+        typer.Option("--query", "-q", help="Searches to time (repeatable)."),
+    ] = ["cuñado", "máquina fiera", "crack", "toreroj"],
+    repeat: Annotated[
+        int, typer.Option("--repeat", "-r", help="Runs per measurement.")
+    ] = 5,
+) -> None:
+    """
+    Search latency with the trigram index vs a scan of the normalized texts.
+    """
+    from models.phrase import Phrase
+    from infrastructure.datastore.catalogue import PhraseCatalogue
+    from utils import normalize_str
+
+    def best_ms(fn) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
+
+    table = Table(title="Phrase search latency (ms, best of runs)")
+    for column in ("Phrases", "Query", "Matches", "Scan", "Index"):
+        table.add_column(column, justify="left" if column == "Query" else "right")
+
+    for size in sizes:
+        catalogue = PhraseCatalogue(Phrase)
+        for entity_id, phrase in synthetic_phrases(size):
+            catalogue[entity_id] = phrase
+        normalized = catalogue._normalized_texts
+        rows = list(catalogue._rows.values())
+        for query in queries:
+            norm_query = normalize_str(query)
+            scan_ms = best_ms(lambda: [r for r in rows if norm_query in normalized[r]])
+            # Searches only: don't time materialising the matches
+            index_ms = best_ms(lambda: catalogue.find(query, limit=1))
+            matches = sum(1 for r in rows if norm_query in normalized[r])
+            table.add_row(
+                f"{size:,}", query, f"{matches:,}", f"{scan_ms:.2f}", f"{index_ms:.2f}"
+            )
+    console.print(table)
+
+
+@app.command()
+def similar(
+    sizes: Annotated[
+        list[int],
+        typer.Option("--size", "-s", help="Catalogue sizes (repeatable)."),
+    ] = [1_000, 10_000, 100_000],
+    queries: Annotated[
+        list[str],
+        typer.Option("--query", "-q", help="Proposals to look up (repeatable)."),
+    ] = ["cuñado máquina 17", "fiera crack torero", "jefe"],
+    repeat: Annotated[
+        int, typer.Option("--repeat", "-r", help="Runs per measurement.")
+    ] = 3,
+) -> None:
+    """
+    Duplicate lookup latency: fuzz.ratio over every phrase vs the indexed
+    lookup intake uses (threshold 90).
+    """
+    from fuzzywuzzy import fuzz
+
+    from models.phrase import Phrase
+    from infrastructure.datastore.catalogue import PhraseCatalogue
+    from services.proposal_service import SIMILARITY_DISCARD_THRESHOLD
+    from utils import normalize_str
+
+    def best_ms(fn) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
+
+    table = Table(title="Duplicate lookup latency (ms, best of runs)")
+    for column in ("Phrases", "Query", "Best", "Scan", "Index"):
+        table.add_column(column, justify="left" if column == "Query" else "right")
+
+    for size in sizes:
+        catalogue = PhraseCatalogue(Phrase)
+        for entity_id, phrase in synthetic_phrases(size):
+            catalogue[entity_id] = phrase
+        for query in queries:
+            norm_query = normalize_str(query)
+
+            def scan():
+                phrases = catalogue.values()
+                return max(
+                    [(p, fuzz.ratio(norm_query, p.normalized_text)) for p in phrases],
+                    key=lambda x: x[1],
+                )
+
+            best = scan()[1]
+            scan_ms = best_ms(scan)
+            index_ms = best_ms(
+                lambda: catalogue.find_similar(query, SIMILARITY_DISCARD_THRESHOLD)
+            )
+            table.add_row(
+                f"{size:,}", query, str(best), f"{scan_ms:.2f}", f"{index_ms:.2f}"
+            )
+    console.print(table)
+
+
+@app.command()
+def sample(
+    sizes: Annotated[
+        list[int],
+        typer.Option("--size", "-s", help="Catalogue sizes (repeatable)."),
+    ] = [1_000, 10_000, 100_000, 500_000],
+    repeat: Annotated[
+        int, typer.Option("--repeat", "-r", help="Runs per measurement.")
+    ] = 5,
+) -> None:
+    """
+    Empty-query short mode: shuffling every phrase vs drawing from a pool.
+    """
+    from models.phrase import Phrase
+    from infrastructure.datastore.catalogue import PhraseCatalogue
+    from utils import random_combination, random_combinations
+
+    def best_ms(fn) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
+
+    def shuffled():
+        phrases = catalogue.values()
+        random.shuffle(phrases)
+        return {random_combination(phrases, 2) for _ in range(20)}
+
+    table = Table(title="10 random pairs of phrases (ms, best of runs)")
+    for column in ("Phrases", "Shuffle", "Pool"):
+        table.add_column(column, justify="right")
+    for size in sizes:
+        catalogue = PhraseCatalogue(Phrase)
+        for entity_id, phrase in synthetic_phrases(size):
+            catalogue[entity_id] = phrase
+        shuffle_ms = best_ms(shuffled)
+        pool_ms = best_ms(
+            lambda: random_combinations(catalogue.pool(), 2, count=10, attempts=20)
+        )
+        table.add_row(f"{size:,}", f"{shuffle_ms:.2f}", f"{pool_ms:.3f}")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    app()
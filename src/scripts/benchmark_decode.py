@@ -0,0 +1,190 @@
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Annotated
+
+import typer
+from google.cloud import datastore
+from rich.console import Console
+from rich.table import Table
+
+# Configure logging to be less verbose during script execution
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+app = typer.Typer(
+    help="Compare validated and trusted decoding of Datastore rows into models."
+)
+console = Console()
+
+DEFAULT_SIZES = [10_000, 50_000, 200_000]
+
+
+def _key(kind: str, entity_id: str | int) -> datastore.Key:
+    return datastore.Key(kind, entity_id, project="benchmark")
+
+
+def _phrase(i: int, now: datetime) -> datastore.Entity:
+    entity = datastore.Entity(key=_key("Phrase", i + 1))
+    entity.update(
+        {
+            "text": f"cuñao número {i}",
+            "sticker_file_id": f"sticker-{i}",
+            "usages": i % 97,
+            "audio_usages": i % 13,
+            "sticker_usages": i % 7,
+            "score": i % 11,
+            "user_id": str(1000 + i % 500),
+            "chat_id": 0,
+            "created_at": now,
+            "proposal_id": str(i),
+        }
+    )
+    return entity
+
+
+def _proposal(i: int, now: datetime) -> datastore.Entity:
+    entity = datastore.Entity(key=_key("Proposal", str(i)))
+    entity.update(
+        {
+            "from_chat_id": -1000 - i % 50,
+            "from_message_id": i,
+            "text": f"propuesta número {i}",
+            "liked_by": [str(u) for u in range(i % 5)],
+            "disliked_by": [],
+            "user_id": 1000 + i % 500,
+            "voting_ended": bool(i % 2),
+            "voting_ended_at": now,
+            "created_at": now,
+        }
+    )
+    return entity
+
+
+def _user(i: int, now: datetime) -> datastore.Entity:
+    entity = datastore.Entity(key=_key("User", i + 1))
+    entity.update(
+        {
+            "id": i + 1,
+            "platform": "telegram",
+            "name": f"Usuario {i}",
+            "username": f"user{i}",
+            "is_private": True,
+            "gdpr": False,
+            "usages": i % 300,
+            "points": i % 50,
+            "badges": ["novato", "fiel"][: i % 3],
+            "linked_to": None,
+            "last_usages": [now] * (i % 4),
+            "game_stats": 0,
+            "game_streak": 0,
+            "game_high_score": i % 20,
+            "last_game_at": None,
+            "created_at": now,
+        }
+    )
+    return entity
+
+
+def _gift(i: int, now: datetime) -> datastore.Entity:
+    entity = datastore.Entity(key=_key("Gift", i + 1))
+    entity.update(
+        {
+            "sender_id": 1000 + i % 500,
+            "sender_name": f"Usuario {i % 500}",
+            "receiver_id": 2000 + i % 300,
+            "gift_type": ["palillo", "carajillo", "cognac", "puro"][i % 4],
+            "created_at": now,
+            "cost": 5,
+        }
+    )
+    return entity
+
+
+def _usage(i: int, now: datetime) -> datastore.Entity:
+    entity = datastore.Entity(key=_key("Usage", i + 1))
+    entity.update(
+        {
+            "user_id": str(1000 + i % 500),
+            "platform": "telegram",
+            "action": ["phrase", "sticker", "audio", "command"][i % 4],
+            "phrase_id": str(i % 1000),
+            "timestamp": now,
+            "metadata": {"chat_type": "private"},
+        }
+    )
+    return entity
+
+
+def _repositories() -> dict:
+    from infrastructure.datastore.gift import GiftDatastoreRepository
+    from infrastructure.datastore.phrase import PhraseDatastoreRepository
+    from infrastructure.datastore.proposal import ProposalDatastoreRepository
+    from infrastructure.datastore.usage import UsageDatastoreRepository
+    from infrastructure.datastore.user import UserDatastoreRepository
+
+    return {
+        "Phrase": (PhraseDatastoreRepository(), _phrase),
+        "Proposal": (ProposalDatastoreRepository(), _proposal),
+        "User": (UserDatastoreRepository(), _user),
+        "Gift": (GiftDatastoreRepository(), _gift),
+        "Usage": (UsageDatastoreRepository(), _usage),
+    }
+
+
+def _decode_seconds(
+    repo, entities: list[datastore.Entity], trusted: bool, repeat: int
+) -> float:
+    """Best of ``repeat`` runs, to keep GC and scheduling noise out."""
+    repo.trusted_decode = trusted
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for entity in entities:
+            repo._entity_to_domain(entity)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@app.command()
+def run(
+    sizes: Annotated[
+        list[int],
+        typer.Option("--size", "-s", help="Number of rows to decode (repeatable)."),
+    ] = DEFAULT_SIZES,
+    kinds: Annotated[
+        list[str],
+        typer.Option("--kind", "-k", help="Only benchmark these kinds."),
+    ] = [],
+    repeat: Annotated[
+        int, typer.Option("--repeat", "-r", help="Runs per measurement.")
+    ] = 3,
+) -> None:
+    """
+    Decode synthetic rows of each kind with and without validation.
+    """
+    now = datetime.now(timezone.utc)
+    repositories = _repositories()
+    table = Table(title="Entity decode throughput (rows/s)")
+    for column in ("Kind", "Rows", "Validated", "Trusted", "Speedup"):
+        table.add_column(column, justify="right" if column != "Kind" else "left")
+
+    for kind, (repo, make_entity) in repositories.items():
+        if kinds and kind not in kinds:
+            continue
+        for size in sizes:
+            entities = [make_entity(i, now) for i in range(size)]
+            validated = _decode_seconds(repo, entities, False, repeat)
+            trusted = _decode_seconds(repo, entities, True, repeat)
+            table.add_row(
+                kind,
+                f"{size:,}",
+                f"{size / validated:,.0f}",
+                f"{size / trusted:,.0f}",
+                f"{validated / trusted:.1f}x",
+            )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    app()
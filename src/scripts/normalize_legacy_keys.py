@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from typing import Annotated
+
+import typer
+from rich.console import Console
+
+# Configure logging to be less verbose during script execution
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+app = typer.Typer(
+    help="Rewrite legacy string-keyed users/chats and string user_id properties as ints."
+)
+console = Console()
+
+
+def is_numeric_str(value: object) -> bool:
+    return isinstance(value, str) and value.lstrip("-").isdigit()
+
+
+async def rekey_kind(repo, dry_run: bool) -> dict[str, int]:
+    """Moves entities keyed by a digit string to the equivalent int key."""
+
+    def _legacy_entities() -> list[tuple[str, object]]:
+        query = repo.client.query(kind=repo.kind)
+        return [
+            (e.key.name, repo._entity_to_domain(e))
+            for e in query.fetch()
+            if is_numeric_str(e.key.name)
+        ]
+
+    legacy = await asyncio.to_thread(_legacy_entities)
+    stats = {"found": len(legacy), "moved": 0, "conflicts": 0}
+    if not legacy:
+        return stats
+
+    # Entities that already exist under the int key need a manual merge
+    existing = {
+        m.id for m in await repo.load_many([int(name) for name, _ in legacy])
+    }
+    to_move, old_ids = [], []
+    for name, model in legacy:
+        new_id = int(name)
+        if new_id in existing:
+            stats["conflicts"] += 1
+            console.print(
+                f"  [red]![/red] {repo.kind} {name!r} also exists as {new_id}, skipped"
+            )
+            continue
+        model.id = new_id
+        to_move.append(model)
+        old_ids.append(name)
+
+    stats["moved"] = len(to_move)
+    if not dry_run and to_move:
+        # Write the new keys before deleting the old ones, so a failure
+        # halfway leaves duplicates rather than missing entities
+        await repo.save_many(to_move)
+        await repo.delete_many(old_ids)
+    return stats
+
+
+async def normalize_property(repo, field: str, dry_run: bool, **load_kwargs) -> int:
+    """Rewrites digit-string values of ``field`` as ints."""
+    models = await repo.load_all(**load_kwargs)
+    changed = [m for m in models if is_numeric_str(getattr(m, field))]
+    for model in changed:
+        setattr(model, field, int(getattr(model, field)))
+    if not dry_run and changed:
+        await repo.save_many(changed)
+    return len(changed)
+
+
+async def mark_linked_masters(repo, dry_run: bool) -> int:
+    """Sets ``has_aliases`` on users other accounts are linked to.
+
+    Links completed from now on set it themselves; this covers older ones.
+    """
+    from utils import canonical_id
+
+    users = await repo.load_all(ignore_gdpr=True)
+    targets = {canonical_id(u.linked_to) for u in users if u.linked_to is not None}
+    changed = [
+        u for u in users if canonical_id(u.id) in targets and not u.has_aliases
+    ]
+    for user in changed:
+        user.has_aliases = True
+    if not dry_run and changed:
+        await repo.save_many(changed)
+    return len(changed)
+
+
+async def normalize(dry_run: bool) -> None:
+    from infrastructure.datastore.user import user_repository
+    from infrastructure.datastore.chat import chat_repository
+    from infrastructure.datastore.phrase import phrase_repository, long_phrase_repository
+    from infrastructure.datastore.proposal import (
+        proposal_repository,
+        long_proposal_repository,
+    )
+
+    if dry_run:
+        console.print(
+            "[yellow]DRY RUN MODE: No changes will be saved to the database.[/yellow]"
+        )
+
+    console.print("\n[bold]Entity keys:[/bold]")
+    for repo in (user_repository, chat_repository):
+        stats = await rekey_kind(repo, dry_run)
+        console.print(
+            f"  {repo.kind}: {stats['found']} legacy keys, {stats['moved']} moved, "
+            f"{stats['conflicts']} conflicts"
+        )
+
+    console.print("\n[bold]Properties:[/bold]")
+    count = await normalize_property(
+        user_repository, "linked_to", dry_run, ignore_gdpr=True
+    )
+    console.print(f"  User.linked_to: {count} normalized")
+    for repo in (
+        phrase_repository,
+        long_phrase_repository,
+        proposal_repository,
+        long_proposal_repository,
+    ):
+        count = await normalize_property(repo, "user_id", dry_run)
+        console.print(f"  {repo.kind}.user_id: {count} normalized")
+
+    console.print("\n[bold]Links:[/bold]")
+    count = await mark_linked_masters(user_repository, dry_run)
+    console.print(f"  User.has_aliases: {count} set")
+
+    if dry_run:
+        console.print("\n[yellow]No changes were saved (Dry Run).[/yellow]")
+    else:
+        console.print("\n[green]Legacy keys normalized.[/green]")
+
+
+@app.command()
+def run(
+    dry_run: Annotated[
+        bool, typer.Option("--dry-run", "-n", help="Do not save changes to the database.")
+    ] = False,
+) -> None:
+    """
+    Normalize numeric ids stored as strings, so every user lookup is a single RPC.
+    """
+    try:
+        asyncio.run(normalize(dry_run))
+    except Exception as e:
+        console.print(f"[red]Error during execution:[/red] {e}")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
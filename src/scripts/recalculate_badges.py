@@ -1,10 +1,13 @@
 import asyncio
 import logging
+from collections import Counter
+from pathlib import Path
 from typing import Annotated
 
 import typer
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn
+
+from scripts.backfill_user_stats import UsageCheckpoint
 
 # Configure logging to be less verbose during script execution
 logging.basicConfig(level=logging.WARNING)
@@ -13,71 +16,64 @@ logger = logging.getLogger(__name__)
 app = typer.Typer(help="Retroactively recalculate and award badges to all users.")
 console = Console()
 
+DEFAULT_CHECKPOINT = Path("recalculate_badges.checkpoint.json")
+
+
+async def load_stats(from_stats: bool, checkpoint: UsageCheckpoint | None):
+    """Every account's stats: recounted from Usage in a single pass, or the
+    stored UserStats when ``from_stats``."""
+    from infrastructure.datastore.user_stats import user_stats_repository
+    from models.user_stats import UserStats
+    from scripts.backfill_user_stats import count_all
+
+    if from_stats:
+        return {s.id: s for s in await user_stats_repository.load_all()}
+    counts = await count_all(checkpoint)
+    return {user_id: UserStats.from_counts(user_id, c) for user_id, c in counts.items()}
+
+
+def print_change(change) -> None:
+    from core.container import services
 
-async def process_user(
-    user, badge_service, progress, task, semaphore, stats, dry_run: bool
+    user = change.user
+    badge_names = ", ".join(
+        services.badge_service.get_badge_info(b).name for b in change.added
+    )
+    console.print(
+        f"  [green]+[/green] User {user.name or user.id} ({user.platform}): [bold]{badge_names}[/bold]"
+    )
+
+
+async def process_users(
+    dry_run: bool, from_stats: bool, checkpoint: UsageCheckpoint | None
 ) -> None:
-    async with semaphore:
-        try:
-            # check_badges returns newly awarded Badge objects
-            new_badges = await badge_service.check_badges(user.id, user.platform)
-
-            if new_badges:
-                stats["users_with_updates"] += 1
-                stats["total_new_badges"] += len(new_badges)
-                badge_names = ", ".join([b.name for b in new_badges])
-                console.print(
-                    f"  [green]+[/green] User {user.name or user.id} ({user.platform}) awarded: [bold]{badge_names}[/bold]"
-                )
-        except Exception as e:
-            console.print(f"  [red]![/red] Error processing user {user.id}: {e}")
-        finally:
-            progress.advance(task)
-
-
-async def process_users(dry_run: bool, concurrency: int) -> None:
-    from services import user_service, badge_service
-    from unittest.mock import patch
-
-    users = user_service.user_repo.load_all(ignore_gdpr=True)
-    console.print(f"Found [bold]{len(users)}[/bold] users to process.")
-
-    stats = {"total_new_badges": 0, "users_with_updates": 0}
-    semaphore = asyncio.Semaphore(concurrency)
+    from core.container import services
+    from services.badge_recalculation import BadgeRecalculation
 
     if dry_run:
         console.print(
             "[yellow]DRY RUN MODE: No changes will be saved to the database.[/yellow]"
         )
 
-    # If dry run, we patch the save_user method to do nothing
-    # We patch it in UserService because BadgeService uses user_service instance
-    with (
-        patch("services.user_service.UserService.save_user")
-        if dry_run
-        else patch("services.badge_service.BadgeService.get_badge_info")
-    ):
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            MofNCompleteColumn(),
-            console=console,
-        ) as progress:
-            task = progress.add_task("Recalculating badges...", total=len(users))
-
-            tasks = [
-                process_user(
-                    user, badge_service, progress, task, semaphore, stats, dry_run
-                )
-                for user in users
-            ]
-            await asyncio.gather(*tasks)
+    stats = await load_stats(from_stats, checkpoint)
+    console.print(f"Stats loaded for [bold]{len(stats)}[/bold] accounts.")
+
+    awarded: Counter[str] = Counter()
+    users_with_updates = 0
+    engine = BadgeRecalculation(services.user_repo)
+    async for batch in engine.run(stats, dry_run=dry_run):
+        for change in batch:
+            print_change(change)
+            awarded.update(change.added)
+        users_with_updates += len(batch)
+        if not dry_run:
+            console.print(f"  [blue]i[/blue] Saved {len(batch)} users")
 
     console.print("\n[bold]Summary:[/bold]")
-    console.print(f"  Users processed: {len(users)}")
-    console.print(f"  Users with new badges: {stats['users_with_updates']}")
-    console.print(f"  Total new badges awarded: {stats['total_new_badges']}")
+    console.print(f"  Users with new badges: {users_with_updates}")
+    console.print(f"  Total new badges awarded: {sum(awarded.values())}")
+    for badge_id, count in awarded.most_common():
+        console.print(f"    {badge_id}: {count}")
 
     if dry_run:
         console.print("\n[yellow]No changes were saved (Dry Run).[/yellow]")
@@ -90,15 +86,24 @@ def recalculate(
     dry_run: Annotated[
         bool, typer.Option("--dry-run", "-n", help="Do not save changes to the database.")
     ] = False,
-    concurrency: Annotated[
-        int, typer.Option("--concurrency", "-c", help="Number of concurrent users to process.")
-    ] = 10,
+    from_stats: Annotated[
+        bool,
+        typer.Option(
+            "--from-stats", help="Use the stored UserStats instead of recounting Usage."
+        ),
+    ] = False,
+    checkpoint: Annotated[
+        Path, typer.Option(help="File to resume the Usage scan from and save it to.")
+    ] = DEFAULT_CHECKPOINT,
 ) -> None:
     """
     Recalculate badges for all users based on their current stats and history.
+
+    Badges earned at a given time of day are left to the bot, which awards
+    them on the usage that earns them.
     """
     try:
-        asyncio.run(process_users(dry_run, concurrency))
+        asyncio.run(process_users(dry_run, from_stats, UsageCheckpoint(checkpoint)))
     except Exception as e:
         console.print(f"[red]Error during execution:[/red] {e}")
         raise typer.Exit(code=1)
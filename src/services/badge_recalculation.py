@@ -0,0 +1,109 @@
+"""Bulk badge recalculation.
+
+Checking every user with ``BadgeService.check_badges`` costs a handful of
+reads and a write per user, and awards the time-of-day badges to whoever
+happens to be checked at that hour. ``BadgeRecalculation`` instead takes the
+counters of every user at once (recounted from ``Usage`` by the scripts, in
+a single pass), streams the users a page at a time and evaluates the rules
+that depend on the user's history only, saving each page's users that
+earned something in one batch.
+
+Badges are only ever added, so running it again after an interruption just
+picks up the users it hadn't saved yet.
+"""
+
+from collections.abc import AsyncIterator, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from infrastructure.protocols import UserRepository
+from models.user import User
+from models.user_stats import UserStats
+from services.badge_service import BadgeContext, earned_from_history
+from utils import canonical_id
+
+BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class BadgeChange:
+    """Badges a user has earned but doesn't have yet, in BADGES order."""
+
+    user: User
+    added: list[str]
+
+
+def _key(user_id: str | int) -> str:
+    return str(canonical_id(user_id))
+
+
+def merged_stats(
+    user_id: str, alias_ids: Sequence[str | int], stats: Mapping[str, UserStats]
+) -> UserStats:
+    """The account's stats with those of its aliases added in.
+
+    Usages are counted under the account that made them, while badges are
+    awarded to the master the alias is linked to.
+    """
+    counts: dict[str, int] = {}
+    for account_id in [user_id, *map(_key, alias_ids)]:
+        if (account_stats := stats.get(account_id)) is None:
+            continue
+        for name, value in account_stats.to_counts().items():
+            counts[name] = counts.get(name, 0) + value
+    return UserStats.from_counts(user_id, counts)
+
+
+def compute_changes(
+    users: Sequence[User],
+    stats: Mapping[str, UserStats],
+    aliases: Mapping[str, Sequence[str | int]] | None = None,
+    now: datetime | None = None,
+) -> list[BadgeChange]:
+    """The badges each master account in ``users`` is missing.
+
+    ``stats`` are per account as counted; the stats of the ``aliases`` of
+    each master (by master id) are added to its own.
+    """
+    now = now or datetime.now(timezone.utc)
+    aliases = aliases or {}
+    changes = []
+    for user in users:
+        if user.linked_to:
+            continue
+        user_id = _key(user.id)
+        user_stats = merged_stats(user_id, aliases.get(user_id, []), stats)
+        ctx = BadgeContext(user, user_stats, now)
+        current = set(user.badges)
+        added = [b for b in earned_from_history(ctx) if b not in current]
+        if added:
+            changes.append(BadgeChange(user, added))
+    return changes
+
+
+class BadgeRecalculation:
+    def __init__(self, user_repo: UserRepository, batch_size: int = BATCH_SIZE):
+        self.user_repo = user_repo
+        self.batch_size = batch_size
+
+    async def run(
+        self, stats: Mapping[str, UserStats], dry_run: bool = False
+    ) -> AsyncIterator[list[BadgeChange]]:
+        """Yields the changes of each page of users that has any, saved
+        first unless ``dry_run``."""
+        async for users in self.user_repo.iter_pages(self.batch_size):
+            # Masters are flagged when linked; their aliases come from the
+            # repository's reverse index
+            aliases = {
+                _key(u.id): await self.user_repo.get_aliases(u.id)
+                for u in users
+                if u.has_aliases and not u.linked_to
+            }
+            changes = compute_changes(users, stats, aliases)
+            if not changes:
+                continue
+            if not dry_run:
+                for change in changes:
+                    change.user.badges.extend(change.added)
+                await self.user_repo.save_many([c.user for c in changes])
+            yield changes
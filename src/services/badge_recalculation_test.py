@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from infrastructure.memory.user import UserMemoryRepository
+from models.usage import ActionType
+from models.user import User
+from models.user_stats import UserStats
+from services.badge_recalculation import (
+    BadgeRecalculation,
+    compute_changes,
+    merged_stats,
+)
+from services.badge_service import BadgeContext, earned_from_history
+
+
+def _stats(user_id: str, **actions: int) -> UserStats:
+    return UserStats(id=user_id, usages=sum(actions.values()), actions=actions)
+
+
+def test_earned_from_history_skips_momentary_badges():
+    # At 3 AM, with ten recent usages: trasnochador and pesao if checked live
+    now = datetime(2026, 1, 1, 3, tzinfo=timezone.utc)
+    user = User(id=1, last_usages=[now] * 10)
+    ctx = BadgeContext(user, _stats("1", vision=5), now)
+
+    assert earned_from_history(ctx) == ["novato", "visionario"]
+    assert earned_from_history(BadgeContext(User(id=2), UserStats(id="2"), now)) == []
+
+
+def test_alias_stats_count_for_their_master():
+    users = [User(id=1, has_aliases=True), User(id=2, linked_to=1)]
+    stats = {
+        "1": _stats("1", vision=2),
+        "2": _stats("2", vision=2),
+        "3": _stats("3", vision=1),
+    }
+
+    assert merged_stats("1", [2, "3"], stats).count(ActionType.VISION) == 5
+    changes = compute_changes(users, stats, {"1": [2, "3"]})
+    assert [(c.user.id, c.added) for c in changes] == [
+        (1, ["novato", "visionario", "multiplataforma"])
+    ]
+
+
+def test_only_missing_badges_are_changes():
+    users = [User(id=1, badges=["novato"]), User(id=2), User(id=3, has_aliases=True)]
+    stats = {"1": _stats("1", ai_ask=1), "2": UserStats(id="2")}
+
+    changes = compute_changes(users, stats)
+
+    assert [(c.user.id, c.added) for c in changes] == [(3, ["multiplataforma"])]
+
+
+@pytest.mark.asyncio
+async def test_run_saves_changes_in_batches():
+    repo = UserMemoryRepository()
+    for i in range(1, 6):
+        await repo.save(User(id=i))
+    stats = {str(i): _stats(str(i), audio=5) for i in range(1, 5)}
+
+    batches = [
+        batch async for batch in BadgeRecalculation(repo, batch_size=3).run(stats)
+    ]
+
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert (await repo.load(4)).badges == ["novato", "melomano"]
+    assert (await repo.load(5)).badges == []
+
+
+@pytest.mark.asyncio
+async def test_dry_run_saves_nothing():
+    repo = UserMemoryRepository()
+    await repo.save(User(id=1))
+
+    batches = [
+        batch
+        async for batch in BadgeRecalculation(repo).run(
+            {"1": _stats("1", gift_sent=1)}, dry_run=True
+        )
+    ]
+
+    assert batches[0][0].added == ["novato", "rey_mago"]
+    assert (await repo.load(1)).badges == []
+
+
+@pytest.mark.asyncio
+async def test_run_streams_users_and_folds_in_aliases():
+    repo = UserMemoryRepository()
+    await repo.save(User(id=1, has_aliases=True))
+    await repo.save(User(id=2, linked_to=1))
+    await repo.save(User(id=3, linked_to=2))
+    stats = {"2": _stats("2", vision=3), "3": _stats("3", vision=2)}
+
+    batches = [
+        batch async for batch in BadgeRecalculation(repo, batch_size=1).run(stats)
+    ]
+
+    assert [[(c.user.id, c.added) for c in b] for b in batches] == [
+        [(1, ["novato", "visionario", "multiplataforma"])]
+    ]
+    assert (await repo.load_raw(2)).badges == []
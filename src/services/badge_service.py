@@ -1,5 +1,6 @@
 import logging
-import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING, cast
 from pydantic import BaseModel
@@ -10,7 +11,11 @@ from infrastructure.protocols import (
     PhraseRepository,
     LongPhraseRepository,
     GiftRepository,
+    PosterRequestRepository,
+    UserStatsRepository,
 )
+from models.usage import ActionType
+from models.user_stats import UserStats
 
 if TYPE_CHECKING:
     from models.user import User
@@ -177,6 +182,195 @@ BADGES = [
 ]
 
 
+@dataclass
+class BadgeContext:
+    """What badge rules are evaluated against."""
+
+    user: User
+    stats: UserStats
+    now: datetime
+
+
+def _recent_usages(ctx: BadgeContext) -> int:
+    since = ctx.now - timedelta(hours=1)
+    return len([u for u in ctx.user.last_usages or [] if u >= since])
+
+
+def _early_morning(ctx: BadgeContext) -> bool:
+    now = ctx.now
+    return 5 <= now.hour < 7 or (now.hour == 7 and now.minute <= 30)
+
+
+def _is_linked(ctx: BadgeContext) -> bool:
+    return ctx.user.has_aliases or ctx.user.linked_to is not None
+
+
+def _action_count(action: ActionType) -> Callable[[BadgeContext], int]:
+    return lambda ctx: ctx.stats.count(action)
+
+
+@dataclass(frozen=True)
+class BadgeRule:
+    """When a badge is earned, and which usages can earn it.
+
+    A rule with a ``metric`` is earned once the metric reaches ``target``,
+    and that's its progress too; rules without one use ``earned`` and show
+    no progress. ``triggers`` are the actions whose usages can change the
+    outcome; None means any usage can (time of day, activity). Checks that
+    aren't about a usage evaluate every rule. ``momentary`` rules are about
+    the moment of the check rather than the user's history, so recalculating
+    badges in bulk skips them.
+    """
+
+    badge_id: str
+    metric: Callable[[BadgeContext], int] | None = None
+    target: int = 0
+    earned: Callable[[BadgeContext], bool] | None = None
+    triggers: frozenset[ActionType] | None = frozenset()
+    momentary: bool = False
+
+    def is_earned(self, ctx: BadgeContext) -> bool:
+        if self.earned is not None:
+            return self.earned(ctx)
+        return self.is_reached(ctx)
+
+    def is_reached(self, ctx: BadgeContext) -> bool:
+        return self.metric is not None and self.metric(ctx) >= self.target
+
+
+def _on(*actions: ActionType) -> frozenset[ActionType]:
+    return frozenset(actions)
+
+
+BADGE_RULES = [
+    BadgeRule(
+        "novato",
+        metric=lambda ctx: 1 if ctx.stats.usages > 0 else 0,
+        target=1,
+        # Being checked at all means the bot was used
+        earned=lambda ctx: True,
+        triggers=None,
+    ),
+    BadgeRule("madrugador", earned=_early_morning, triggers=None, momentary=True),
+    BadgeRule(
+        "trasnochador",
+        earned=lambda ctx: 2 <= ctx.now.hour < 5,
+        triggers=None,
+        momentary=True,
+    ),
+    BadgeRule(
+        "fiera_total", metric=lambda ctx: ctx.stats.usages, target=50, triggers=None
+    ),
+    BadgeRule(
+        "visionario",
+        metric=_action_count(ActionType.VISION),
+        target=5,
+        triggers=_on(ActionType.VISION),
+    ),
+    BadgeRule("pesao", metric=_recent_usages, target=10, triggers=None, momentary=True),
+    # Authored phrases are recorded with the approval, which checks everything
+    BadgeRule("poeta", metric=lambda ctx: ctx.stats.phrases, target=5),
+    BadgeRule(
+        "autor",
+        metric=_action_count(ActionType.APPROVE),
+        target=1,
+        triggers=_on(ActionType.APPROVE),
+    ),
+    BadgeRule(
+        "incomprendido",
+        metric=_action_count(ActionType.REJECT),
+        target=1,
+        triggers=_on(ActionType.REJECT),
+    ),
+    BadgeRule(
+        "charlatan",
+        metric=_action_count(ActionType.AI_ASK),
+        target=5,
+        triggers=_on(ActionType.AI_ASK),
+    ),
+    BadgeRule(
+        "melomano",
+        metric=_action_count(ActionType.AUDIO),
+        target=5,
+        triggers=_on(ActionType.AUDIO),
+    ),
+    BadgeRule(
+        "insistente",
+        metric=_action_count(ActionType.PROPOSE),
+        target=10,
+        triggers=_on(ActionType.PROPOSE),
+    ),
+    # Accounts are linked outside any usage: pick it up on the next one
+    BadgeRule("multiplataforma", earned=_is_linked, triggers=None),
+    BadgeRule(
+        "centro_atencion",
+        metric=_action_count(ActionType.REACTION_RECEIVED),
+        target=1,
+        triggers=_on(ActionType.REACTION_RECEIVED),
+    ),
+    BadgeRule(
+        "mecenas",
+        metric=lambda ctx: ctx.stats.posters,
+        target=1,
+        triggers=_on(ActionType.POSTER),
+    ),
+    BadgeRule(
+        "coleccionista",
+        metric=lambda ctx: ctx.stats.posters,
+        target=5,
+        triggers=_on(ActionType.POSTER),
+    ),
+    BadgeRule(
+        "galerista",
+        metric=lambda ctx: ctx.stats.posters,
+        target=10,
+        triggers=_on(ActionType.POSTER),
+    ),
+    BadgeRule(
+        "vip",
+        metric=_action_count(ActionType.SUBSCRIPTION),
+        target=1,
+        triggers=_on(ActionType.SUBSCRIPTION),
+    ),
+    BadgeRule(
+        "rey_mago",
+        metric=_action_count(ActionType.GIFT_SENT),
+        target=1,
+        triggers=_on(ActionType.GIFT_SENT),
+    ),
+    BadgeRule(
+        "consentido",
+        metric=_action_count(ActionType.GIFT_RECEIVED),
+        target=1,
+        triggers=_on(ActionType.GIFT_RECEIVED),
+    ),
+    # Game results aren't usages; the game checks everything after each one
+    BadgeRule("viciado", metric=lambda ctx: ctx.user.game_stats, target=10),
+    BadgeRule("parroquia", metric=lambda ctx: ctx.user.game_streak, target=3),
+    BadgeRule("pinchito_oro", metric=lambda ctx: ctx.user.game_high_score, target=500),
+]
+
+# The rules a usage of each action can affect, in BADGES order
+RULES_BY_ACTION = {
+    action: [r for r in BADGE_RULES if r.triggers is None or action in r.triggers]
+    for action in ActionType
+}
+
+
+def earned_from_history(ctx: BadgeContext) -> list[str]:
+    """The badges the user's stats and state alone earn, in BADGES order.
+
+    What a recalculation without a usage to check can award: momentary rules
+    are skipped and rules with a metric go by it.
+    """
+    return [
+        r.badge_id
+        for r in BADGE_RULES
+        if not r.momentary
+        and (r.is_reached(ctx) if r.metric is not None else r.is_earned(ctx))
+    ]
+
+
 class BadgeService:
     def __init__(
         self,
@@ -185,13 +379,38 @@ class BadgeService:
         phrase_repo: PhraseRepository,
         long_phrase_repo: LongPhraseRepository,
         gift_repo: GiftRepository,
+        poster_request_repo: PosterRequestRepository | None = None,
+        user_service: UserService | None = None,
+        user_stats_repo: UserStatsRepository | None = None,
     ):
         self.user_repo = user_repo
         self.usage_repo = usage_repo
         self.phrase_repo = phrase_repo
         self.long_phrase_repo = long_phrase_repo
         self.gift_repo = gift_repo
-        self._user_service: UserService | None = None
+        self._poster_request_repo = poster_request_repo
+        self._user_service = user_service
+        self._user_stats_repo = user_stats_repo
+
+    @property
+    def poster_request_repo(self) -> PosterRequestRepository:
+        if self._poster_request_repo is None:
+            # Default to the Datastore singleton, looked up on each use
+            from infrastructure.datastore.poster_request import (
+                poster_request_repository,
+            )
+
+            return poster_request_repository
+        return self._poster_request_repo
+
+    @property
+    def user_stats_repo(self) -> UserStatsRepository:
+        if self._user_stats_repo is None:
+            # Default to the Datastore singleton, looked up on each use
+            from infrastructure.datastore.user_stats import user_stats_repository
+
+            return user_stats_repository
+        return self._user_stats_repo
 
     @property
     def user_service(self) -> UserService:
@@ -221,21 +440,43 @@ class BadgeService:
                     LongProposalRepository, long_proposal_repository
                 ),
                 link_request_repo=cast(LinkRequestRepository, link_request_repository),
+                user_stats_repo=self._user_stats_repo,
             )
         return self._user_service
 
+    async def record(
+        self,
+        user_id: str | int,
+        action: ActionType | None = None,
+        phrases: int = 0,
+        posters: int = 0,
+    ) -> UserStats:
+        """Counts an action, authored phrases or completed posters towards
+        the user's badges."""
+        counts = UserStats.deltas(action, phrases=phrases, posters=posters)
+        return await self.user_stats_repo.add(str(user_id), counts)
+
+    async def get_stats(self, user_id: str | int) -> UserStats:
+        """The counters badges are checked against."""
+        stats = await self.user_stats_repo.load(str(user_id))
+        return stats or UserStats(id=str(user_id))
+
     async def check_badges(
-        self, user_id: str | int, platform: str, save: bool = True
+        self,
+        user_id: str | int,
+        platform: str,
+        save: bool = True,
+        action: ActionType | None = None,
     ) -> list[Badge]:
-        """Checks and awards new badges to a user. Returns list of NEWLY awarded Badge objects."""
-        from models.usage import ActionType
+        """Checks and awards new badges to a user. Returns list of NEWLY awarded Badge objects.
 
+        With the ``action`` of the usage just logged, only the badges such a
+        usage can earn are checked; without it, all of them.
+        """
         user = await self.user_service.get_user(user_id, platform)
         if not user:
             return []
 
-        new_badge_ids = []
-        current_badges = set(user.badges)
         now = datetime.now(timezone.utc)
 
         # Update activity history
@@ -244,159 +485,13 @@ class BadgeService:
         user.last_usages.append(now)
         user.last_usages = user.last_usages[-20:]
 
-        # Novato
-        if "novato" not in current_badges:
-            new_badge_ids.append("novato")
-
-        # Madrugador
-        if "madrugador" not in current_badges:
-            if 5 <= now.hour < 7 or (now.hour == 7 and now.minute <= 30):
-                new_badge_ids.append("madrugador")
-
-        # Trasnochador
-        if "trasnochador" not in current_badges:
-            if 2 <= now.hour < 5:
-                new_badge_ids.append("trasnochador")
-
-        # Fiera Total
-        if "fiera_total" not in current_badges:
-            stats = await self.usage_repo.get_user_usage_count(str(user_id))
-            if stats >= 50:
-                new_badge_ids.append("fiera_total")
-
-        # Visionario
-        if "visionario" not in current_badges:
-            vision_count = await self.usage_repo.get_user_action_count(
-                str(user_id), action=ActionType.VISION.value
-            )
-            if vision_count >= 5:
-                new_badge_ids.append("visionario")
-
-        # Poeta
-        if "poeta" not in current_badges:
-            # phrase_repo is now injected
-            user_phrases_count = await self.phrase_repo.get_user_phrase_count(
-                str(user_id)
-            )
-            if user_phrases_count >= 5:
-                new_badge_ids.append("poeta")
-
-        # Pesao
-        if "pesao" not in current_badges:
-            since = now - timedelta(hours=1)
-            recent_count = len([u for u in user.last_usages if u >= since])
-            if recent_count >= 10:
-                new_badge_ids.append("pesao")
-
-        # Autor
-        if "autor" not in current_badges:
-            approve_count = await self.usage_repo.get_user_action_count(
-                str(user_id), action=ActionType.APPROVE.value
-            )
-            if approve_count >= 1:
-                new_badge_ids.append("autor")
-
-        # Incomprendido
-        if "incomprendido" not in current_badges:
-            reject_count = await self.usage_repo.get_user_action_count(
-                str(user_id), action=ActionType.REJECT.value
-            )
-            if reject_count >= 1:
-                new_badge_ids.append("incomprendido")
-
-        # Charlatán
-        if "charlatan" not in current_badges:
-            ai_count = await self.usage_repo.get_user_action_count(
-                str(user_id), action=ActionType.AI_ASK.value
-            )
-            if ai_count >= 5:
-                new_badge_ids.append("charlatan")
-
-        # Melómano
-        if "melomano" not in current_badges:
-            audio_count = await self.usage_repo.get_user_action_count(
-                str(user_id), action=ActionType.AUDIO.value
-            )
-            if audio_count >= 5:
-                new_badge_ids.append("melomano")
-
-        # Insistente
-        if "insistente" not in current_badges:
-            propose_count = await self.usage_repo.get_user_action_count(
-                str(user_id), action=ActionType.PROPOSE.value
-            )
-            if propose_count >= 10:
-                new_badge_ids.append("insistente")
-
-        # Multiplataforma
-        if "multiplataforma" not in current_badges:
-            raw_user = await self.user_repo.load_raw(user.id)
-            if raw_user and raw_user.linked_to:
-                new_badge_ids.append("multiplataforma")
-            else:
-                all_users = await self.user_repo.load_all(ignore_gdpr=True)
-                if any(u.linked_to == user.id for u in all_users):
-                    new_badge_ids.append("multiplataforma")
-
-        # Centro de Atención
-        if "centro_atencion" not in current_badges:
-            reaction_count = await self.usage_repo.get_user_action_count(
-                str(user_id), action=ActionType.REACTION_RECEIVED.value
-            )
-            if reaction_count >= 1:
-                new_badge_ids.append("centro_atencion")
-
-        # VIP
-        if "vip" not in current_badges:
-            sub_count = await self.usage_repo.get_user_action_count(
-                str(user_id), action=ActionType.SUBSCRIPTION.value
-            )
-            if sub_count >= 1:
-                new_badge_ids.append("vip")
-
-        # El Rey Mago
-        if "rey_mago" not in current_badges:
-            gift_sent_count = await self.usage_repo.get_user_action_count(
-                str(user_id), action=ActionType.GIFT_SENT.value
-            )
-            if gift_sent_count >= 1:
-                new_badge_ids.append("rey_mago")
-
-        # El Consentido
-        if "consentido" not in current_badges:
-            gift_received_count = await self.usage_repo.get_user_action_count(
-                str(user_id), action=ActionType.GIFT_RECEIVED.value
-            )
-            if gift_received_count >= 1:
-                new_badge_ids.append("consentido")
-
-        # Poster badges
-        if any(
-            b not in current_badges for b in ["mecenas", "coleccionista", "galerista"]
-        ):
-            from infrastructure.datastore.poster_request import (
-                poster_request_repository,
-            )
-
-            poster_count = await poster_request_repository.count_completed_by_user(
-                user.id
-            )
-            if "mecenas" not in current_badges and poster_count >= 1:
-                new_badge_ids.append("mecenas")
-            if "coleccionista" not in current_badges and poster_count >= 5:
-                new_badge_ids.append("coleccionista")
-            if "galerista" not in current_badges and poster_count >= 10:
-                new_badge_ids.append("galerista")
-
-        # Game badges
-        if "viciado" not in current_badges and user.game_stats >= 10:
-            new_badge_ids.append("viciado")
-
-        if "parroquia" not in current_badges and user.game_streak >= 3:
-            new_badge_ids.append("parroquia")
-
-        if "pinchito_oro" not in current_badges and user.game_high_score >= 500:
-            new_badge_ids.append("pinchito_oro")
+        current_badges = set(user.badges)
+        rules = BADGE_RULES if action is None else RULES_BY_ACTION[action]
+        pending = [r for r in rules if r.badge_id not in current_badges]
+        new_badge_ids = []
+        if pending:
+            ctx = BadgeContext(user, await self.get_stats(user_id), now)
+            new_badge_ids = [r.badge_id for r in pending if r.is_earned(ctx)]
 
         if new_badge_ids:
             user.badges.extend(new_badge_ids)
@@ -423,8 +518,6 @@ class BadgeService:
         user: User | None = None,
     ) -> list[BadgeProgress]:
         """Returns a list of all badges with current user progress."""
-        from models.usage import ActionType
-
         if not user:
             user = await self.user_service.get_user(user_id, platform)
 
@@ -432,151 +525,21 @@ class BadgeService:
             return []
 
         current_badges = set(user.badges)
-        results: list[BadgeProgress] = []
-
-        from infrastructure.datastore.poster_request import poster_request_repository
-
-        # Get stats in parallel. Ensure user_id is string for repositories that expect strings.
-        uid_str = str(user_id)
-
         try:
-            (
-                total_usages,
-                vision_count,
-                ai_count,
-                audio_count,
-                propose_count,
-                approve_count,
-                reject_count,
-                reaction_count,
-                sub_count,
-                gift_sent_count,
-                gift_received_count,
-                user_phrases_count,
-                poster_count,
-            ) = await asyncio.gather(
-                self.usage_repo.get_user_usage_count(uid_str),
-                self.usage_repo.get_user_action_count(
-                    uid_str, action=ActionType.VISION.value
-                ),
-                self.usage_repo.get_user_action_count(
-                    uid_str, action=ActionType.AI_ASK.value
-                ),
-                self.usage_repo.get_user_action_count(
-                    uid_str, action=ActionType.AUDIO.value
-                ),
-                self.usage_repo.get_user_action_count(
-                    uid_str, action=ActionType.PROPOSE.value
-                ),
-                self.usage_repo.get_user_action_count(
-                    uid_str, action=ActionType.APPROVE.value
-                ),
-                self.usage_repo.get_user_action_count(
-                    uid_str, action=ActionType.REJECT.value
-                ),
-                self.usage_repo.get_user_action_count(
-                    uid_str, action=ActionType.REACTION_RECEIVED.value
-                ),
-                self.usage_repo.get_user_action_count(
-                    uid_str, action=ActionType.SUBSCRIPTION.value
-                ),
-                self.usage_repo.get_user_action_count(
-                    uid_str, action=ActionType.GIFT_SENT.value
-                ),
-                self.usage_repo.get_user_action_count(
-                    uid_str, action=ActionType.GIFT_RECEIVED.value
-                ),
-                self.phrase_repo.get_user_phrase_count(uid_str),
-                poster_request_repository.count_completed_by_user(user_id),
-            )
+            stats = await self.get_stats(user_id)
         except Exception as e:
-            logger.error(f"Error gathering stats for badges: {e}")
-            # Fallback to zero values if gather fails to prevent 500 error
-            (
-                total_usages,
-                vision_count,
-                ai_count,
-                audio_count,
-                propose_count,
-                approve_count,
-                reject_count,
-                reaction_count,
-                sub_count,
-                gift_sent_count,
-                gift_received_count,
-                user_phrases_count,
-                poster_count,
-            ) = (0,) * 13
+            logger.error(f"Error loading stats for badges: {e}")
+            # Zeroes rather than a 500
+            stats = UserStats(id=str(user_id))
+        ctx = BadgeContext(user, stats, datetime.now(timezone.utc))
+        rules = {r.badge_id: r for r in BADGE_RULES}
 
+        results: list[BadgeProgress] = []
         for badge in BADGES:
+            rule = rules[badge.id]
             is_earned = badge.id in current_badges
-            current_val = 0
-            target_val = 0
-
-            if badge.id == "fiera_total":
-                current_val = total_usages
-                target_val = 50
-            elif badge.id == "visionario":
-                current_val = vision_count
-                target_val = 5
-            elif badge.id == "poeta":
-                current_val = user_phrases_count
-                target_val = 5
-            elif badge.id == "charlatan":
-                current_val = ai_count
-                target_val = 5
-            elif badge.id == "melomano":
-                current_val = audio_count
-                target_val = 5
-            elif badge.id == "insistente":
-                current_val = propose_count
-                target_val = 10
-            elif badge.id == "autor":
-                current_val = approve_count
-                target_val = 1
-            elif badge.id == "incomprendido":
-                current_val = reject_count
-                target_val = 1
-            elif badge.id == "pesao":
-                since = datetime.now(timezone.utc) - timedelta(hours=1)
-                if hasattr(user, "last_usages") and user.last_usages:
-                    current_val = len([u for u in user.last_usages if u >= since])
-                else:
-                    current_val = 0
-                target_val = 10
-            elif badge.id == "novato":
-                current_val = 1 if total_usages > 0 else 0
-                target_val = 1
-            elif badge.id == "centro_atencion":
-                current_val = reaction_count
-                target_val = 1
-            elif badge.id == "vip":
-                current_val = sub_count
-                target_val = 1
-            elif badge.id == "rey_mago":
-                current_val = gift_sent_count
-                target_val = 1
-            elif badge.id == "consentido":
-                current_val = gift_received_count
-                target_val = 1
-            elif badge.id == "mecenas":
-                current_val = poster_count
-                target_val = 1
-            elif badge.id == "coleccionista":
-                current_val = poster_count
-                target_val = 5
-            elif badge.id == "galerista":
-                current_val = poster_count
-                target_val = 10
-            elif badge.id == "viciado":
-                current_val = user.game_stats
-                target_val = 10
-            elif badge.id == "parroquia":
-                current_val = user.game_streak
-                target_val = 3
-            elif badge.id == "pinchito_oro":
-                current_val = user.game_high_score
-                target_val = 500
+            current_val = rule.metric(ctx) if rule.metric else 0
+            target_val = rule.target if rule.metric else 0
 
             progress = 100 if is_earned else 0
             if not is_earned and target_val > 0:
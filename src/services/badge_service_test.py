@@ -1,14 +1,23 @@
 import pytest
 from datetime import datetime, timezone
 from unittest.mock import patch, AsyncMock
-from services.badge_service import BadgeService
+from services.badge_service import (
+    BADGE_RULES,
+    BADGES,
+    RULES_BY_ACTION,
+    BadgeService,
+)
 from models.user import User
 from models.usage import ActionType
+from models.user_stats import UserStats
+from infrastructure.memory.user_stats import UserStatsMemoryRepository
 
 
 @pytest.fixture
 def mock_user_repo():
-    return AsyncMock()
+    repo = AsyncMock()
+    repo.get_aliases.return_value = []
+    return repo
 
 
 @pytest.fixture
@@ -31,6 +40,11 @@ def mock_gift_repo():
     return AsyncMock()
 
 
+@pytest.fixture
+def stats_repo():
+    return UserStatsMemoryRepository()
+
+
 @pytest.fixture
 def badge_service(
     mock_user_repo,
@@ -38,6 +52,7 @@ def badge_service(
     mock_phrase_repo,
     mock_long_phrase_repo,
     mock_gift_repo,
+    stats_repo,
 ):
     svc = BadgeService(
         user_repo=mock_user_repo,
@@ -45,6 +60,7 @@ def badge_service(
         phrase_repo=mock_phrase_repo,
         long_phrase_repo=mock_long_phrase_repo,
         gift_repo=mock_gift_repo,
+        user_stats_repo=stats_repo,
     )
     # Set the private attribute, the property will return it
     svc._user_service = AsyncMock()
@@ -59,13 +75,10 @@ def badge_service(
 
 
 @pytest.mark.asyncio
-async def test_check_badges_awards_novato(badge_service, mock_usage_repo):
+async def test_check_badges_awards_novato(badge_service, stats_repo):
     user = User(id="123", badges=[])
     badge_service.user_service.get_user = AsyncMock(return_value=user)
-
-    mock_usage_repo.get_user_usage_count.return_value = 1
-    mock_usage_repo.get_user_action_count.return_value = 0
-    badge_service.phrase_repo.get_user_phrase_count.return_value = 0
+    await badge_service.record("123", action=ActionType.PHRASE)
 
     new_badges = await badge_service.check_badges("123", "telegram")
 
@@ -74,41 +87,34 @@ async def test_check_badges_awards_novato(badge_service, mock_usage_repo):
 
 
 @pytest.mark.asyncio
-async def test_check_badges_awards_visionario(badge_service, mock_usage_repo):
+async def test_check_badges_awards_visionario(
+    badge_service, stats_repo, mock_usage_repo
+):
     # User already has novato
     user = User(id="123", badges=["novato"])
     badge_service.user_service.get_user = AsyncMock(return_value=user)
 
-    # Mock usage counts
-    # Fiera total < 50
-    mock_usage_repo.get_user_usage_count.return_value = 10
-
-    # Visionario >= 5
-    async def side_effect(uid, platform=None, action=None):
-        if action == ActionType.VISION.value:
-            return 10
-        return 0
-
-    mock_usage_repo.get_user_action_count.side_effect = side_effect
-    badge_service.phrase_repo.get_user_phrase_count.return_value = 0
+    # Fiera total < 50, Visionario >= 5
+    for _ in range(5):
+        await badge_service.record("123", action=ActionType.VISION)
+    await badge_service.record("123", action=ActionType.PHRASE)
 
     new_badges = await badge_service.check_badges("123", "telegram")
 
     assert any(b.id == "visionario" for b in new_badges)
     assert "visionario" in user.badges
     badge_service.user_service.save_user.assert_called_once()
+    # Read from the stats, never counted from Usage
+    mock_usage_repo.get_user_action_count.assert_not_called()
+    mock_usage_repo.get_user_usage_count.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_check_badges_awards_poeta(badge_service, mock_usage_repo):
+async def test_check_badges_awards_poeta(badge_service, stats_repo):
     # User already has novato
     user = User(id="123", badges=["novato"])
     badge_service.user_service.get_user = AsyncMock(return_value=user)
-
-    mock_usage_repo.get_user_usage_count.return_value = 10
-    mock_usage_repo.get_user_action_count.return_value = 0
-
-    badge_service.phrase_repo.get_user_phrase_count.return_value = 5
+    await stats_repo.save(UserStats(id="123", usages=10, phrases=5))
 
     new_badges = await badge_service.check_badges("123", "telegram")
 
@@ -117,18 +123,13 @@ async def test_check_badges_awards_poeta(badge_service, mock_usage_repo):
 
 
 @pytest.mark.asyncio
-async def test_check_badges_awards_pesao(badge_service, mock_usage_repo):
+async def test_check_badges_awards_pesao(badge_service):
     # Setup user with 9 recent usages (current interaction will make it 10)
     # User already has novato
     now = datetime.now(timezone.utc)
     user = User(id="123", badges=["novato"], last_usages=[now] * 9)
     badge_service.user_service.get_user = AsyncMock(return_value=user)
 
-    mock_usage_repo.get_user_usage_count.return_value = 5  # Not fiera total
-    mock_usage_repo.get_user_action_count.return_value = 0  # Not visionario
-
-    badge_service.phrase_repo.get_user_phrase_count.return_value = 0  # Not poeta
-
     new_badges = await badge_service.check_badges("123", "telegram")
 
     assert any(b.id == "pesao" for b in new_badges)
@@ -138,17 +139,15 @@ async def test_check_badges_awards_pesao(badge_service, mock_usage_repo):
 
 
 @pytest.mark.asyncio
-async def test_check_badges_awards_each_logro_once(badge_service, mock_usage_repo):
+async def test_check_badges_awards_each_logro_once(badge_service, stats_repo):
     """User story 21: a Logro is awarded once. Re-evaluating a milestone a
     Perfil already holds must not return it again nor duplicate it on the user.
     These rules are exercised without any Telegram or Slack object."""
     user = User(id="123", badges=[])
     badge_service.user_service.get_user = AsyncMock(return_value=user)
 
-    mock_usage_repo.get_user_usage_count.return_value = 1
-    mock_usage_repo.get_user_action_count.return_value = 0
     # Meets the Poeta milestone (>= 5 authored Apelativos).
-    badge_service.phrase_repo.get_user_phrase_count.return_value = 5
+    await stats_repo.save(UserStats(id="123", usages=1, phrases=5))
 
     first = await badge_service.check_badges("123", "telegram")
     assert any(b.id == "poeta" for b in first)
@@ -157,3 +156,73 @@ async def test_check_badges_awards_each_logro_once(badge_service, mock_usage_rep
     second = await badge_service.check_badges("123", "telegram")
     assert all(b.id != "poeta" for b in second)
     assert user.badges.count("poeta") == 1
+
+
+@pytest.mark.asyncio
+async def test_check_badges_multiplataforma_from_aliases(badge_service, mock_user_repo):
+    unlinked = User(id="123", badges=[])
+    linked = User(id="456", badges=[], has_aliases=True)
+
+    for user, expected in ((unlinked, False), (linked, True)):
+        badge_service.user_service.get_user = AsyncMock(return_value=user)
+        new_badges = await badge_service.check_badges(user.id, "telegram")
+        assert ("multiplataforma" in [b.id for b in new_badges]) is expected
+
+    # Read off the user: no lookups of other accounts
+    mock_user_repo.load_raw.assert_not_called()
+    mock_user_repo.get_aliases.assert_not_called()
+    mock_user_repo.load_all.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_all_badges_progress_reads_stats(badge_service, stats_repo):
+    user = User(id="123", badges=["novato"])
+    await stats_repo.save(
+        UserStats(id="123", usages=20, actions={"audio": 3}, phrases=2, posters=7)
+    )
+
+    progress = {
+        p.badge.id: p
+        for p in await badge_service.get_all_badges_progress("123", "telegram", user)
+    }
+
+    assert (progress["fiera_total"].current, progress["fiera_total"].progress) == (
+        20,
+        40,
+    )
+    assert progress["melomano"].current == 3
+    assert progress["poeta"].current == 2
+    assert progress["coleccionista"].current == 7
+    assert progress["novato"].is_earned
+
+
+def test_rules_follow_badges():
+    assert [r.badge_id for r in BADGE_RULES] == [b.id for b in BADGES]
+    assert [r.badge_id for r in RULES_BY_ACTION[ActionType.AUDIO]] == [
+        "novato",
+        "madrugador",
+        "trasnochador",
+        "fiera_total",
+        "pesao",
+        "melomano",
+        "multiplataforma",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_check_badges_for_action_evaluates_only_its_rules(
+    badge_service, stats_repo
+):
+    user = User(id="123", badges=["novato"])
+    badge_service.user_service.get_user = AsyncMock(return_value=user)
+    await stats_repo.save(
+        UserStats(id="123", usages=10, actions={"vision": 5, "audio": 5})
+    )
+
+    audio = await badge_service.check_badges("123", "telegram", action=ActionType.AUDIO)
+    assert "melomano" in [b.id for b in audio]
+    assert "visionario" not in user.badges
+
+    # A check that isn't about a usage looks at everything
+    everything = await badge_service.check_badges("123", "telegram")
+    assert "visionario" in [b.id for b in everything]
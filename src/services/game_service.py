@@ -8,6 +8,7 @@ from infrastructure.protocols import UserRepository
 from models.user import User
 from services.badge_service import BadgeService
 from core.config import config
+from utils import canonical_id
 
 logger = logging.getLogger(__name__)
 
@@ -88,13 +89,7 @@ class GameService:
         )
 
     async def _ensure_player_profile(self, profile: GamePlayerProfile) -> None:
-        uid_to_load = profile.user_id
-        if isinstance(profile.user_id, str) and profile.user_id.lstrip("-").isdigit():
-            uid_to_load = int(profile.user_id)
-
-        user = await self.user_repo.load(uid_to_load)
-        if not user and isinstance(uid_to_load, int):
-            user = await self.user_repo.load(str(uid_to_load))
+        user = await self.user_repo.load(canonical_id(profile.user_id))
 
         if not user:
             await self.user_repo.save(
@@ -133,17 +128,7 @@ class GameService:
         if user_id == "guest":
             return True
 
-        # Ensure user_id is int if it looks like one (Telegram IDs are ints)
-        uid_to_load = user_id
-        if isinstance(user_id, str) and user_id.lstrip("-").isdigit():
-            uid_to_load = int(user_id)
-
-        user = await self.user_repo.load(uid_to_load)
-        if not user:
-            # Fallback: try as string if int failed (legacy support?)
-            if isinstance(uid_to_load, int):
-                user = await self.user_repo.load(str(uid_to_load))
-
+        user = await self.user_repo.load(canonical_id(user_id))
         if not user:
             logger.warning(f"User {user_id} not found when processing score")
             return False
@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, AsyncMock, patch
 from datetime import datetime, timezone, timedelta
 from services.game_service import GamePlayerProfile, GameService
 from models.user import User
+from utils import id_forms
 
 
 class InMemoryUserRepository:
@@ -18,7 +19,10 @@ class InMemoryUserRepository:
         self.users.pop(entity_id, None)
 
     async def load(self, entity_id: str | int) -> User | None:
-        return self.users.get(entity_id)
+        # Like the real repositories, also find legacy string-keyed users
+        return next(
+            (self.users[f] for f in id_forms(entity_id) if f in self.users), None
+        )
 
     async def load_all(self, ignore_gdpr: bool = False) -> list[User]:
         return list(self.users.values())
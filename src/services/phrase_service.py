@@ -5,13 +5,12 @@ from datetime import datetime
 from typing import TYPE_CHECKING, cast
 
 import telegram
-from fuzzywuzzy import fuzz
+from infrastructure.counters import usage_counters
 from models.phrase import Phrase, LongPhrase
 from infrastructure.protocols import (
     PhraseRepository,
     LongPhraseRepository,
 )
-from utils import normalize_str
 
 if TYPE_CHECKING:
     from models.proposal import Proposal, LongProposal
@@ -33,6 +32,7 @@ class PhraseService:
         self.long_repo = long_phrase_repo
         self.user_service = user_service
         self.badge_service = badge_service
+        self.usage_counters = usage_counters
 
     def create_sticker_image(self, phrase: Phrase | LongPhrase) -> bytes:
         from utils.image_utils import generate_png
@@ -70,6 +70,7 @@ class PhraseService:
             await self.long_repo.save(cast(LongPhrase, phrase))
         else:
             await self.phrase_repo.save(phrase)
+            await self.badge_service.record(proposal.user_id, phrases=1)
 
         # Award points to the proposer
         await self.user_service.add_points(proposal.user_id, 10)
@@ -90,9 +91,21 @@ class PhraseService:
                     f"Could not notify badge {badge.id} to user {proposal.user_id}: {e}"
                 )
 
+    async def delete_phrase(self, phrase: Phrase | LongPhrase) -> None:
+        """Deletes a phrase. A short one no longer counts towards its
+        author's Poeta badge."""
+        if phrase.id is None:
+            return
+        if isinstance(phrase, LongPhrase):
+            await self.long_repo.delete(phrase.id)
+            return
+        await self.phrase_repo.delete(phrase.id)
+        if phrase.user_id:
+            await self.badge_service.record(phrase.user_id, phrases=-1)
+
     async def get_random(self, long: bool = False) -> Phrase:
         repo = self.long_repo if long else self.phrase_repo
-        phrases = await repo.load_all()
+        phrases = await repo.get_phrase_pool()
         if not phrases:
             return LongPhrase(text="¡Cuñado!") if long else Phrase(text="¡Cuñado!")
         return random.choice(phrases)
@@ -101,22 +114,22 @@ class PhraseService:
         self, search: str, long: bool = False
     ) -> list[Phrase | LongPhrase]:
         repo = self.long_repo if long else self.phrase_repo
-        phrases = await repo.load_all()
-        return [p for p in phrases if search.lower() in p.text.lower()]
+        return await repo.get_phrases(search=search)
 
     async def find_most_similar(
-        self, text: str, long: bool = False
+        self, text: str, long: bool = False, threshold: int = 0
     ) -> tuple[Phrase, int]:
+        """The phrase most similar to ``text`` and its ``fuzz.ratio`` score.
+
+        With a ``threshold`` the lookup only scores indexed candidates: the
+        result is exact whenever its score is above the threshold, and the
+        best candidate otherwise.
+        """
         repo = self.long_repo if long else self.phrase_repo
-        phrases = await repo.load_all()
-        if not phrases:
+        phrase, score = await repo.find_similar(text, threshold)
+        if phrase is None:
             return (LongPhrase(text="") if long else Phrase(text="")), 0
-
-        norm_text = normalize_str(text)
-        return max(
-            [(p, fuzz.ratio(norm_text, normalize_str(p.text))) for p in phrases],
-            key=lambda x: x[1],
-        )
+        return phrase, score
 
     async def register_sticker_usage(self, phrase: Phrase | LongPhrase) -> None:
         """Increments sticker usage counters for a phrase."""
@@ -155,27 +168,14 @@ class PhraseService:
         )
         items = data.split(",") if is_short else [data]
 
-        for item in items:
-            # Numeric ID only
-            if item.isdigit():
-                phrase_id = int(item)
-                if is_long:
-                    lp = await self.long_repo.load(phrase_id)
-                    if lp:
-                        lp.usages += 1
-                        lp.score += 1
-                        if is_audio:
-                            lp.audio_usages += 1
-                        if is_sticker:
-                            lp.sticker_usages += 1
-                        await self.long_repo.save(cast(LongPhrase, lp))
-                else:
-                    p = await self.phrase_repo.load(phrase_id)
-                    if p:
-                        p.usages += 1
-                        p.score += 1
-                        if is_audio:
-                            p.audio_usages += 1
-                        if is_sticker:
-                            p.sticker_usages += 1
-                        await self.phrase_repo.save(cast(Phrase, p))
+        # Numeric IDs only
+        phrase_ids = [int(item) for item in items if item.isdigit()]
+        repo = self.long_repo if is_long else self.phrase_repo
+        fields = {"usages": 1, "score": 1}
+        if is_audio:
+            fields["audio_usages"] = 1
+        if is_sticker:
+            fields["sticker_usages"] = 1
+        # Written in batches by the buffer: nothing is loaded or saved here
+        for phrase_id in phrase_ids:
+            self.usage_counters.add(repo, phrase_id, **fields)
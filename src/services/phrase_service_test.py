@@ -2,19 +2,23 @@ import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 from models.phrase import Phrase, LongPhrase
 from models.proposal import Proposal, LongProposal
+from infrastructure.counters import CounterBuffer
 from services.phrase_service import PhraseService
 
 
 class TestPhraseService:
     @pytest.fixture
-    def service(self):
+    async def service(self):
         self.phrase_repo = AsyncMock()
         self.long_repo = AsyncMock()
         self.user_service = AsyncMock()
         self.badge_service = AsyncMock()
-        return PhraseService(
+        service = PhraseService(
             self.phrase_repo, self.long_repo, self.user_service, self.badge_service
         )
+        service.usage_counters = CounterBuffer(flush_interval=60)
+        yield service
+        await service.usage_counters.stop()
 
     @pytest.mark.asyncio
     async def test_create_sticker_image(self, service):
@@ -45,21 +49,21 @@ class TestPhraseService:
     @pytest.mark.asyncio
     async def test_get_random(self, service):
         p1 = Phrase(text="foo")
-        self.phrase_repo.load_all.return_value = [p1]
+        self.phrase_repo.get_phrase_pool.return_value = [p1]
 
         result = await service.get_random(long=False)
         assert result == p1
 
     @pytest.mark.asyncio
     async def test_get_random_empty(self, service):
-        self.phrase_repo.load_all.return_value = []
+        self.phrase_repo.get_phrase_pool.return_value = []
         result = await service.get_random(long=False)
         assert result.text == "¡Cuñado!"
         assert isinstance(result, Phrase)
 
     @pytest.mark.asyncio
     async def test_get_random_long_empty(self, service):
-        self.long_repo.load_all.return_value = []
+        self.long_repo.get_phrase_pool.return_value = []
         result = await service.get_random(long=True)
         assert result.text == "¡Cuñado!"
         assert isinstance(result, LongPhrase)
@@ -67,26 +71,24 @@ class TestPhraseService:
     @pytest.mark.asyncio
     async def test_get_phrases(self, service):
         p1 = Phrase(text="hola")
-        p2 = Phrase(text="adios")
-        self.phrase_repo.load_all.return_value = [p1, p2]
+        self.phrase_repo.get_phrases.return_value = [p1]
 
         results = await service.get_phrases("hola")
-        assert len(results) == 1
-        assert results[0] == p1
+        assert results == [p1]
+        self.phrase_repo.get_phrases.assert_awaited_once_with(search="hola")
 
     @pytest.mark.asyncio
     async def test_find_most_similar(self, service):
         p1 = Phrase(text="hola")
-        p2 = Phrase(text="adios")
-        self.phrase_repo.load_all.return_value = [p1, p2]
+        self.phrase_repo.find_similar.return_value = (p1, 89)
 
-        result, score = await service.find_most_similar("holaa")
-        assert result == p1
-        assert score > 80
+        result, score = await service.find_most_similar("holaa", threshold=90)
+        assert (result, score) == (p1, 89)
+        self.phrase_repo.find_similar.assert_awaited_once_with("holaa", 90)
 
     @pytest.mark.asyncio
     async def test_find_most_similar_empty(self, service):
-        self.phrase_repo.load_all.return_value = []
+        self.phrase_repo.find_similar.return_value = (None, 0)
         result, score = await service.find_most_similar("holaa")
         assert result.text == ""
         assert score == 0
@@ -94,7 +96,7 @@ class TestPhraseService:
 
     @pytest.mark.asyncio
     async def test_find_most_similar_long_empty(self, service):
-        self.long_repo.load_all.return_value = []
+        self.long_repo.find_similar.return_value = (None, 0)
         result, score = await service.find_most_similar("holaa", long=True)
         assert result.text == ""
         assert score == 0
@@ -140,8 +142,20 @@ class TestPhraseService:
             assert saved_phrase.score == 10
             # Award 10 points
             self.user_service.add_points.assert_called_once_with(1, 10)
+            self.badge_service.record.assert_called_once_with(1, phrases=1)
             self.badge_service.check_badges.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_delete_phrase_lowers_poeta_count(self, service):
+        await service.delete_phrase(Phrase(id=5, text="prop", user_id=1))
+        self.phrase_repo.delete.assert_called_once_with(5)
+        self.badge_service.record.assert_called_once_with(1, phrases=-1)
+
+        # Long phrases don't count towards it
+        await service.delete_phrase(LongPhrase(id=6, text="prop larga", user_id=1))
+        self.long_repo.delete.assert_called_once_with(6)
+        self.badge_service.record.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_create_from_proposal_long(self, service):
         mock_bot = MagicMock()
@@ -163,65 +177,56 @@ class TestPhraseService:
             assert saved_phrase.sticker_file_id == "sticker_123"
             # Award 10 points
             self.user_service.add_points.assert_called_once_with(1, 10)
+            # Only short phrases count towards Poeta
+            self.badge_service.record.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_add_usage_by_id_short_text(self, service):
-        p1 = Phrase(text="foo", id=1, score=5)
-        service.phrase_repo.load.return_value = p1
-
         await service.add_usage_by_id("short-1")
 
-        assert p1.usages == 1
-        assert p1.score == 6
-        service.phrase_repo.load.assert_called_with(1)
-        service.phrase_repo.save.assert_called_once_with(p1)
+        # Buffered: nothing is read or written until the flush
+        service.phrase_repo.load_many.assert_not_called()
+        service.phrase_repo.increment_many.assert_not_called()
+        await service.usage_counters.flush()
+        service.phrase_repo.increment_many.assert_called_once_with(
+            {1: {"usages": 1, "score": 1}}
+        )
 
     @pytest.mark.asyncio
     async def test_add_usage_by_id_short_combination(self, service):
-        p1 = Phrase(text="foo", id=1)
-        p2 = Phrase(text="bar", id=2)
-
-        async def mock_load(pid):
-            if pid == 1:
-                return p1
-            if pid == 2:
-                return p2
-            return None
-
-        service.phrase_repo.load.side_effect = mock_load
-
         await service.add_usage_by_id("short-1,2")
-
-        assert p1.usages == 1
-        assert p2.usages == 1
-        assert service.phrase_repo.save.call_count == 2
+        await service.add_usage_by_id("short-2,3")
+        await service.usage_counters.flush()
+
+        # One batched increment for every usage since the last flush
+        service.phrase_repo.increment_many.assert_called_once_with(
+            {
+                1: {"usages": 1, "score": 1},
+                2: {"usages": 2, "score": 2},
+                3: {"usages": 1, "score": 1},
+            }
+        )
 
     @pytest.mark.asyncio
     async def test_add_usage_by_id_long_audio(self, service):
-        p1 = LongPhrase(text="long phrase", id=10)
-        service.long_repo.load.return_value = p1
-
         await service.add_usage_by_id("audio-long-10")
+        await service.usage_counters.flush()
 
-        assert p1.usages == 1
-        assert p1.audio_usages == 1
-        service.long_repo.load.assert_called_with(10)
-        service.long_repo.save.assert_called_once_with(p1)
+        service.long_repo.increment_many.assert_called_once_with(
+            {10: {"usages": 1, "score": 1, "audio_usages": 1}}
+        )
+        service.phrase_repo.increment_many.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_add_usage_by_id_short_sticker(self, service):
-        p1 = Phrase(text="sticker text", id=5)
-        service.phrase_repo.load.return_value = p1
-
         await service.add_usage_by_id("sticker-short-5")
+        await service.usage_counters.flush()
 
-        assert p1.usages == 1
-        assert p1.sticker_usages == 1
-        service.phrase_repo.load.assert_called_with(5)
-        service.phrase_repo.save.assert_called_once_with(p1)
+        service.phrase_repo.increment_many.assert_called_once_with(
+            {5: {"usages": 1, "score": 1, "sticker_usages": 1}}
+        )
 
     @pytest.mark.asyncio
     async def test_add_usage_by_id_invalid(self, service):
         await service.add_usage_by_id("invalid-id")
-        service.phrase_repo.save.assert_not_called()
-        service.long_repo.save.assert_not_called()
+        assert service.usage_counters.stats()["pending"] == 0
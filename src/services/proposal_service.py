@@ -81,7 +81,9 @@ class ProposalService:
         (
             most_similar_phrase,
             phrase_similarity,
-        ) = await self.phrase_service.find_most_similar(proposal.text, long=is_long)
+        ) = await self.phrase_service.find_most_similar(
+            proposal.text, long=is_long, threshold=SIMILARITY_DISCARD_THRESHOLD
+        )
         if phrase_similarity > SIMILARITY_DISCARD_THRESHOLD:
             return IntakeResult(
                 IntakeStatus.DUPLICATE_APPROVED,
@@ -92,7 +94,9 @@ class ProposalService:
         (
             most_similar_proposal,
             proposal_similarity,
-        ) = await self.find_most_similar_proposal(proposal.text, is_long=is_long)
+        ) = await self.find_most_similar_proposal(
+            proposal.text, is_long=is_long, threshold=SIMILARITY_DISCARD_THRESHOLD
+        )
         if (
             proposal_similarity > SIMILARITY_DISCARD_THRESHOLD
             and most_similar_proposal is not None
@@ -114,6 +118,12 @@ class ProposalService:
         else:
             await self.repo.save(proposal)
 
+        # The lookup above is only exact above the threshold; the curators'
+        # message names the closest phrase, so find it exactly
+        (
+            most_similar_phrase,
+            phrase_similarity,
+        ) = await self.phrase_service.find_most_similar(proposal.text, long=is_long)
         return IntakeResult(
             IntakeStatus.ACCEPTED,
             proposal=proposal,
@@ -256,25 +266,7 @@ class ProposalService:
         return True
 
     async def find_most_similar_proposal(
-        self, text: str, is_long: bool = False
+        self, text: str, is_long: bool = False, threshold: int = 0
     ) -> tuple[Proposal | None, int]:
-        from fuzzywuzzy import fuzz
-        from utils import normalize_str
-
         repo = self.long_repo if is_long else self.repo
-        proposals = await repo.load_all()
-        if not proposals:
-            return None, 0
-
-        norm_text = normalize_str(text)
-
-        # Calculate similarity for all proposals
-        # We handle Proposal and LongProposal which have 'text' attribute
-        scored_proposals = [
-            (p, fuzz.ratio(norm_text, normalize_str(p.text))) for p in proposals
-        ]
-
-        if not scored_proposals:
-            return None, 0
-
-        return max(scored_proposals, key=lambda x: x[1])
+        return await repo.find_similar(text, threshold)
@@ -279,6 +279,24 @@ class TestProposalIntake:
         self.repo.save.assert_called_once_with(proposal)
         self.long_repo.save.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_submit_accepted_reports_the_exact_closest_phrase(self, service):
+        from models.phrase import Phrase
+        from services.proposal_service import IntakeStatus
+
+        # The thresholded lookup only gives its best indexed candidate
+        self.phrase_service.find_most_similar.side_effect = [
+            (Phrase(text=""), 0),
+            (Phrase(text="cuñao"), 60),
+        ]
+        service.find_most_similar_proposal = AsyncMock(return_value=(None, 0))
+
+        result = await service.submit(Proposal(id="1", text="cuñado", user_id=10))
+
+        assert result.status is IntakeStatus.ACCEPTED
+        assert (result.similar_text, result.similarity) == ("cuñao", 60)
+        self.phrase_service.find_most_similar.assert_called_with("cuñado", long=False)
+
     @pytest.mark.asyncio
     async def test_submit_frase_accepted_uses_long_repo(self, service):
         from models.phrase import LongPhrase
@@ -46,11 +46,14 @@ class UsageService:
                 metadata=metadata or {},
             )
             await self.repo.save(record)
+            await self.badge_service.record(effective_user_id, action=action)
             logger.debug(
                 f"Logged usage: {action} for user {effective_user_id} (orig: {user_id}) on {platform}"
             )
 
-            return await self.badge_service.check_badges(effective_user_id, platform)
+            return await self.badge_service.check_badges(
+                effective_user_id, platform, action=action
+            )
         except Exception as e:
             logger.error(f"Error logging usage: {e}")
             return []
@@ -58,9 +61,12 @@ class UsageService:
     async def get_user_stats(
         self, user_id: str | int, platform: str | None = None
     ) -> dict[str, int]:
-        # If platform is provided, it will still filter, but we might want global count
-        # For unified profile, we call it without platform
-        count = await self.repo.get_user_usage_count(str(user_id), platform)
+        # For unified profile, we call it without platform: the global count
+        # is kept with the user's stats. Per platform we still count Usage.
+        if platform is None:
+            count = (await self.badge_service.get_stats(user_id)).usages
+        else:
+            count = await self.repo.get_user_usage_count(str(user_id), platform)
         return {
             "total_usages": count,
         }
@@ -0,0 +1,19 @@
+import pytest
+
+from core.container import Container
+from models.usage import ActionType
+from models.user import User
+
+
+@pytest.mark.asyncio
+async def test_log_usage_keeps_user_stats():
+    container = Container(backend="memory")
+    await container.user_repo.save(User(id=1, name="Paco"))
+
+    badges = await container.usage_service.log_usage(1, "telegram", ActionType.AUDIO)
+    await container.usage_service.log_usage(1, "telegram", ActionType.AUDIO)
+
+    assert [b.id for b in badges] == ["novato"]
+    stats = await container.badge_service.get_stats(1)
+    assert (stats.usages, stats.count(ActionType.AUDIO)) == (2, 2)
+    assert await container.usage_service.get_user_stats(1) == {"total_usages": 2}
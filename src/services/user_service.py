@@ -6,6 +6,7 @@ from telegram import Update
 from models.user import User
 from models.chat import Chat
 from models.link_request import LinkRequest
+from utils import canonical_id
 
 if TYPE_CHECKING:
     from infrastructure.protocols import (
@@ -16,6 +17,7 @@ if TYPE_CHECKING:
         ProposalRepository,
         LongProposalRepository,
         LinkRequestRepository,
+        UserStatsRepository,
     )
 
 logger = logging.getLogger(__name__)
@@ -36,6 +38,7 @@ class UserService:
         proposal_repo: ProposalRepository,
         long_proposal_repo: LongProposalRepository,
         link_request_repo: LinkRequestRepository,
+        user_stats_repo: UserStatsRepository | None = None,
     ):
         self.user_repo = user_repo
         self.chat_repo = chat_repo
@@ -44,18 +47,22 @@ class UserService:
         self.proposal_repo = proposal_repo
         self.long_proposal_repo = long_proposal_repo
         self.link_request_repo = link_request_repo
+        self._user_stats_repo = user_stats_repo
+
+    @property
+    def user_stats_repo(self) -> UserStatsRepository:
+        if self._user_stats_repo is None:
+            # Default to the Datastore singleton, looked up on each use
+            from infrastructure.datastore.user_stats import user_stats_repository
+
+            return user_stats_repository
+        return self._user_stats_repo
 
     async def get_user(
         self, user_id: str | int, platform: str | None = None
     ) -> User | None:
-        user = await self.user_repo.load(user_id)
-
-        # Fallback: try converting string to int if it's a digit string (handling numeric IDs)
-        if not user and isinstance(user_id, str) and user_id.lstrip("-").isdigit():
-            try:
-                user = await self.user_repo.load(int(user_id))
-            except ValueError:
-                pass
+        # The repository also finds users keyed by the legacy string form
+        user = await self.user_repo.load(canonical_id(user_id))
 
         if not user:
             return None
@@ -88,16 +95,7 @@ class UserService:
         username: str | None = None,
         platform: str = "telegram",
     ) -> User:
-        # Normalize numeric IDs to int
-        uid_to_load = user_id
-        if isinstance(user_id, str) and user_id.lstrip("-").isdigit():
-            uid_to_load = int(user_id)
-
-        user = await self.user_repo.load(uid_to_load)
-
-        # Fallback for string-keyed legacy users if numeric load failed
-        if not user and isinstance(uid_to_load, int):
-            user = await self.user_repo.load(str(uid_to_load))
+        user = await self.user_repo.load(canonical_id(user_id))
 
         if user:
             changed = False
@@ -140,16 +138,7 @@ class UserService:
         username: str | None = None,
         platform: str = "telegram",
     ) -> Chat:
-        # Normalize numeric IDs to int
-        cid_to_load = chat_id
-        if isinstance(chat_id, str) and chat_id.lstrip("-").isdigit():
-            cid_to_load = int(chat_id)
-
-        chat = await self.chat_repo.load(cid_to_load)
-
-        # Fallback for string-keyed legacy chats
-        if not chat and isinstance(cid_to_load, int):
-            chat = await self.chat_repo.load(str(cid_to_load))
+        chat = await self.chat_repo.load(canonical_id(chat_id))
 
         now = datetime.now(timezone.utc)
 
@@ -358,10 +347,12 @@ class UserService:
         target_user.badges = list(set(target_user.badges + source_user.badges))
         if "multiplataforma" not in target_user.badges:
             target_user.badges.append("multiplataforma")
+        target_user.has_aliases = True
 
         await self.save_user(target_user)
 
         await self._migrate_authorship(source_user.id, target_user.id)
+        await self._migrate_stats(source_user.id, target_user.id)
 
         # Instead of deleting, we make source_user an alias of target_user
         source_user.linked_to = target_user.id
@@ -369,11 +360,27 @@ class UserService:
         source_user.usages = 0
         source_user.badges = []
         await self.save_user(source_user)
+        await self.user_repo.forget_links(source_user.id, target_user.id)
 
         await self.link_request_repo.delete(token)
 
         return True
 
+    async def _migrate_stats(self, source_id: str | int, target_id: str | int) -> None:
+        """Move the absorbed account's badge stats (usages, actions, authored
+        phrases, posters) to the canonical Perfil, like its authorship."""
+        stats = await self.user_stats_repo.load(str(source_id))
+        if stats is None:
+            return
+        counts = {name: value for name, value in stats.to_counts().items() if value}
+        if not counts:
+            return
+        await self.user_stats_repo.add(str(target_id), counts)
+        # Subtract rather than delete, so usages counted meanwhile are kept
+        await self.user_stats_repo.add(
+            str(source_id), {name: -value for name, value in counts.items()}
+        )
+
     async def _migrate_authorship(
         self, source_id: str | int, target_id: str | int
     ) -> None:
@@ -418,4 +425,4 @@ class UserService:
         for repo, items in authored:
             for item in items:
                 item.user_id = target_id
-                await repo.save(item)
+            await repo.save_many(items)
@@ -3,7 +3,9 @@ from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, AsyncMock
 from models.user import User
 from models.link_request import LinkRequest
+from models.user_stats import UserStats
 from services.user_service import UserService
+from infrastructure.memory.user_stats import UserStatsMemoryRepository
 
 
 @pytest.fixture
@@ -69,6 +71,7 @@ async def test_complete_link_success(mock_repos):
         long_proposal_repo=long_proposal_repo,
         link_request_repo=link_repo,
         chat_repo=chat_repo,
+        user_stats_repo=UserStatsMemoryRepository(),
     )
 
     # Setup Data
@@ -114,6 +117,7 @@ async def test_complete_link_success(mock_repos):
     assert target_user.points == 30  # 10 + 20
     assert target_user.usages == 15  # 5 + 10
     assert set(target_user.badges) == {"b1", "b2", "multiplataforma"}
+    assert target_user.has_aliases
 
     # Verify Alias on Source
     assert source_user.linked_to == "target"
@@ -130,7 +134,7 @@ async def test_complete_link_success(mock_repos):
 
     # Verify Content Migration
     assert mock_phrase.user_id == "target"
-    phrase_repo.save.assert_called_with(mock_phrase)
+    phrase_repo.save_many.assert_called_with([mock_phrase])
 
     # Verify Token Deletion
     link_repo.delete.assert_called_with(token)
@@ -223,6 +227,7 @@ async def test_complete_link_migrates_all_authored_content(mock_repos):
         long_phrase_repo=long_phrase_repo,
         proposal_repo=proposal_repo,
         long_proposal_repo=long_proposal_repo,
+        user_stats_repo=UserStatsMemoryRepository(),
     )
 
     token = "ABCDEF"
@@ -255,7 +260,64 @@ async def test_complete_link_migrates_all_authored_content(mock_repos):
     assert frase.user_id == "target"
     assert propuesta.user_id == "target"
     assert propuesta_larga.user_id == "target"
-    phrase_repo.save.assert_called_with(apelativo)
-    long_phrase_repo.save.assert_called_with(frase)
-    proposal_repo.save.assert_called_with(propuesta)
-    long_proposal_repo.save.assert_called_with(propuesta_larga)
+    phrase_repo.save_many.assert_called_with([apelativo])
+    long_phrase_repo.save_many.assert_called_with([frase])
+    proposal_repo.save_many.assert_called_with([propuesta])
+    long_proposal_repo.save_many.assert_called_with([propuesta_larga])
+
+
+@pytest.mark.asyncio
+async def test_complete_link_moves_badge_stats(mock_repos):
+    """The Perfil keeps credit for what the absorbed account did and authored,
+    as badges and their progress read its stats."""
+    (
+        user_repo,
+        link_repo,
+        phrase_repo,
+        long_phrase_repo,
+        proposal_repo,
+        long_proposal_repo,
+        chat_repo,
+    ) = mock_repos
+    stats_repo = UserStatsMemoryRepository()
+    service = UserService(
+        user_repo=user_repo,
+        link_request_repo=link_repo,
+        chat_repo=chat_repo,
+        phrase_repo=phrase_repo,
+        long_phrase_repo=long_phrase_repo,
+        proposal_repo=proposal_repo,
+        long_proposal_repo=long_proposal_repo,
+        user_stats_repo=stats_repo,
+    )
+    users = {"source": User(id="source"), "target": User(id="target")}
+    user_repo.load.side_effect = lambda uid, follow_link=True: users.get(uid)
+    user_repo.load_raw.side_effect = lambda uid: users.get(uid)
+    for repo in (phrase_repo, long_phrase_repo):
+        repo.get_phrases.return_value = []
+    for repo in (proposal_repo, long_proposal_repo):
+        repo.get_proposals.return_value = []
+    link_repo.load.return_value = LinkRequest(
+        token="ABCDEF", source_user_id="source", source_platform="telegram"
+    )
+    await stats_repo.save(
+        UserStats(id="source", usages=3, actions={"vision": 3}, phrases=2, posters=1)
+    )
+    await stats_repo.save(UserStats(id="target", usages=1, actions={"vision": 1}))
+
+    assert await service.complete_link("ABCDEF", "target", "slack") is True
+
+    target = await stats_repo.load("target")
+    assert (target.usages, target.actions, target.phrases, target.posters) == (
+        4,
+        {"vision": 4},
+        2,
+        1,
+    )
+    source = await stats_repo.load("source")
+    assert (source.usages, source.actions, source.phrases, source.posters) == (
+        0,
+        {"vision": 0},
+        0,
+        0,
+    )
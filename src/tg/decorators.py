@@ -3,7 +3,9 @@ from functools import wraps
 from typing import Any, Callable, TypeVar, cast
 from telegram import Chat, Update
 
+from core.background import background_tasks
 from core.container import services
+from infrastructure.datastore.unit_of_work import unit_of_work
 from utils import remove_empty_from_dict
 
 logger = logging.getLogger("cunhaobot")
@@ -39,13 +41,25 @@ def only_admins(f: F) -> F:
 def log_update(f: F) -> F:
     @wraps(f)
     async def wrapper(update: Update, *args: object, **kwargs: object) -> object:
-        # Actualizar o crear usuario usando el servicio
-        await services.user_service.update_or_create_user(update)
-
-        update_dict = cast(dict[str, object], remove_empty_from_dict(update.to_dict()))
-        update_dict["method"] = getattr(f, "__name__", "unknown")
+        # One unit of work per update: each entity is loaded once and every
+        # change is written in a single batch when the handler finishes.
+        async with unit_of_work():
+            if update.inline_query:
+                # Inline answers don't wait on bookkeeping: the user is
+                # recorded in the background once the answer is out
+                background_tasks.submit(
+                    services.user_service.update_or_create_inline_user, update
+                )
+            else:
+                # Actualizar o crear usuario usando el servicio
+                await services.user_service.update_or_create_user(update)
 
-        logger.info(f"{update_dict}")
-        return await cast(Callable[..., Any], f)(update, *args, **kwargs)
+            if logger.isEnabledFor(logging.INFO):
+                update_dict = cast(
+                    dict[str, object], remove_empty_from_dict(update.to_dict())
+                )
+                update_dict["method"] = getattr(f, "__name__", "unknown")
+                logger.info(f"{update_dict}")
+            return await cast(Callable[..., Any], f)(update, *args, **kwargs)
 
     return cast(F, wrapper)
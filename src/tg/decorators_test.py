@@ -90,6 +90,7 @@ class TestDecorators:
     async def test_log_update_no_user(self):
         decorated = log_update(dummy_func)
         update = MagicMock()
+        update.inline_query = None
         update.to_dict.return_value = {}
         with patch("tg.decorators.services") as mock_services:
             mock_services.user_service.update_or_create_user = AsyncMock()
@@ -102,6 +103,7 @@ class TestDecorators:
     async def test_log_update_success(self):
         decorated = log_update(dummy_func)
         update = MagicMock()
+        update.inline_query = None
         update.to_dict.return_value = {"a": 1}
 
         with patch("tg.decorators.services") as mock_services:
@@ -111,3 +113,20 @@ class TestDecorators:
             mock_services.user_service.update_or_create_user.assert_called_once_with(
                 update
             )
+
+    @pytest.mark.asyncio
+    async def test_log_update_inline_query_in_background(self):
+        decorated = log_update(dummy_func)
+        update = MagicMock()
+        update.to_dict.return_value = {}
+
+        with (
+            patch("tg.decorators.services") as mock_services,
+            patch("tg.decorators.background_tasks") as mock_background,
+        ):
+            mock_services.user_service.update_or_create_user = AsyncMock()
+            assert await decorated(update, MagicMock()) == "ok"
+            mock_services.user_service.update_or_create_user.assert_not_called()
+            mock_background.submit.assert_called_once_with(
+                mock_services.user_service.update_or_create_inline_user, update
+            )
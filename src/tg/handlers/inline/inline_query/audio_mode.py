@@ -1,9 +1,11 @@
-import random
+from collections.abc import Sequence
 from telegram import InlineQueryResultVoice
 
 from models.phrase import LongPhrase, Phrase
 from core.container import services
-from tg.text_router import LONG_MODE, SHORT_MODE, get_query_mode
+from tg.handlers.inline.inline_query.candidates import inline_candidates
+from tg.text_router import AUDIO_MODE, LONG_MODE, SHORT_MODE, get_query_mode
+from utils import iter_shuffled
 
 
 def _phrase_to_inline_audio(
@@ -24,19 +26,20 @@ def _phrase_to_inline_audio(
 async def get_audio_mode_results(input: str) -> list[InlineQueryResultVoice]:
     mode, rest = get_query_mode(input)
 
-    phrases: list[Phrase | LongPhrase] = []
+    phrases: Sequence[Phrase | LongPhrase] = []
     result_type = "short"
     if mode == SHORT_MODE:
         result_type = "short"
-        phrases.extend(await services.phrase_repo.get_phrases(search=rest))
+        phrases = await inline_candidates.get(AUDIO_MODE, rest, services.phrase_repo)
     elif mode == LONG_MODE:
         result_type = "long"
-        phrases.extend(await services.long_phrase_repo.get_phrases(search=rest))
-
-    random.shuffle(phrases)
+        phrases = await inline_candidates.get(
+            AUDIO_MODE, rest, services.long_phrase_repo, long=True
+        )
 
     results: list[InlineQueryResultVoice] = []
-    for p in phrases:
+    # Some phrases have no audio: keep drawing until there are 10 results
+    for p in iter_shuffled(phrases):
         if res := _phrase_to_inline_audio(p, result_type):
             results.append(res)
         if len(results) >= 10:
@@ -15,7 +15,7 @@ async def test_get_audio_mode_results_short():
             return_value=(SHORT_MODE, "rest"),
         ),
     ):
-        mock_services.phrase_repo.get_phrases = AsyncMock(return_value=[p1])
+        mock_services.phrase_repo.get_phrase_pool = AsyncMock(return_value=[p1])
         mock_services.tts_service.get_audio_url.return_value = "http://audio"
 
         results = await get_audio_mode_results("input")
@@ -35,7 +35,7 @@ async def test_get_audio_mode_results_long():
             return_value=(LONG_MODE, "rest"),
         ),
     ):
-        mock_services.long_phrase_repo.get_phrases = AsyncMock(return_value=[p1])
+        mock_services.long_phrase_repo.get_phrase_pool = AsyncMock(return_value=[p1])
         mock_services.tts_service.get_audio_url.return_value = "http://audio"
 
         results = await get_audio_mode_results("input")
@@ -53,7 +53,7 @@ async def test_get_audio_mode_results_no_url():
             return_value=(SHORT_MODE, "rest"),
         ),
     ):
-        mock_services.phrase_repo.get_phrases = AsyncMock(return_value=[p1])
+        mock_services.phrase_repo.get_phrase_pool = AsyncMock(return_value=[p1])
         mock_services.tts_service.get_audio_url.return_value = None
 
         results = await get_audio_mode_results("input")
@@ -80,12 +80,12 @@ async def test_get_audio_mode_results_search():
             return_value=(LONG_MODE, "facha"),
         ),
     ):
-        mock_services.long_phrase_repo.get_phrases = AsyncMock(return_value=[p1])
+        mock_services.long_phrase_repo.get_phrase_pool = AsyncMock(return_value=[p1])
         mock_services.tts_service.get_audio_url.return_value = "http://audio"
 
         results = await get_audio_mode_results("audio facha")
         assert len(results) == 1
         assert results[0].title == "facha"
-        mock_services.long_phrase_repo.get_phrases.assert_called_once_with(
+        mock_services.long_phrase_repo.get_phrase_pool.assert_called_once_with(
             search="facha"
         )
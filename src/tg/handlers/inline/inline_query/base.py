@@ -76,5 +76,3 @@ async def handle_inline_query(update: Update, context: CallbackContext) -> None:
             start_parameter=switch_pm_param[:63],
         ),
     )
-
-    await services.user_service.update_or_create_inline_user(update)
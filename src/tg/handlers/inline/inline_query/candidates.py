@@ -0,0 +1,97 @@
+"""Candidate phrases for inline queries, cached per mode and normalized search.
+
+Each keystroke of an inline query is a new request, and the popular ones (the
+empty query, "audio", "sticker", common words) keep asking for the same
+matches. ``InlineCandidateCache`` keeps the pool of matching phrases for a
+short while, so only the random draw from it is done per request. An entry
+is dropped once the phrase catalogue it came from changes.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from core.metrics import metrics_registry
+from infrastructure.protocols import LongPhraseRepository, PhraseRepository
+from models.phrase import LongPhrase, Phrase
+from utils import normalize_str
+
+# Seconds a candidate pool is reused for, even if nothing changed
+CANDIDATE_TTL = 30.0
+MAX_CANDIDATE_ENTRIES = 512
+
+
+@dataclass
+class _Entry:
+    repo: Any
+    version: Any
+    expires_at: float
+    phrases: Sequence[Phrase | LongPhrase]
+
+
+class InlineCandidateCache:
+    def __init__(
+        self, max_entries: int = MAX_CANDIDATE_ENTRIES, ttl: float = CANDIDATE_TTL
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, bool, str], _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(
+        self,
+        mode: str,
+        search: str,
+        repo: PhraseRepository | LongPhraseRepository,
+        long: bool = False,
+    ) -> Sequence[Phrase | LongPhrase]:
+        """The phrases ``repo`` matches for ``search``, from the cache if the
+        catalogue hasn't changed since they were looked up."""
+        # Searches match normalized text, so equal normalized searches match
+        # the same phrases
+        key = (mode, long, normalize_str(search))
+        version = repo.catalogue_version()
+        entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry.repo is repo
+            and entry.version == version
+            and entry.expires_at > time.monotonic()
+        ):
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry.phrases
+
+        self.misses += 1
+        phrases = await repo.get_phrase_pool(search=search)
+        # The version from before the lookup: a change made meanwhile
+        # invalidates the entry on the next request
+        self._entries[key] = _Entry(repo, version, time.monotonic() + self.ttl, phrases)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return phrases
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+inline_candidates = InlineCandidateCache()
+metrics_registry.register(
+    "inline_candidates", inline_candidates.stats, inline_candidates.reset_stats
+)
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+
+from models.phrase import LongPhrase, Phrase
+from infrastructure.memory.phrase import PhraseMemoryRepository
+from tg.handlers.inline.inline_query import candidates
+from tg.handlers.inline.inline_query.candidates import InlineCandidateCache
+from tg.text_router import AUDIO_MODE, SHORT_MODE
+
+
+@pytest.fixture
+async def repo():
+    repo = PhraseMemoryRepository(Phrase)
+    await repo.save(Phrase(id=1, text="Cuñado"))
+    await repo.save(Phrase(id=2, text="Máquina"))
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_reuses_candidates_for_equal_normalized_searches(repo):
+    cache = InlineCandidateCache()
+
+    first = await cache.get(SHORT_MODE, "cuña", repo)
+    assert [p.id for p in first] == [1]
+    assert await cache.get(SHORT_MODE, "CUÑA ", repo) is first
+    # Another mode or repository is another entry
+    assert await cache.get(AUDIO_MODE, "cuña", repo) is not first
+    long_repo = PhraseMemoryRepository(LongPhrase)
+    assert await cache.get(SHORT_MODE, "cuña", long_repo, long=True) == []
+
+    assert cache.stats() == {
+        "entries": 3,
+        "hits": 1,
+        "misses": 3,
+        "hit_ratio": 0.25,
+    }
+
+
+@pytest.mark.asyncio
+async def test_catalogue_changes_and_ttl_invalidate(repo, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(candidates, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    cache = InlineCandidateCache(ttl=30.0)
+    assert len(await cache.get(SHORT_MODE, "", repo)) == 2
+
+    await repo.save(Phrase(id=3, text="Fiera"))
+    assert len(await cache.get(SHORT_MODE, "", repo)) == 3
+    assert cache.hits == 0
+
+    clock[0] += 29
+    await cache.get(SHORT_MODE, "", repo)
+    clock[0] += 2
+    await cache.get(SHORT_MODE, "", repo)
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used(repo):
+    cache = InlineCandidateCache(max_entries=2)
+    await cache.get(SHORT_MODE, "cuñado", repo)
+    await cache.get(SHORT_MODE, "maquina", repo)
+    await cache.get(SHORT_MODE, "cuñado", repo)
+    await cache.get(SHORT_MODE, "fiera", repo)
+
+    await cache.get(SHORT_MODE, "cuñado", repo)
+    assert cache.stats()["entries"] == 2
+    assert (cache.hits, cache.misses) == (2, 3)
+    await cache.get(SHORT_MODE, "maquina", repo)
+    assert cache.misses == 4
@@ -1,15 +1,16 @@
 import random
 from telegram import InlineQueryResultArticle, InputTextMessageContent
 from core.container import services
+from tg.handlers.inline.inline_query.candidates import inline_candidates
+from tg.text_router import LONG_MODE
 from utils import get_thumb, normalize_str
 
 
 async def get_long_mode_results(input_text: str) -> list[InlineQueryResultArticle]:
     max_results_number = 10
-    phrases = await services.long_phrase_repo.get_phrases(search=input_text)
-
-    # Randomize results
-    random.shuffle(phrases)
+    phrases = await inline_candidates.get(
+        LONG_MODE, input_text, services.long_phrase_repo, long=True
+    )
     results_number = min(len(phrases), max_results_number)
 
     results = [
@@ -13,7 +13,7 @@ async def test_get_long_mode_results_success():
             "tg.handlers.inline.inline_query.long_mode.get_thumb", return_value="thumb"
         ),
     ):
-        mock_services.long_phrase_repo.get_phrases = AsyncMock(return_value=[p1])
+        mock_services.long_phrase_repo.get_phrase_pool = AsyncMock(return_value=[p1])
         results = await get_long_mode_results("test")
         assert len(results) == 1
         assert results[0].title == "long phrase test"
@@ -28,7 +28,7 @@ async def test_get_long_mode_results_no_results():
             "tg.handlers.inline.inline_query.long_mode.get_thumb", return_value="thumb"
         ),
     ):
-        mock_services.long_phrase_repo.get_phrases = AsyncMock(return_value=[])
+        mock_services.long_phrase_repo.get_phrase_pool = AsyncMock(return_value=[])
         mock_services.phrase_service.get_random = AsyncMock(
             return_value=MagicMock(text="random phrase")
         )
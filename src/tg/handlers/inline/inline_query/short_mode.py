@@ -1,7 +1,9 @@
 import random
 from telegram import InlineQueryResultArticle, InputTextMessageContent
 from core.container import services
-from utils import get_thumb, normalize_str, random_combination
+from tg.handlers.inline.inline_query.candidates import inline_candidates
+from tg.text_router import SHORT_MODE
+from utils import get_thumb, normalize_str, random_combinations
 
 BASE_TEMPLATE = "¿Qué pasa, {}?"
 
@@ -33,16 +35,11 @@ async def get_short_mode_results(input_text: str) -> list[InlineQueryResultArtic
             size = 1
             search = input_text
 
-    phrases = await services.phrase_repo.load_all()
-    if not phrases:
-        return []
-
+    # Phrases are only materialised once drawn into a combination
+    phrases = await inline_candidates.get(SHORT_MODE, search, services.phrase_repo)
     if search:
-        search_norm = normalize_str(search)
-        matching = [p for p in phrases if search_norm in normalize_str(p.text)]
-        if matching:
-            phrases = matching
-        else:
+        if not phrases:
+            search_norm = normalize_str(search)
             return [
                 InlineQueryResultArticle(
                     id=f"short-no-results-{search_norm}"[:63],
@@ -53,20 +50,12 @@ async def get_short_mode_results(input_text: str) -> list[InlineQueryResultArtic
                     thumbnail_url=get_thumb(),
                 )
             ]
+    elif not phrases:
+        return []
 
-    # Randomize
-    phrases_to_sample = list(phrases)
-    random.shuffle(phrases_to_sample)
-
-    size = max(1, min(size, len(phrases_to_sample)))
-    combinations: set[tuple] = set()
-
+    size = max(1, min(size, len(phrases)))
     # Try to get 10 different combinations
-    for _ in range(20):
-        if len(combinations) >= 10:
-            break
-        combination = random_combination(phrases_to_sample, size)
-        combinations.add(combination)
+    combinations = random_combinations(phrases, size, count=10, attempts=20)
 
     results = [
         InlineQueryResultArticle(
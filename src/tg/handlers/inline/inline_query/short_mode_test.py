@@ -13,7 +13,7 @@ async def test_get_short_mode_results_empty():
             "tg.handlers.inline.inline_query.short_mode.get_thumb", return_value="thumb"
         ),
     ):
-        mock_services.phrase_repo.load_all = AsyncMock(return_value=[p1])
+        mock_services.phrase_repo.get_phrase_pool = AsyncMock(return_value=[p1])
         results = await get_short_mode_results("")
         assert len(results) > 0
         assert "foo" in results[0].title
@@ -29,7 +29,7 @@ async def test_get_short_mode_results_with_size():
             "tg.handlers.inline.inline_query.short_mode.get_thumb", return_value="thumb"
         ),
     ):
-        mock_services.phrase_repo.load_all = AsyncMock(return_value=[p1, p2])
+        mock_services.phrase_repo.get_phrase_pool = AsyncMock(return_value=[p1, p2])
         results = await get_short_mode_results("2")
         assert len(results) > 0
         # Combination of 2 phrases
@@ -38,30 +38,32 @@ async def test_get_short_mode_results_with_size():
 @pytest.mark.asyncio
 async def test_get_short_mode_results_with_search():
     p1 = Phrase(text="maquina")
-    p2 = Phrase(text="figura")
     with (
         patch("tg.handlers.inline.inline_query.short_mode.services") as mock_services,
         patch(
             "tg.handlers.inline.inline_query.short_mode.get_thumb", return_value="thumb"
         ),
     ):
-        mock_services.phrase_repo.load_all = AsyncMock(return_value=[p1, p2])
+        mock_services.phrase_repo.get_phrase_pool = AsyncMock(return_value=[p1])
         results = await get_short_mode_results("maquina")
         assert len(results) > 0
         assert "maquina" in results[0].title
         assert "figura" not in results[0].title
+        mock_services.phrase_repo.get_phrase_pool.assert_awaited_once_with(
+            search="maquina"
+        )
+        mock_services.phrase_repo.load_all.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_get_short_mode_results_no_results():
-    p1 = Phrase(text="foo")
     with (
         patch("tg.handlers.inline.inline_query.short_mode.services") as mock_services,
         patch(
             "tg.handlers.inline.inline_query.short_mode.get_thumb", return_value="thumb"
         ),
     ):
-        mock_services.phrase_repo.load_all = AsyncMock(return_value=[p1])
+        mock_services.phrase_repo.get_phrase_pool = AsyncMock(return_value=[])
         results = await get_short_mode_results("notfound")
         assert len(results) == 1
         assert "No tengo" in results[0].title
@@ -70,6 +72,6 @@ async def test_get_short_mode_results_no_results():
 @pytest.mark.asyncio
 async def test_get_short_mode_results_no_phrases():
     with patch("tg.handlers.inline.inline_query.short_mode.services") as mock_services:
-        mock_services.phrase_repo.load_all = AsyncMock(return_value=[])
+        mock_services.phrase_repo.get_phrase_pool = AsyncMock(return_value=[])
         results = await get_short_mode_results("")
         assert results == []
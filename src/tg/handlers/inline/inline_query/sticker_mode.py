@@ -1,11 +1,12 @@
 import random
-
+from collections.abc import Sequence
 
 from telegram import InlineQueryResultCachedSticker
 
 from models.phrase import LongPhrase, Phrase
 from core.container import services
-from tg.text_router import LONG_MODE, SHORT_MODE, get_query_mode
+from tg.handlers.inline.inline_query.candidates import inline_candidates
+from tg.text_router import LONG_MODE, SHORT_MODE, STICKER_MODE, get_query_mode
 
 
 def _phrase_to_inline_sticker(
@@ -23,18 +24,19 @@ def _phrase_to_inline_sticker(
 async def get_sticker_mode_results(input: str) -> list[InlineQueryResultCachedSticker]:
     mode, rest = get_query_mode(input)
 
-    phrases: list[Phrase | LongPhrase] = []
+    phrases: Sequence[Phrase | LongPhrase] = []
     result_type = ""
     if mode == SHORT_MODE:
         result_type = "short"
-        phrases.extend(await services.phrase_repo.get_phrases(search=rest))
+        phrases = await inline_candidates.get(STICKER_MODE, rest, services.phrase_repo)
     elif mode == LONG_MODE:
         result_type = "long"
-        phrases.extend(await services.long_phrase_repo.get_phrases(search=rest))
+        phrases = await inline_candidates.get(
+            STICKER_MODE, rest, services.long_phrase_repo, long=True
+        )
 
-    random.shuffle(phrases)
     results: list[InlineQueryResultCachedSticker] = []
-    for p in phrases[:10]:
+    for p in random.sample(phrases, min(len(phrases), 10)):
         if res := _phrase_to_inline_sticker(p, result_type):
             results.append(res)
     return results
@@ -15,7 +15,7 @@ async def test_get_sticker_mode_results_short():
             return_value=(SHORT_MODE, "rest"),
         ),
     ):
-        mock_services.phrase_repo.get_phrases = AsyncMock(return_value=[p1])
+        mock_services.phrase_repo.get_phrase_pool = AsyncMock(return_value=[p1])
         results = await get_sticker_mode_results("input")
         assert len(results) == 1
         assert results[0].sticker_file_id == "123"
@@ -31,7 +31,7 @@ async def test_get_sticker_mode_results_long():
             return_value=(LONG_MODE, "rest"),
         ),
     ):
-        mock_services.long_phrase_repo.get_phrases = AsyncMock(return_value=[p1])
+        mock_services.long_phrase_repo.get_phrase_pool = AsyncMock(return_value=[p1])
         results = await get_sticker_mode_results("input")
         assert len(results) == 1
         assert results[0].sticker_file_id == "456"
@@ -1,5 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
+
+from core.background import background_tasks
 from tg.handlers.inline.inline_query.base import handle_inline_query
 
 
@@ -26,12 +28,14 @@ class TestInlineQuery:
         update.inline_query.answer = AsyncMock()
         update.inline_query.from_user = user
 
-        mock_container["phrase_repo"].load_all = AsyncMock(
+        mock_container["phrase_repo"].get_phrase_pool = AsyncMock(
             return_value=[PhraseFactory.build(text="p1")]
         )
 
         await handle_inline_query(update, MagicMock())
         update.inline_query.answer.assert_called_once()
+        # The user is recorded in the background, after the answer
+        await background_tasks.drain()
         mock_container["user_service"].update_or_create_inline_user.assert_called_once()
 
     @pytest.mark.asyncio
@@ -320,6 +320,7 @@ async def _fulfill_poster(
             request_data.image_url = image_url
             request_data.status = "completed"
             await services.poster_request_repo.save(request_data)
+            await services.badge_service.record(request_data.user_id, posters=1)
 
         caption = f"🎨 *{phrase}*\n\nAquí tienes, chaval. Gástatelo en salud."
 
@@ -109,6 +109,7 @@ async def test_handle_successful_payment_success():
             return_value="http://gcs/image.png"
         )
         mock_services.badge_service.check_badges = AsyncMock(return_value=[])
+        mock_services.badge_service.record = AsyncMock()
         mock_services.usage_service.log_usage = AsyncMock()
 
         await handle_successful_payment(update, context)
@@ -118,6 +119,9 @@ async def test_handle_successful_payment_success():
         mock_services.poster_request_repo.save.assert_called_once()
         assert mock_request.status == "completed"
         assert mock_request.image_url == "http://gcs/image.png"
+        mock_services.badge_service.record.assert_called_once_with(
+            mock_request.user_id, posters=1
+        )
 
         context.bot.send_photo.assert_called_once()
         # Verify it sent to the stored chat_id
@@ -1,7 +1,9 @@
 import random
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator, Sequence
 from copy import deepcopy
+from typing import TypeVar
 
+from .ids import canonical_id as canonical_id, id_forms as id_forms
 from .security import verify_telegram_auth as verify_telegram_auth
 from .text import (
     improve_punctuation as improve_punctuation,
@@ -9,14 +11,49 @@ from .text import (
 )
 from .ui import get_thumb as get_thumb, thumbs as thumbs
 
+T = TypeVar("T")
+
 
 def random_combination(iterable: Iterable, r: int) -> tuple:
-    pool = tuple(iterable)
+    # Sequences are indexed in place: only the r picked items are read
+    pool = iterable if isinstance(iterable, Sequence) else tuple(iterable)
     n = len(pool)
     indices: list[int] = sorted(random.sample(range(n), r))
     return tuple(pool[i] for i in indices)
 
 
+def random_combinations(
+    pool: Sequence[T], r: int, count: int, attempts: int
+) -> list[tuple[T, ...]]:
+    """Up to ``count`` distinct random ``r``-combinations of ``pool``, drawing
+    at most ``attempts`` times. Each comes in random order. Only the items
+    drawn are read, so this is O(attempts * r) whatever the pool's size."""
+    seen: set[tuple[int, ...]] = set()
+    combinations: list[tuple[T, ...]] = []
+    for _ in range(attempts):
+        if len(combinations) >= count:
+            break
+        indices = random.sample(range(len(pool)), r)
+        key = tuple(sorted(indices))
+        if key not in seen:
+            seen.add(key)
+            combinations.append(tuple(pool[i] for i in indices))
+    return combinations
+
+
+def iter_shuffled(pool: Sequence[T]) -> Iterator[T]:
+    """The items of ``pool`` in uniformly random order, like iterating over a
+    shuffled copy, but each step is O(1): taking the first k costs O(k)."""
+    n = len(pool)
+    # Sparse Fisher-Yates: only the positions swapped so far are stored
+    swapped: dict[int, int] = {}
+    for i in range(n):
+        j = random.randrange(i, n)
+        picked = swapped.get(j, j)
+        swapped[j] = swapped.get(i, i)
+        yield pool[picked]
+
+
 def remove_empty_from_dict(di: dict | list) -> dict | list:
     d = deepcopy(di)
     if isinstance(d, dict):
@@ -0,0 +1,15 @@
+def id_forms(entity_id: str | int) -> list[str | int]:
+    """The forms a (possibly numeric) id may be stored under, canonical first.
+
+    Telegram ids are ints, but older entities stored them as digit strings.
+    """
+    if isinstance(entity_id, int):
+        return [entity_id, str(entity_id)]
+    if entity_id.lstrip("-").isdigit():
+        return [int(entity_id), entity_id]
+    return [entity_id]
+
+
+def canonical_id(entity_id: str | int) -> str | int:
+    """Numeric ids as ints, everything else untouched."""
+    return id_forms(entity_id)[0]
@@ -3,7 +3,9 @@ from utils import (
     normalize_str,
     improve_punctuation,
     get_thumb,
+    iter_shuffled,
     random_combination,
+    random_combinations,
     verify_telegram_auth,
 )
 
@@ -64,3 +66,18 @@ def test_improve_punctuation():
         res = random_combination([1, 2, 3, 4, 5], 2)
         assert len(res) == 2
         assert set(res).issubset({1, 2, 3, 4, 5})
+
+    def test_random_combinations_are_distinct(self):
+        combinations = random_combinations([1, 2, 3, 4], 2, count=10, attempts=200)
+        # Only 6 exist; each comes once, in some order
+        assert len(combinations) == 6
+        assert len({frozenset(c) for c in combinations}) == 6
+        assert random_combinations([1, 2, 3], 3, count=10, attempts=5) != []
+        assert len(random_combinations(range(100), 3, count=10, attempts=20)) == 10
+
+    def test_iter_shuffled_is_a_uniform_permutation(self):
+        assert sorted(iter_shuffled(range(50))) == list(range(50))
+        assert list(iter_shuffled([])) == []
+
+        firsts = [next(iter_shuffled("abcd")) for _ in range(4000)]
+        assert all(800 < firsts.count(c) < 1200 for c in "abcd")